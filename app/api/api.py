@@ -3,6 +3,7 @@ from app.domains.auth.router import router as auth_router
 from app.domains.diary.router import router as diary_router
 from app.domains.feedback.router import router as feedback_router
 from app.domains.report.router import router as report_router
+from app.domains.health.router import router as health_router
 
 api_router = APIRouter()
 
@@ -10,3 +11,4 @@ api_router.include_router(auth_router, prefix="/auth", tags=["Auth"])
 api_router.include_router(diary_router, prefix="/diaries", tags=["Diary"])
 api_router.include_router(feedback_router, prefix="/feedbacks", tags=["Feedback"])
 api_router.include_router(report_router, prefix="/reports", tags=["Report"])
+api_router.include_router(health_router, prefix="/health", tags=["Health"])
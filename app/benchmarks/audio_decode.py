@@ -0,0 +1,109 @@
+"""
+STT 전처리 벤치마크: 기존 파일 왕복(pydub → .wav 저장 → Whisper 재디코딩) vs 메모리 내 디코딩
+
+사용법:
+    python -m app.benchmarks.audio_decode data/audio/sample.m4a --repeat 5
+    python -m app.benchmarks.audio_decode --synthetic 60     # 60초짜리 합성 음원으로 측정
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from app.services.stt_service import SAMPLE_RATE, load_audio
+
+
+def file_round_trip(input_path: str) -> tuple[np.ndarray, int]:
+    """기존 방식 재현: pydub 디코딩 → 정규화 → 16kHz .wav 저장 → Whisper가 다시 디코딩"""
+    from faster_whisper.audio import decode_audio
+    from pydub import AudioSegment, effects
+
+    audio = AudioSegment.from_file(input_path)
+    audio = effects.normalize(audio)
+    audio = audio.set_frame_rate(SAMPLE_RATE).set_channels(1)
+
+    fd, output_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        audio.export(output_path, format="wav")
+        written = os.path.getsize(output_path)
+        return decode_audio(output_path, sampling_rate=SAMPLE_RATE), written
+    finally:
+        os.remove(output_path)
+
+
+def in_memory(input_path: str) -> tuple[np.ndarray, int]:
+    return load_audio(input_path), 0
+
+
+def make_synthetic_wav(seconds: float, sample_rate: int = 44100) -> str:
+    """말소리 대역(100~3000Hz) 사인파 + 잡음으로 된 스테레오 WAV를 만듭니다."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    tone = sum(np.sin(2 * np.pi * f * t) for f in (180, 440, 1200, 2800)) / 4
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 0.5 * t)
+    signal = 0.2 * tone * envelope + 0.01 * rng.standard_normal(t.size)
+    pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+    stereo = np.repeat(pcm[:, None], 2, axis=1)
+
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(stereo.tobytes())
+    return path
+
+
+def bench(name: str, fn, path: str, repeat: int) -> dict:
+    timings = []
+    written = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        audio, written = fn(path)
+        timings.append(time.perf_counter() - started)
+
+    duration = len(audio) / SAMPLE_RATE
+    return {
+        "method": name,
+        "audio_sec": round(duration, 2),
+        "mean_ms": round(statistics.mean(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "bytes_written": written,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STT 전처리(디코딩/정규화) 벤치마크")
+    parser.add_argument("paths", nargs="*", help="측정할 오디오 파일 경로")
+    parser.add_argument("--synthetic", type=float, default=0, help="합성 음원 길이(초)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    paths = list(args.paths)
+    synthetic = None
+    if args.synthetic or not paths:
+        synthetic = make_synthetic_wav(args.synthetic or 30)
+        paths.append(synthetic)
+
+    try:
+        for path in paths:
+            print(f"\n🎧 {path}")
+            for name, fn in (("file_round_trip", file_round_trip), ("in_memory", in_memory)):
+                res = bench(name, fn, path, args.repeat)
+                print(
+                    f"  {res['method']:<16} audio={res['audio_sec']}s "
+                    f"mean={res['mean_ms']}ms min={res['min_ms']}ms written={res['bytes_written']}B"
+                )
+    finally:
+        if synthetic:
+            os.remove(synthetic)
+
+
+if __name__ == "__main__":
+    main()
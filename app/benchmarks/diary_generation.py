@@ -0,0 +1,88 @@
+"""
+일기 생성 벤치마크: 항목별 3회 호출(본문 → 제목 → 위로) vs 통합 JSON 1회 호출
+
+같은 원문에 대해 두 방식의 일기 1건당 전체 소요 시간과,
+통합 방식에서 개별 호출로 보충(fallback)된 횟수를 출력합니다.
+
+사용법:
+    python -m app.benchmarks.diary_generation
+    python -m app.benchmarks.diary_generation --texts-file data/bench/transcripts.txt --repeat 2
+"""
+import argparse
+import statistics
+import time
+from unittest import mock
+
+from app.services.diary_generation_service import diary_service
+
+SAMPLE_TRANSCRIPTS = [
+    ("뿌듯", "오늘 드디어 몇 달 동안 준비한 자격증 시험에 합격했다. 결과를 확인하는 순간 손이 떨렸는데 "
+            "합격이라는 글자를 보고 나서 그동안 새벽에 일어나 공부했던 시간들이 떠올라서 울컥했다."),
+    ("피로", "아침부터 회의가 연달아 네 개나 있었고 점심도 제대로 못 먹었다. 퇴근하고 집에 오니까 "
+            "아무것도 하기 싫어서 그냥 소파에 누워만 있었다. 내일은 좀 일찍 자야겠다."),
+    ("불안", "다음 주에 이사를 가야 하는데 아직 짐을 하나도 못 쌌다. 새 집 계약서도 다시 봐야 하고 "
+            "회사에 휴가도 말해야 하는데 해야 할 일이 너무 많아서 머리가 복잡하다."),
+]
+
+
+def _per_field(transcript: str, emotion: str):
+    body = diary_service.generate_diary(transcript, emotion)
+    return body, diary_service.generate_title(body), diary_service.generate_advice(transcript, emotion)
+
+
+def _combined(transcript: str, emotion: str, fallbacks: list):
+    # 개별 생성 함수가 호출되면 fallback으로 집계
+    with mock.patch.object(
+        diary_service, "generate_diary", wraps=diary_service.generate_diary
+    ) as body_fn, mock.patch.object(
+        diary_service, "generate_title", wraps=diary_service.generate_title
+    ) as title_fn, mock.patch.object(
+        diary_service, "generate_advice", wraps=diary_service.generate_advice
+    ) as advice_fn:
+        result = diary_service.generate_all(transcript, emotion)
+    fallbacks.append(body_fn.call_count + title_fn.call_count + advice_fn.call_count)
+    return result
+
+
+def _time(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="일기 생성 방식별 소요 시간 비교")
+    parser.add_argument("--texts-file", default=None, help="'감정<TAB>원문' 형식의 줄이 있는 파일")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    samples = SAMPLE_TRANSCRIPTS
+    if args.texts_file:
+        with open(args.texts_file, encoding="utf-8") as f:
+            samples = [tuple(line.rstrip("\n").split("\t", 1)) for line in f if "\t" in line]
+
+    print("⏳ Loading LLM...")
+    diary_service.llm  # 모델 로딩 시간은 측정에서 제외
+
+    per_field_sec, combined_sec, fallbacks = [], [], []
+    for emotion, transcript in samples:
+        per_field_sec.append(_time(lambda: _per_field(transcript, emotion), args.repeat))
+        combined_sec.append(_time(lambda: _combined(transcript, emotion, fallbacks), args.repeat))
+        print(
+            f"  {len(transcript):>4}자  per-field={per_field_sec[-1]:6.1f}s  combined={combined_sec[-1]:6.1f}s "
+            f"({per_field_sec[-1] / combined_sec[-1]:.2f}x)"
+        )
+
+    print(
+        f"\n📊 mean wall time per diary: per-field={statistics.mean(per_field_sec):.1f}s "
+        f"combined={statistics.mean(combined_sec):.1f}s "
+        f"speedup={statistics.mean(per_field_sec) / statistics.mean(combined_sec):.2f}x"
+    )
+    print(f"🔁 combined runs needing per-field fallback calls: {sum(1 for n in fallbacks if n)}/{len(fallbacks)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+감정 분석 백엔드 비교: PyTorch(fp32) vs ONNX Runtime(int8)
+
+1) 정합성: 같은 텍스트에 대해 두 백엔드의 최종 라벨 일치율과 점수 차이를 확인합니다.
+   일치율이 --min-agreement 미만이면 종료 코드 1로 끝납니다. (배포 전 점검용)
+2) 성능: 텍스트당 지연(p50/p95)과 모델 로딩 후 최대 메모리(RSS)를 측정합니다.
+   백엔드마다 새 프로세스에서 실행하므로 RSS가 서로 섞이지 않습니다.
+
+사용법:
+    python -m app.benchmarks.emotion_backends
+    python -m app.benchmarks.emotion_backends --texts-file data/bench/transcripts.txt --min-agreement 0.95
+"""
+import argparse
+import multiprocessing as mp
+import resource
+import statistics
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+from app.benchmarks.emotion_scoring import SAMPLE_TEXTS
+
+
+def _run_backend(backend: str, texts: List[str], repeat: int) -> dict:
+    # 설정은 import 시점에 읽히므로 백엔드를 먼저 지정
+    from app.core.config import settings
+    settings.EMOTION_BACKEND = backend
+
+    from app.services.emotion_service import EMOTION_VERSION, _format_result, _load_emotion_classifier
+
+    started = time.perf_counter()
+    scorer = _load_emotion_classifier()
+    load_sec = time.perf_counter() - started
+    scorer.score(texts[:1])  # 예열
+
+    latencies, scores = [], []
+    for text in texts:
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            row = scorer.score([text])[0]
+            timings.append(time.perf_counter() - t0)
+        latencies.append(statistics.median(timings) * 1000)
+        scores.append(row.tolist())
+
+    return {
+        "backend": type(scorer).__name__,
+        "emotion_version": EMOTION_VERSION,
+        "load_sec": round(load_sec, 2),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 1),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 1),
+        # Linux의 ru_maxrss 단위는 KB
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "scores": scores,
+        "labels": [_format_result(np.array(s))["label"] for s in scores],
+    }
+
+
+def _run_in_subprocess(backend: str, texts: List[str], repeat: int) -> dict:
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(_run_backend, (backend, texts, repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="감정 분석 백엔드(torch vs onnx) 정합성/성능 비교")
+    parser.add_argument("--texts-file", default=None, help="한 줄에 하나씩 텍스트가 있는 파일")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-agreement", type=float, default=0.9, help="허용 최소 라벨 일치율")
+    args = parser.parse_args()
+
+    texts = SAMPLE_TEXTS
+    if args.texts_file:
+        with open(args.texts_file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    results = {}
+    for backend in ("torch", "onnx"):
+        print(f"⏱️ {backend} ...")
+        results[backend] = _run_in_subprocess(backend, texts, args.repeat)
+
+    print(f"\n{'backend':<24}{'load':>8}{'p50':>10}{'p95':>10}{'RSS':>10}")
+    for res in results.values():
+        print(
+            f"{res['backend']:<24}{res['load_sec']:>7}s{res['latency_p50_ms']:>8}ms"
+            f"{res['latency_p95_ms']:>8}ms{res['peak_rss_mb']:>8}MB"
+        )
+
+    torch_res, onnx_res = results["torch"], results["onnx"]
+    agree = sum(a == b for a, b in zip(torch_res["labels"], onnx_res["labels"])) / len(texts)
+    max_diff = float(np.abs(np.array(torch_res["scores"]) - np.array(onnx_res["scores"])).max())
+    print(f"\n✅ label agreement: {agree:.1%}  max |Δscore|: {max_diff:.4f}")
+    for text, a, b in zip(texts, torch_res["labels"], onnx_res["labels"]):
+        if a != b:
+            print(f"   ❗ {a} → {b}: {text[:40]}")
+
+    if agree < args.min_agreement:
+        print(f"❌ Agreement below {args.min_agreement:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
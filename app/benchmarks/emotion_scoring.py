@@ -0,0 +1,87 @@
+"""
+감정 분석 벤치마크: transformers zero-shot pipeline(16회 개별 추론) vs 단일 배치 NLI 엔진
+
+사용법:
+    python -m app.benchmarks.emotion_scoring --repeat 5
+    python -m app.benchmarks.emotion_scoring --texts-file data/bench/transcripts.txt
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from app.services.emotion_engine import NLIZeroShotScorer
+from app.services.emotion_service import (
+    CANDIDATE_LABELS,
+    EMOTION_MODEL_NAME,
+    HYPOTHESIS_TEMPLATE,
+    _format_result,
+)
+
+SAMPLE_TEXTS = [
+    "와, 드디어 해냈다! 진짜 너무 기분 좋아.",
+    "오늘은 햄버거 먹고 빨리 집에 가서 자야겠다.",
+    "내일 여행 간다! 빨리 짐 싸야지.",
+    "아 진짜 아무것도 하기 싫다...",
+    "회의에서 또 내 의견이 무시당했다. 너무 화가 나서 집에 와서도 계속 생각이 난다. "
+    "다음 주에 있을 발표도 걱정되고, 이런 식이면 내가 이 팀에 있어야 하나 싶다.",
+]
+
+
+def _pipeline_scores(classifier, text: str) -> np.ndarray:
+    res = classifier(text, CANDIDATE_LABELS, multi_label=False, hypothesis_template=HYPOTHESIS_TEMPLATE)
+    by_label = dict(zip(res["labels"], res["scores"]))
+    return np.array([by_label[label] for label in CANDIDATE_LABELS])
+
+
+def _time(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="감정 분석 엔진 벤치마크")
+    parser.add_argument("--texts-file", default=None, help="한 줄에 하나씩 텍스트가 있는 파일")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = SAMPLE_TEXTS
+    if args.texts_file:
+        with open(args.texts_file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    from transformers import pipeline
+
+    print("⏳ Loading models...")
+    classifier = pipeline("zero-shot-classification", model=EMOTION_MODEL_NAME, device=-1)
+    scorer = NLIZeroShotScorer(EMOTION_MODEL_NAME, CANDIDATE_LABELS, HYPOTHESIS_TEMPLATE)
+
+    # 예열 (첫 호출 초기화 비용 제외)
+    _pipeline_scores(classifier, texts[0])
+    scorer.score(texts[:1])
+
+    old_ms, new_ms, agree, max_diff = [], [], 0, 0.0
+    for text in texts:
+        old = _pipeline_scores(classifier, text)
+        new = scorer.score([text])[0]
+        agree += _format_result(old)["label"] == _format_result(new)["label"]
+        max_diff = max(max_diff, float(np.abs(old - new).max()))
+
+        old_ms.append(_time(lambda: _pipeline_scores(classifier, text), args.repeat) * 1000)
+        new_ms.append(_time(lambda: scorer.score([text]), args.repeat) * 1000)
+        print(f"  {len(text):>4}자  pipeline={old_ms[-1]:8.1f}ms  engine={new_ms[-1]:8.1f}ms  ({old_ms[-1] / new_ms[-1]:.1f}x)")
+
+    print(
+        f"\n📊 mean per transcript: pipeline={statistics.mean(old_ms):.1f}ms "
+        f"engine={statistics.mean(new_ms):.1f}ms speedup={statistics.mean(old_ms) / statistics.mean(new_ms):.2f}x"
+    )
+    print(f"✅ label agreement: {agree}/{len(texts)}  max |Δscore|: {max_diff:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+STT 실시간 계수(RTF) 벤치마크
+
+설정 조합(모델 크기 × compute_type × beam_size × VAD × 스레드 수)마다 고정 코퍼스를 변환하고
+RTF(처리 시간 / 오디오 길이), p50/p95 지연, 최대 메모리(RSS), 동시 N건 처리량,
+배치 추론(--batch-sizes, 코퍼스를 B개씩 묶어 transcribe_batch_with_model 호출) 처리량을 JSON으로 남깁니다.
+설정마다 새 프로세스에서 실행하므로 최대 RSS가 서로 섞이지 않습니다.
+
+사용법:
+    python -m app.benchmarks.stt_rtf                                  # 합성 코퍼스 + 기본 설정
+    python -m app.benchmarks.stt_rtf --corpus data/bench/my_clips \\
+        --model-sizes medium,small --beam-sizes 5,1 --vad on,off --threads 4,8 --concurrency 1,4
+    python -m app.benchmarks.stt_rtf --batch-sizes 1,4                # 배치 모드 처리량도 측정
+    python -m app.benchmarks.stt_rtf --compare data/bench/a.json data/bench/b.json
+"""
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Tuple
+
+import numpy as np
+
+from app.services.stt_service import SAMPLE_RATE, load_audio, transcribe_batch_with_model, transcribe_with_model
+
+DEFAULT_CORPUS_DIR = "data/bench/corpus"
+DEFAULT_OUTPUT_DIR = "data/bench"
+AUDIO_EXTS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".webm")
+
+# 합성 코퍼스: (파일명, 길이(초), 문장) — 길이가 다양한 고정 세트
+SYNTHETIC_CLIPS = [
+    ("short_05s", 5, "오늘은 날씨가 정말 좋았다."),
+    ("mid_15s", 15, "아침에 일어나서 산책을 하고, 점심에는 친구와 맛있는 파스타를 먹었다."),
+    ("mid_30s", 30, "회사에서 발표가 있었는데 생각보다 떨려서 말을 더듬었다. 그래도 끝까지 해냈다."),
+    ("long_60s", 60, "요즘 잠을 잘 못 자서 피곤하다. 주말에는 아무 계획 없이 푹 쉬고 싶다."),
+    ("long_120s", 120, "내일 여행을 떠난다. 짐을 싸면서 설레는 마음에 자꾸 웃음이 난다."),
+]
+
+
+# ==========================================
+# 1. 코퍼스 준비
+# ==========================================
+def _write_wav(path: str, pcm: np.ndarray) -> None:
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.astype(np.int16).tobytes())
+
+
+def _speechlike_signal(seconds: float, seed: int) -> np.ndarray:
+    """TTS가 없을 때 쓰는 말소리 유사 신호 (음절 단위로 on/off 되는 포먼트 + 잡음)"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.3 * t)
+    voice = sum(np.sin(2 * np.pi * k * pitch * t) / k for k in range(1, 6))
+    syllables = (np.sin(2 * np.pi * 4 * t) > -0.2).astype(float)
+    pauses = (np.sin(2 * np.pi * 0.25 * t) > -0.7).astype(float)
+    signal = 0.15 * voice * syllables * pauses + 0.005 * rng.standard_normal(t.size)
+    return np.clip(signal, -1, 1) * 32767
+
+
+def build_synthetic_corpus(corpus_dir: str) -> None:
+    """
+    고정 한국어 문장으로 코퍼스를 생성합니다.
+    espeak-ng가 있으면 한국어 TTS로, 없으면 말소리 유사 신호로 만듭니다. (이미 있으면 재사용)
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    has_tts = shutil.which("espeak-ng") is not None
+
+    for seed, (name, seconds, sentence) in enumerate(SYNTHETIC_CLIPS):
+        path = os.path.join(corpus_dir, f"{name}.wav")
+        if os.path.exists(path):
+            continue
+
+        if has_tts:
+            # 문장을 반복해서 목표 길이에 가깝게 맞춤 (대략 초당 4음절)
+            text = " ".join([sentence] * max(1, int(seconds * 4 / len(sentence)) + 1))
+            raw = path + ".raw.wav"
+            subprocess.run(["espeak-ng", "-v", "ko", "-w", raw, text], check=True)
+            audio = load_audio(raw)[: int(seconds * SAMPLE_RATE)]
+            os.remove(raw)
+            _write_wav(path, audio * 32767)
+        else:
+            _write_wav(path, _speechlike_signal(seconds, seed))
+
+
+def load_corpus(corpus_dir: str) -> List[dict]:
+    clips = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.lower().endswith(AUDIO_EXTS):
+            audio = load_audio(os.path.join(corpus_dir, name))
+            clips.append({"name": name, "audio": audio, "duration_sec": len(audio) / SAMPLE_RATE})
+    return clips
+
+
+# ==========================================
+# 2. 설정 하나 측정 (별도 프로세스에서 실행)
+# ==========================================
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def _run_config(
+    config: dict, corpus_dir: str, concurrency: List[int], repeat: int, batch_sizes: List[int]
+) -> dict:
+    from faster_whisper import WhisperModel
+
+    clips = load_corpus(corpus_dir)
+    started = time.perf_counter()
+    model = WhisperModel(
+        config["model_size"],
+        device="cpu",
+        compute_type=config["compute_type"],
+        cpu_threads=config["cpu_threads"],
+        num_workers=max(concurrency),
+    )
+    load_sec = time.perf_counter() - started
+
+    def _transcribe(clip: dict) -> Tuple[float, str]:
+        """(소요 시간, 결과) — 결과는 "ok" / "empty"(빈 텍스트) / "error"(예외)"""
+        t0 = time.perf_counter()
+        try:
+            text = transcribe_with_model(
+                model, clip["audio"], beam_size=config["beam_size"], vad_filter=config["vad_filter"]
+            )
+            outcome = "ok" if text else "empty"
+        except Exception as e:
+            print(f"   ❌ {clip['name']}: {e}")
+            outcome = "error"
+        return time.perf_counter() - t0, outcome
+
+    # 첫 호출의 초기화 비용이 결과에 섞이지 않도록 한 번 예열
+    _transcribe(clips[0])
+
+    # 단건 지연/RTF (실패/빈 결과는 지연 통계에서 제외하고 개수만 기록)
+    per_clip = []
+    latencies, rtfs = [], []
+    errors = empty = 0
+    for clip in clips:
+        runs = [_transcribe(clip) for _ in range(repeat)]
+        errors += sum(1 for _, outcome in runs if outcome == "error")
+        empty += sum(1 for _, outcome in runs if outcome == "empty")
+        ok = [elapsed for elapsed, outcome in runs if outcome == "ok"]
+        entry = {"clip": clip["name"], "duration_sec": round(clip["duration_sec"], 2), "ok_runs": len(ok)}
+        if ok:
+            elapsed = statistics.median(ok)
+            latencies.append(elapsed)
+            rtfs.append(elapsed / clip["duration_sec"])
+            entry.update(latency_sec=round(elapsed, 3), rtf=round(elapsed / clip["duration_sec"], 4))
+        per_clip.append(entry)
+
+    # 동시 N건 처리량 (코퍼스 전체를 N개 스레드로 동시에 제출)
+    throughput = []
+    total_audio = sum(c["duration_sec"] for c in clips)
+    for n in concurrency:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            outcomes = [outcome for _, outcome in pool.map(_transcribe, clips)]
+        wall = time.perf_counter() - t0
+        throughput.append({
+            "concurrency": n,
+            "wall_sec": round(wall, 3),
+            "jobs_per_sec": round(len(clips) / wall, 4),
+            "audio_sec_per_sec": round(total_audio / wall, 3),
+            "errors": outcomes.count("error"),
+            "empty_outputs": outcomes.count("empty"),
+        })
+
+    # 배치 추론 처리량 (코퍼스를 B개씩 묶어 BatchedInferencePipeline 한 번으로 변환)
+    batched = []
+    for size in batch_sizes:
+        t0 = time.perf_counter()
+        texts, batch_errors = [], 0
+        for i in range(0, len(clips), size):
+            group = clips[i:i + size]
+            try:
+                texts += transcribe_batch_with_model(
+                    model, [c["audio"] for c in group], beam_size=config["beam_size"]
+                )
+            except Exception as e:
+                print(f"   ❌ batch{size}: {e}")
+                batch_errors += len(group)
+        wall = time.perf_counter() - t0
+        batched.append({
+            "batch_size": size,
+            "wall_sec": round(wall, 3),
+            "audio_sec_per_sec": round(total_audio / wall, 3),
+            "errors": batch_errors,
+            # 단건 변환은 텍스트가 나오는데 배치 결과가 비면 구간 분배(clip_timestamps) 문제를 의심
+            "empty_outputs": sum(1 for t in texts if not t),
+        })
+
+    return {
+        "config": config,
+        "model_load_sec": round(load_sec, 2),
+        # 성공한 실행만 집계 (전부 실패하면 None)
+        "rtf_mean": round(statistics.mean(rtfs), 4) if rtfs else None,
+        "latency_p50_sec": round(_percentile(latencies, 50), 3),
+        "latency_p95_sec": round(_percentile(latencies, 95), 3),
+        "errors": errors,
+        "empty_outputs": empty,
+        # Linux의 ru_maxrss 단위는 KB
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "throughput": throughput,
+        "batched": batched,
+        "clips": per_clip,
+    }
+
+
+def _run_config_in_subprocess(
+    config: dict, corpus_dir: str, concurrency: List[int], repeat: int, batch_sizes: List[int]
+) -> dict:
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(_run_config, (config, corpus_dir, concurrency, repeat, batch_sizes))
+
+
+# ==========================================
+# 3. 실행 / 비교
+# ==========================================
+def _csv(value: str, cast=str) -> list:
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def compare(paths: List[str]) -> None:
+    """두 개 이상의 결과 JSON을 설정별로 나란히 출력합니다."""
+    print(f"{'config':<40}" + "".join(f"{os.path.basename(p):>24}" for p in paths))
+    runs = [json.load(open(p, encoding="utf-8")) for p in paths]
+    keys = sorted({r["key"] for run in runs for r in run["results"]})
+    for key in keys:
+        row = f"{key:<40}"
+        for run in runs:
+            match = next((r for r in run["results"] if r["key"] == key), None)
+            if match is None or match["rtf_mean"] is None:
+                row += f"{'-':>24}"
+            else:
+                row += f"{'rtf=%.3f p95=%.1fs' % (match['rtf_mean'], match['latency_p95_sec']):>24}"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STT 실시간 계수(RTF) 벤치마크")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS_DIR, help="오디오 코퍼스 디렉터리 (없으면 합성)")
+    parser.add_argument("--model-sizes", default="medium")
+    parser.add_argument("--compute-types", default="int8")
+    parser.add_argument("--beam-sizes", default="5")
+    parser.add_argument("--vad", default="on", help="on,off")
+    parser.add_argument("--threads", default="0", help="cpu_threads 목록 (0 = 기본값)")
+    parser.add_argument("--concurrency", default="1", help="동시 처리 건수 목록")
+    parser.add_argument("--batch-sizes", default="", help="배치 추론 크기 목록 (비우면 측정 안 함)")
+    parser.add_argument("--repeat", type=int, default=1, help="클립별 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로")
+    parser.add_argument("--compare", nargs="+", default=None, help="결과 JSON 비교만 수행")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+
+    if not os.path.isdir(args.corpus) or not os.listdir(args.corpus):
+        print(f"🧪 Building synthetic corpus in {args.corpus} ...")
+        build_synthetic_corpus(args.corpus)
+
+    concurrency = _csv(args.concurrency, int)
+    grid = itertools.product(
+        _csv(args.model_sizes),
+        _csv(args.compute_types),
+        _csv(args.beam_sizes, int),
+        [v == "on" for v in _csv(args.vad)],
+        _csv(args.threads, int),
+    )
+
+    results = []
+    for model_size, compute_type, beam_size, vad_filter, cpu_threads in grid:
+        config = {
+            "model_size": model_size,
+            "compute_type": compute_type,
+            "beam_size": beam_size,
+            "vad_filter": vad_filter,
+            "cpu_threads": cpu_threads,
+        }
+        key = f"{model_size}/{compute_type}/b{beam_size}/vad-{'on' if vad_filter else 'off'}/t{cpu_threads}"
+        print(f"⏱️ {key} ...")
+        res = _run_config_in_subprocess(config, args.corpus, concurrency, args.repeat, _csv(args.batch_sizes, int))
+        res["key"] = key
+        results.append(res)
+        print(
+            f"   rtf={res['rtf_mean']} p50={res['latency_p50_sec']}s p95={res['latency_p95_sec']}s "
+            f"errors={res['errors']} empty={res['empty_outputs']} rss={res['peak_rss_mb']}MB "
+            + " ".join(f"x{t['concurrency']}={t['audio_sec_per_sec']}audio-s/s" for t in res["throughput"])
+            + "".join(
+                f" batch{b['batch_size']}={b['audio_sec_per_sec']}audio-s/s(empty={b['empty_outputs']})"
+                for b in res["batched"]
+            )
+        )
+
+    output = args.output or os.path.join(
+        DEFAULT_OUTPUT_DIR, f"stt_rtf-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "host": {"platform": platform.platform(), "cpu_count": os.cpu_count()},
+                "corpus": args.corpus,
+                "results": results,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    print(f"\n📄 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
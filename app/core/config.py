@@ -29,6 +29,8 @@ class Settings:
     # 🚨 주의: 배포 시에는 반드시 .env에서 변경해야 함
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "vench-hackathon-secret-key-2024")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 1일 (해커톤용)
+    # 관리자 API(X-Admin-Token 헤더) 토큰 (비어 있으면 관리자 API 비활성화)
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
 
     # 3. 데이터베이스 (Database)
     # .env 파일의 DATABASE_URL이 없으면 로컬 기본값 사용
@@ -48,6 +50,149 @@ class Settings:
         "*",                     # 개발 편의상 전체 허용 (주의)
     ]
 
+    # 5-1. 음성 업로드 제한
+    UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))  # 50MB
+    UPLOAD_MAX_DURATION_SEC: float = float(os.getenv("UPLOAD_MAX_DURATION_SEC", "1800"))  # 30분
+
+    # 6. AI 모델 로딩
+    # 분석 파이프라인 버전 (같은 음성 + 같은 버전이면 이전 분석 결과를 재사용)
+    MODEL_VERSION: str = os.getenv("MODEL_VERSION", "v1.0")
+    # 서버 시작 시 백그라운드에서 모델을 미리 로딩할지 여부 (false면 첫 요청 시 로딩)
+    MODEL_WARMUP_ON_STARTUP: bool = os.getenv("MODEL_WARMUP_ON_STARTUP", "true").lower() == "true"
+
+    # 7. STT (Faster-Whisper) 워커 풀
+    STT_MODEL_SIZE: str = os.getenv("STT_MODEL_SIZE", "medium")
+    STT_COMPUTE_TYPE: str = os.getenv("STT_COMPUTE_TYPE", "int8")
+    # 워커 프로세스 수 (0이면 API 프로세스 안에서 직접 추론)
+    STT_POOL_SIZE: int = int(os.getenv("STT_POOL_SIZE", "1"))
+    # 워커당 CTranslate2 스레드 수 (0이면 코어 수 / 워커 수로 자동 계산)
+    STT_CPU_THREADS: int = int(os.getenv("STT_CPU_THREADS", "0"))
+    # 워커당 동시 추론 수 (faster-whisper num_workers)
+    STT_NUM_WORKERS: int = int(os.getenv("STT_NUM_WORKERS", "1"))
+    # 처리 중인 작업 외에 대기열에 쌓아둘 수 있는 최대 작업 수
+    STT_QUEUE_SIZE: int = int(os.getenv("STT_QUEUE_SIZE", "8"))
+    # 대기열이 가득 찼을 때 빈 자리를 기다리는 최대 시간(초)
+    STT_SUBMIT_TIMEOUT_SEC: float = float(os.getenv("STT_SUBMIT_TIMEOUT_SEC", "30"))
+    # 이 길이(초) 이상의 녹음은 무음 경계로 분할해 병렬 변환 (긴 녹음 모드)
+    STT_LONG_AUDIO_SEC: float = float(os.getenv("STT_LONG_AUDIO_SEC", "120"))
+    # 긴 녹음 모드에서 청크 하나의 최대 길이(초)
+    STT_CHUNK_SEC: float = float(os.getenv("STT_CHUNK_SEC", "60"))
+    # STT 부분 결과를 DB에 기록하는 최소 간격(초)
+    STT_PROGRESS_INTERVAL_SEC: float = float(os.getenv("STT_PROGRESS_INTERVAL_SEC", "2"))
+    # 기본 빔 너비 (STT_MODEL_SIZE와 함께 최고 정확도 티어를 구성)
+    STT_BEAM_SIZE: int = int(os.getenv("STT_BEAM_SIZE", "5"))
+
+    # 8. STT 적응형 티어 (부하 시 더 가벼운 모델/빔으로 자동 전환)
+    STT_ADAPTIVE_TIER: bool = os.getenv("STT_ADAPTIVE_TIER", "false").lower() == "true"
+    # 전환 후보 티어 ("모델크기:빔너비", 정확도 높은 순서)
+    STT_TIERS: str = os.getenv("STT_TIERS", "medium:5,small:2,tiny:1")
+    # STT 단계 목표 지연 시간(초)
+    STT_LATENCY_SLO_SEC: float = float(os.getenv("STT_LATENCY_SLO_SEC", "60"))
+
+    # 9. STT 배치 추론 (대기 중인 업로드를 모아서 한 번에 변환)
+    # 한 배치에 묶을 최대 업로드 수 (1이면 배치 비활성화)
+    STT_BATCH_MAX_SIZE: int = int(os.getenv("STT_BATCH_MAX_SIZE", "1"))
+    # 첫 작업 도착 후 다음 작업을 기다리는 최대 시간(ms)
+    STT_BATCH_WINDOW_MS: int = int(os.getenv("STT_BATCH_WINDOW_MS", "200"))
+
+    # 10. 감정 분석 추론 백엔드 (torch | onnx)
+    # onnx: 첫 로딩 시 ONNX로 내보내고 int8 동적 양자화 (onnxruntime 필요)
+    EMOTION_BACKEND: str = os.getenv("EMOTION_BACKEND", "torch").lower()
+    # ONNX 변환/양자화 결과 저장 경로
+    EMOTION_ONNX_DIR: str = os.getenv("EMOTION_ONNX_DIR", "data/models/emotion-onnx")
+    # ONNX Runtime intra-op 스레드 수 (0이면 기본값)
+    EMOTION_ONNX_THREADS: int = int(os.getenv("EMOTION_ONNX_THREADS", "0"))
+
+    # 긴 텍스트를 문장 단위로 묶어 분류할 때 창 하나의 최대 토큰 수
+    EMOTION_WINDOW_TOKENS: int = int(os.getenv("EMOTION_WINDOW_TOKENS", "256"))
+
+    # 경량 감정 헤드 빠른 경로 (python -m app.services.emotion_distill 로 학습)
+    EMOTION_FAST_PATH: bool = os.getenv("EMOTION_FAST_PATH", "false").lower() == "true"
+    EMOTION_HEAD_PATH: str = os.getenv("EMOTION_HEAD_PATH", "data/models/emotion_head.npz")
+    # 헤드의 최고 확률이 이 값 이상이면 NLI 추론을 생략
+    EMOTION_FAST_PATH_THRESHOLD: float = float(os.getenv("EMOTION_FAST_PATH_THRESHOLD", "0.8"))
+
+    # 11. 감정 재분석 (백필)
+    # 한 번에 DB에서 읽어올 일기 수 (id 기준 keyset 페이지)
+    EMOTION_BACKFILL_PAGE_SIZE: int = int(os.getenv("EMOTION_BACKFILL_PAGE_SIZE", "256"))
+    # 한 번의 추론에 넣을 (전제, 가설) 쌍 수 (텍스트 1건 = 후보 라벨 16쌍)
+    EMOTION_BACKFILL_BATCH_PAIRS: int = int(os.getenv("EMOTION_BACKFILL_BATCH_PAIRS", "512"))
+    # 중단 후 이어서 실행하기 위한 체크포인트 파일 경로
+    EMOTION_BACKFILL_CHECKPOINT: str = os.getenv(
+        "EMOTION_BACKFILL_CHECKPOINT", "data/checkpoints/emotion_backfill.json"
+    )
+
+    # 12. LLM (EXAONE) 일기 생성
+    # Llama 인스턴스 수 (인스턴스마다 요청 1개씩 동시 실행, 가중치는 mmap으로 공유)
+    LLM_INSTANCES: int = int(os.getenv("LLM_INSTANCES", "1"))
+    # 워커 프로세스별 실행 대기 중인 LLM 요청 최대 수 (가득 차면 LLMQueueFullError → 작업 재시도)
+    LLM_QUEUE_SIZE: int = int(os.getenv("LLM_QUEUE_SIZE", "16"))
+    # 새 일기(INTERACTIVE) 요청이 대기할 수 있는 최대 시간(초, 0이면 무제한)
+    # (넘기면 분석 작업이 실패 처리되어 작업 대기열의 backoff 후 재시도)
+    LLM_DEADLINE_SEC: float = float(os.getenv("LLM_DEADLINE_SEC", "600"))
+    # 본문/제목/위로 메시지를 한 번의 JSON completion으로 생성 (실패 시 항목별 개별 생성)
+    LLM_COMBINED_GENERATION: bool = os.getenv("LLM_COMBINED_GENERATION", "false").lower() == "true"
+    # 고정 시스템 프롬프트의 KV 상태를 미리 계산해 재사용 (사용자 메시지 부분만 평가)
+    LLM_PREFIX_CACHE: bool = os.getenv("LLM_PREFIX_CACHE", "true").lower() == "true"
+    # 보관할 시스템 프롬프트 KV 상태 수 (프롬프트가 바뀌면 오래된 것부터 제거)
+    LLM_PREFIX_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_PREFIX_CACHE_MAX_ENTRIES", "8"))
+    # GBNF 문법으로 출력 형식 강제 (제목: 한글 한 줄 20자 이내 / 위로: 3문장 이내 / 본문: 한자 금지)
+    LLM_GRAMMAR: bool = os.getenv("LLM_GRAMMAR", "false").lower() == "true"
+    # 추측 디코딩: off / prompt_lookup(원문 n-gram으로 제안) / draft(작은 GGUF 모델로 제안)
+    LLM_SPECULATIVE: str = os.getenv("LLM_SPECULATIVE", "off").lower()
+    # 한 번에 제안할 draft 토큰 수
+    LLM_DRAFT_NUM_TOKENS: int = int(os.getenv("LLM_DRAFT_NUM_TOKENS", "10"))
+    # LLM_SPECULATIVE=draft일 때 사용할 draft GGUF 경로 (본 모델과 같은 토크나이저여야 함)
+    LLM_DRAFT_MODEL_PATH: str = os.getenv("LLM_DRAFT_MODEL_PATH", "")
+    # LLM 컨텍스트 길이(토큰) - 프롬프트 + 생성 토큰이 이 안에 들어가도록 max_tokens를 조정
+    LLM_CONTEXT_TOKENS: int = int(os.getenv("LLM_CONTEXT_TOKENS", "4096"))
+    # 본문 생성 max_tokens 상한 (원문 토큰 수에 비례해 정하되 이 값을 넘지 않음)
+    LLM_BODY_MAX_TOKENS: int = int(os.getenv("LLM_BODY_MAX_TOKENS", "800"))
+    # 원문이 이 토큰 수를 넘으면 구간별 요약(map) → 요약을 합쳐 생성(reduce)
+    LLM_MAP_REDUCE_THRESHOLD_TOKENS: int = int(os.getenv("LLM_MAP_REDUCE_THRESHOLD_TOKENS", "1500"))
+    # map 단계 구간 크기(토큰)
+    LLM_MAP_CHUNK_TOKENS: int = int(os.getenv("LLM_MAP_CHUNK_TOKENS", "1000"))
+    # reduce 단계 입력(구간 요약 전체)의 토큰 예산 - 구간 수로 나눠 구간별 요약 길이를 정함
+    LLM_MAP_SUMMARY_TOKENS: int = int(os.getenv("LLM_MAP_SUMMARY_TOKENS", "1200"))
+
+    # 13. 작업 대기열 (DB jobs 테이블 + 워커: python -m app.worker)
+    # 작업 임대 시간(초) - 워커가 heartbeat 없이 이 시간이 지나면 다른 워커가 회수
+    JOB_LEASE_SEC: int = int(os.getenv("JOB_LEASE_SEC", "120"))
+    # 임대 연장 주기(초)
+    JOB_HEARTBEAT_SEC: int = int(os.getenv("JOB_HEARTBEAT_SEC", "30"))
+    # 최대 시도 횟수 (넘으면 DEAD로 옮기고 일기를 FAILED로 표시)
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    # 재시도 대기 시간(초): base * 2^(시도-1), max 상한
+    JOB_RETRY_BASE_SEC: float = float(os.getenv("JOB_RETRY_BASE_SEC", "10"))
+    JOB_RETRY_MAX_SEC: float = float(os.getenv("JOB_RETRY_MAX_SEC", "600"))
+    # 대기 작업이 없을 때 폴링 간격(초)
+    JOB_POLL_INTERVAL_SEC: float = float(os.getenv("JOB_POLL_INTERVAL_SEC", "1.0"))
+    # API 프로세스 안에서 돌릴 워커 스레드 수 (0이면 별도 워커 프로세스만 사용)
+    JOB_INLINE_WORKERS: int = int(os.getenv("JOB_INLINE_WORKERS", "1"))
+    # 대기 작업이 이 수 이상이면 새 업로드를 429로 거절 (0이면 제한 없음)
+    JOB_MAX_PENDING: int = int(os.getenv("JOB_MAX_PENDING", "100"))
+
+    # 14. 일기 분석 파이프라인 (단계 DAG)
+    # 서로 독립적인 단계(감정 분류 ↔ 본문 생성, 제목 ↔ 위로 메시지)를 동시에 실행 (false면 순서대로)
+    PIPELINE_CONCURRENT: bool = os.getenv("PIPELINE_CONCURRENT", "true").lower() == "true"
+    # 감정 분류 단계 스레드 수 / LLM 생성 단계 스레드 수 (LLM 실행 자체는 스케줄러가 제한)
+    PIPELINE_CPU_THREADS: int = int(os.getenv("PIPELINE_CPU_THREADS", "1"))
+    PIPELINE_LLM_THREADS: int = int(os.getenv("PIPELINE_LLM_THREADS", "4"))
+    # STT 단계 스레드 수 (기본: STT 워커 수 x 배치 크기 → 풀이 동시에 처리할 수 있는 만큼만 제출해
+    # STT 대기열을 넘치게(STTQueueFullError) 하지 않으면서 배치를 채울 수 있음)
+    PIPELINE_STT_THREADS: int = int(os.getenv(
+        "PIPELINE_STT_THREADS", str(max(1, STT_POOL_SIZE) * max(1, STT_BATCH_MAX_SIZE))
+    ))
+
+    # 15. 생성 스트림(SSE) 릴레이 (DB 경유, 별도 워커 프로세스에서 처리 중인 일기도 스트리밍)
+    STREAM_RELAY: bool = os.getenv("STREAM_RELAY", "true").lower() == "true"
+    # 이벤트를 모아서 기록하는 간격(ms, 구독 측 폴링 간격도 동일)
+    STREAM_RELAY_FLUSH_MS: int = int(os.getenv("STREAM_RELAY_FLUSH_MS", "250"))
+    # 이벤트 행 보관 시간(초)
+    STREAM_RELAY_RETENTION_SEC: float = float(os.getenv("STREAM_RELAY_RETENTION_SEC", "600"))
+    # 새 이벤트 없이 이 시간(초)이 지나면 구독 종료 (작업 중단 등)
+    STREAM_RELAY_IDLE_SEC: float = float(os.getenv("STREAM_RELAY_IDLE_SEC", "120"))
+
     def to_dict(self):
         """
         클래스의 속성들을 딕셔너리로 변환 (Masking 처리를 위해 분리)
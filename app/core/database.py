@@ -6,7 +6,10 @@ from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
 # 2. 엔진 생성
-engine = create_engine(settings.DATABASE_URL)
+# SQLite(로컬/테스트)는 API 스레드와 작업 워커 스레드가 연결을 공유하므로 스레드 검사를 끄고,
+# 동시 쓰기 시 잠금이 풀릴 때까지 기다림
+connect_args = {"check_same_thread": False, "timeout": 30} if settings.DATABASE_URL.startswith("sqlite") else {}
+engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
 
 # 3. 세션 팩토리 생성 (Transaction Scope 관리)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
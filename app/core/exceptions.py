@@ -81,4 +81,65 @@ class AnalysisFailedException(BusinessException):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             code="DIARY_ANALYSIS_FAILED",
             message="AI 분석 중 오류가 발생했습니다."
-        )
\ No newline at end of file
+        )
+
+class AudioTooLargeException(BusinessException):
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            code="DIARY_AUDIO_TOO_LARGE",
+            message=f"음성 파일은 최대 {max_bytes // (1024 * 1024)}MB까지 업로드할 수 있습니다.",
+            log_message=f"Upload exceeded {max_bytes} bytes"
+        )
+
+class AudioTooLongException(BusinessException):
+    def __init__(self, duration_sec: float, max_sec: float):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            code="DIARY_AUDIO_TOO_LONG",
+            message=f"음성은 최대 {int(max_sec // 60)}분까지 업로드할 수 있습니다.",
+            log_message=f"Upload duration {duration_sec:.1f}s exceeded {max_sec}s"
+        )
+
+class UnsupportedAudioFormatException(BusinessException):
+    def __init__(self, filename: str = ""):
+        super().__init__(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            code="DIARY_UNSUPPORTED_AUDIO",
+            message="지원하지 않는 오디오 형식입니다.",
+            log_message=f"Rejected non-audio upload: {filename}"
+        )
+
+class BackfillAlreadyRunningException(BusinessException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            code="DIARY_BACKFILL_RUNNING",
+            message="감정 재분석 작업이 이미 실행 중입니다."
+        )
+
+class ReprocessAlreadyRunningException(BusinessException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            code="DIARY_REPROCESS_RUNNING",
+            message="일괄 재처리 작업이 이미 실행 중입니다."
+        )
+
+class DiaryAlreadyProcessingException(BusinessException):
+    def __init__(self, diary_id: int):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            code="DIARY_ALREADY_PROCESSING",
+            message="이미 분석 중인 일기입니다.",
+            log_message=f"Diary {diary_id} already has an active analysis job"
+        )
+
+class AnalysisQueueFullException(BusinessException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            code="DIARY_QUEUE_FULL",
+            message="지금은 분석 요청이 많아요. 잠시 후 다시 시도해주세요.",
+            log_message="Job queue is backlogged, rejected new diary upload"
+        )
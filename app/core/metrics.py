@@ -1,4 +1,4 @@
-from prometheus_client import Gauge
+from prometheus_client import Counter, Gauge, Histogram
 
 # 1. 총 사용자 수 (Total Users)
 # 예: vench_total_users 120
@@ -11,3 +11,109 @@ TOTAL_DIARIES = Gauge("vench_total_diaries", "Total number of diaries created")
 # 3. 감정별 일기 수 (Emotion Distribution)
 # 예: vench_emotion_count{label="기쁨"} 30
 EMOTION_COUNT = Gauge("vench_emotion_count", "Number of diaries by emotion", ["label"])
+
+# 4. AI 모델 로딩 상태 (Model Readiness)
+# 예: vench_model_ready{model="stt"} 1
+MODEL_READY = Gauge("vench_model_ready", "Whether each AI model is loaded (1) or not (0)", ["model"])
+
+# 5. STT 워커 풀 대기열 (처리 중 + 대기 중인 작업 수)
+# 예: vench_stt_queue_depth 3
+STT_QUEUE_DEPTH = Gauge("vench_stt_queue_depth", "Number of STT jobs running or waiting in the worker pool")
+
+# 6. 동일 음성 재업로드 시 분석 결과 캐시 적중 여부
+# 예: vench_diary_cache_total{result="hit"} 12 (partial: 일부 단계 버전이 바뀌어 그 단계부터 재실행)
+DIARY_CACHE = Counter("vench_diary_cache", "Diary uploads served from the content-hash result cache", ["result"])
+
+# 7. STT 티어별 처리 건수 (적응형 티어 선택 결과)
+# 예: vench_stt_tier_total{tier="stt-small-b2"} 4
+STT_TIER = Counter("vench_stt_tier", "STT requests by selected model tier", ["tier"])
+
+# 8. STT 배치 추론 시 한 배치에 묶인 업로드 수
+# 예: vench_stt_batch_size_bucket{le="4"} 10
+STT_BATCH_SIZE = Histogram(
+    "vench_stt_batch_size",
+    "Number of uploads transcribed together in one batched Whisper call",
+    buckets=(1, 2, 4, 8, 16, 32),
+)
+
+# 9. 감정 재분석(백필)으로 다시 분류된 일기 수
+# 예: vench_emotion_backfill_rows_total 1200
+EMOTION_BACKFILL_ROWS = Counter("vench_emotion_backfill_rows", "Diaries re-scored by the emotion backfill job")
+
+# 10. 감정 분석 경량 헤드 빠른 경로 적중 여부 / 경로별 텍스트당 지연 / 절약한 추론 시간
+# 예: vench_emotion_fast_path_total{result="hit"} 42
+EMOTION_FAST_PATH = Counter("vench_emotion_fast_path", "Emotion requests answered by the distilled head", ["result"])
+EMOTION_LATENCY = Histogram(
+    "vench_emotion_latency_seconds",
+    "Emotion classification latency per text",
+    ["path"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+EMOTION_FAST_PATH_SAVED = Counter(
+    "vench_emotion_fast_path_saved_seconds",
+    "Estimated NLI inference time saved by the distilled head fast path",
+)
+
+# 11. LLM 시스템 프롬프트 KV 캐시 적중 여부
+# 예: vench_llm_prefix_cache_total{prompt="advice",result="hit"} 30
+LLM_PREFIX_CACHE = Counter("vench_llm_prefix_cache", "LLM system-prompt KV state cache lookups", ["prompt", "result"])
+
+# 12. LLM 스케줄러 대기열 (우선순위별 대기 중인 요청 수 / 실행까지 대기 시간)
+# 예: vench_llm_queue_depth{priority="interactive"} 2
+LLM_QUEUE_DEPTH = Gauge("vench_llm_queue_depth", "LLM requests waiting for a model instance", ["priority"])
+LLM_QUEUE_WAIT = Histogram(
+    "vench_llm_queue_wait_seconds",
+    "Time LLM requests spent queued before running",
+    ["priority"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600),
+)
+
+# 13. LLM 추측 디코딩 토큰 수(제안/채택)와 출력 종류별 디코딩 속도
+# 예: 채택률 = rate(vench_llm_draft_tokens_total{result="accepted"}) / rate(vench_llm_draft_tokens_total{result="proposed"})
+LLM_DRAFT_TOKENS = Counter("vench_llm_draft_tokens", "Speculative decoding draft tokens", ["output", "result"])
+LLM_TOKENS_PER_SEC = Histogram(
+    "vench_llm_tokens_per_second",
+    "LLM decoding speed after the first token",
+    ["output"],
+    buckets=(1, 2, 5, 10, 15, 20, 30, 50, 100),
+)
+
+# 14. LLM 프롬프트 길이(토큰)와 긴 원문 map-reduce 구간 수
+# 예: vench_llm_map_reduce_chunks_count 3
+LLM_PROMPT_TOKENS = Histogram(
+    "vench_llm_prompt_tokens",
+    "Transcript tokens sent to the LLM per output type",
+    ["output"],
+    buckets=(64, 128, 256, 512, 1024, 1500, 2048, 3072, 4096),
+)
+LLM_MAP_REDUCE_CHUNKS = Histogram(
+    "vench_llm_map_reduce_chunks",
+    "Chunks summarized per long transcript",
+    buckets=(2, 3, 4, 6, 8, 12, 16, 24, 32),
+)
+
+# 15. DB 작업 대기열 (작업 종류별 이벤트 / 실행 가능 시점부터 임대까지 대기 시간 / 상태별 작업 수)
+# 예: vench_job_events_total{kind="diary.process",event="retried"} 2
+JOB_EVENTS = Counter("vench_job_events", "Job queue lifecycle events", ["kind", "event"])
+JOB_QUEUE_LATENCY = Histogram(
+    "vench_job_queue_latency_seconds",
+    "Time jobs waited between becoming runnable and being claimed",
+    ["kind"],
+    buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600),
+)
+JOB_COUNT = Gauge("vench_job_count", "Jobs in the queue table by status", ["status"])
+
+# 16. 일기 분석 파이프라인 단계별 / 전체 소요 시간 (단계 합 대비 전체 시간 = 동시 실행 효과)
+# 예: vench_pipeline_stage_seconds_sum{stage="emotion"} 12.3
+PIPELINE_STAGE_SECONDS = Histogram(
+    "vench_pipeline_stage_seconds",
+    "Diary pipeline stage duration",
+    ["stage"],
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300, 600),
+)
+PIPELINE_SECONDS = Histogram(
+    "vench_pipeline_seconds",
+    "Diary pipeline wall-clock duration",
+    ["pipeline"],
+    buckets=(5, 10, 20, 30, 60, 120, 300, 600, 1200),
+)
@@ -0,0 +1,61 @@
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.core.database import Base
+
+logger = logging.getLogger("Vench.Migrations")
+
+# ==========================================
+# 기존 테이블에 나중에 추가된 컬럼 (테이블, 컬럼)
+# ==========================================
+# create_all은 없는 테이블만 만들고 이미 있는 테이블에는 컬럼을 추가하지 않으므로,
+# 모델에 컬럼을 추가할 때 여기에도 등록합니다. (타입/인덱스는 모델 정의를 그대로 사용)
+ADDED_COLUMNS: List[Tuple[str, str]] = [
+    ("diaries", "progress"),
+    ("diaries", "audio_hash"),
+    ("diaries", "emotion_version"),
+    ("diaries", "emotion_timeline"),
+    ("diaries", "stage_versions"),
+    ("jobs", "active_key"),
+]
+
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """
+    ADDED_COLUMNS 중 DB에 없는 컬럼을 ALTER TABLE ... ADD COLUMN으로 추가하고, 컬럼 인덱스도 만듭니다.
+    이미 있는 컬럼/인덱스는 건너뛰므로 기동할 때마다 호출해도 됩니다. (create_all 이후에 호출)
+    추가한 "테이블.컬럼" 목록을 반환합니다.
+    """
+    preparer = engine.dialect.identifier_preparer
+    added = []
+    for table_name, column_name in ADDED_COLUMNS:
+        table = Base.metadata.tables[table_name]
+        column = table.c[column_name]
+        inspector = inspect(engine)
+        if not inspector.has_table(table_name):
+            continue
+
+        if column_name not in {c["name"] for c in inspector.get_columns(table_name)}:
+            ddl = (
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=engine.dialect)}"
+            )
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(ddl))
+            except Exception:
+                # API 서버와 워커가 동시에 기동하면 다른 쪽이 먼저 추가했을 수 있음
+                if column_name not in {c["name"] for c in inspect(engine).get_columns(table_name)}:
+                    raise
+            else:
+                added.append(f"{table_name}.{column_name}")
+                logger.info(f"🧱 Added column {table_name}.{column_name}")
+
+        for index in table.indexes:
+            if column_name in index.columns:
+                index.create(bind=engine, checkfirst=True)
+
+    return added
@@ -1,6 +1,8 @@
  # [New] JWT & BCrypt (Spring Security 역할)# app/core/security.py
+import hmac
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Union
+from fastapi import Header, HTTPException
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -21,4 +23,15 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """비밀번호 해싱"""
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token")) -> None:
+    """
+    관리자 API 인증 (Depends로 사용)
+    ADMIN_TOKEN이 설정되지 않았으면 관리자 API를 모두 거부합니다. (설정 누락 시 열리지 않도록)
+    """
+    expected = settings.ADMIN_TOKEN
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (ADMIN_TOKEN not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=401, detail="Unauthorized")
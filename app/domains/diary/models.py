@@ -1,4 +1,4 @@
-from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -11,6 +11,8 @@ class Diary(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     uuid = Column(String(36), unique=True, index=True)
     audio_path = Column(String(255), nullable=False)
+    # [New] 업로드 음성의 SHA-256 (동일 음성 재업로드 시 결과 재사용)
+    audio_hash = Column(String(64), index=True, nullable=True)
 
     title = Column(String(255), nullable=True)
     transcript = Column(Text, nullable=True)
@@ -19,9 +21,18 @@ class Diary(Base):
 
     # [New] 현재 진행 상황을 사용자에게 알려줄 메시지 저장
     process_message = Column(String(255), nullable=True, default="분석 대기 중...")
+    # [New] STT 진행률 (처리된 오디오 비율, 0~100)
+    progress = Column(Integer, nullable=True, default=0)
 
     emotion_label = Column(String(50), index=True, nullable=True)
     emotion_score = Column(JSON, nullable=True)
+    # [New] 문장 창별 감정 흐름 ([{"start", "end", "label", "score"}, ...], start/end는 transcript 글자 위치)
+    emotion_timeline = Column(JSON, nullable=True)
+    # [New] 감정 분류에 사용한 모델/라벨 버전 (라벨 변경 시 백필 대상 판별)
+    emotion_version = Column(String(50), index=True, nullable=True)
+    # [New] LLM 단계별 생성 버전 ({"body": ..., "title": ..., "advice": ...}, 프롬프트 변경 시 해당 단계만 재생성)
+    # (STT/감정 단계 버전은 model_version / emotion_version 컬럼에 기록)
+    stage_versions = Column(JSON, nullable=True)
     status = Column(String(20), default="PENDING", index=True)
     model_version = Column(String(50), default="v1.0")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -32,3 +43,23 @@ class Diary(Base):
         back_populates="diary",
         cascade="all, delete-orphan",
     )
+
+
+class DiaryStreamEvent(Base):
+    """
+    일기 생성 스트림 이벤트 릴레이 테이블 (SSE)
+    분석 작업을 실행하는 프로세스(별도 워커 등)가 이벤트를 기록하면, 다른 프로세스의 SSE 엔드포인트가 읽어서 전달합니다.
+    LLM 토큰은 짧은 간격으로 모아 한 행으로 저장하며, 오래된 행은 주기적으로 삭제됩니다.
+    """
+    __tablename__ = "diary_stream_events"
+
+    id = Column(Integer, primary_key=True)
+    diary_id = Column(Integer, nullable=False)
+    event = Column(String(30), nullable=False)
+    data = Column(JSON, nullable=True)
+    created_at = Column(DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        # 일기별로 마지막으로 읽은 id 이후의 이벤트 조회
+        Index("ix_diary_stream_events_diary_id", "diary_id", "id"),
+    )
@@ -1,12 +1,22 @@
 # app/domains/diary/router.py
+import json
 from fastapi import APIRouter, Depends, File, UploadFile, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.exceptions import BackfillAlreadyRunningException, ReprocessAlreadyRunningException
+from app.core.security import require_admin
 from app.domains.diary import schemas, service
-from typing import Optional
+from app.services import emotion_backfill
+from app.services.stream_hub import stream_hub
+from typing import Literal, Optional
 
 router = APIRouter()
 
+# 재처리 시작 단계 ("llm": 감정 분석까지는 그대로 두고 LLM 생성 단계만)
+ReprocessStage = Literal["stt", "emotion", "body", "title", "advice", "llm"]
+
 @router.post(
     "/",
     response_model=schemas.DiaryCreateResponse,
@@ -14,11 +24,10 @@ router = APIRouter()
     summary="음성 일기 업로드 및 분석 요청"
 )
 async def create_diary(
-        bg_tasks: BackgroundTasks,
         file: UploadFile = File(...),
         db: Session = Depends(get_db)
 ):
-    new_diary = service.create_new_diary(db, file, bg_tasks)
+    new_diary = await service.create_new_diary(db, file)
     return {"id": new_diary.id, "message": "분석이 시작되었습니다."}
 
 @router.get(
@@ -29,6 +38,44 @@ async def create_diary(
 def get_diary(diary_id: int, db: Session = Depends(get_db)):
     return service.get_diary_by_id(db, diary_id)
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.get(
+    "/{diary_id}/stream",
+    summary="일기 생성 과정 실시간 스트리밍 (SSE)"
+)
+async def stream_diary(diary_id: int, db: Session = Depends(get_db)):
+    """
+    LLM이 생성 중인 본문/위로 메시지 토큰을 server-sent events로 전달합니다.
+    이벤트: status, summary(토큰), summary_done(최종 본문), title, advice(토큰), advice_done, done
+    분석이 대기/진행 중이면 다른 프로세스(별도 워커)에서 처리 중인 스트림도 DB 릴레이로 따라갑니다.
+    이미 생성이 끝났으면 현재 저장된 결과를 보내고 종료합니다.
+    """
+    # 동기 DB 조회는 스레드풀에서 실행 (이벤트 루프를 막지 않도록)
+    diary = await run_in_threadpool(service.get_diary_by_id, db, diary_id)
+    snapshot = {"summary": diary.summary, "title": diary.title, "advice": diary.advice, "status": diary.status}
+
+    async def events():
+        follow_remote = diary.status in ("PENDING", "PROCESSING")
+        async for item in stream_hub.subscribe(diary_id, follow_remote=follow_remote):
+            if item is None:
+                yield ": keep-alive\n\n"
+                continue
+            event, data = item
+            yield _sse(event, data)
+            if event == "done":
+                return
+        # 진행 중인 스트림이 없음 → 저장된 결과만 전달
+        yield _sse("snapshot", snapshot)
+        yield _sse("done", None)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get(
     "/",
     response_model=schemas.DiaryListResponse,
@@ -40,3 +87,84 @@ def get_diaries(
         db: Session = Depends(get_db)
 ):
     return service.get_all_diaries(db, skip, limit)
+
+@router.post(
+    "/admin/emotion-backfill",
+    status_code=202,
+    summary="[관리자] 감정 재분석(백필) 시작",
+    dependencies=[Depends(require_admin)],
+)
+def start_emotion_backfill(
+        bg_tasks: BackgroundTasks,
+        reset: bool = False,
+        include_current: bool = False,
+        max_rows: Optional[int] = None,
+):
+    if emotion_backfill.is_running():
+        raise BackfillAlreadyRunningException()
+
+    bg_tasks.add_task(
+        emotion_backfill.backfill_emotions,
+        only_outdated=not include_current,
+        reset=reset,
+        max_rows=max_rows,
+    )
+    return {"message": "감정 재분석이 시작되었습니다.", "checkpoint": emotion_backfill.load_checkpoint()}
+
+@router.get(
+    "/admin/emotion-backfill",
+    summary="[관리자] 감정 재분석(백필) 진행 상황",
+    dependencies=[Depends(require_admin)],
+)
+def get_emotion_backfill_status():
+    return {"running": emotion_backfill.is_running(), "checkpoint": emotion_backfill.load_checkpoint()}
+
+@router.post(
+    "/admin/reprocess",
+    status_code=202,
+    summary="[관리자] 버전이 바뀐 단계 일괄 재생성",
+    dependencies=[Depends(require_admin)],
+)
+def reprocess_outdated_diaries(
+        bg_tasks: BackgroundTasks,
+        from_stage: Optional[ReprocessStage] = None,
+        max_rows: Optional[int] = None,
+):
+    """
+    완료된 일기 중 버전이 바뀐 단계가 있는 일기를 BATCH 우선순위로 재처리합니다.
+    (프롬프트 변경 후 호출하면 LLM 단계만 다시 생성 / from_stage=llm이면 LLM 단계를 모두 강제로 재생성)
+    체크포인트 도입 전에 완료된 일기는 from_stage를 지정해야 재처리됩니다.
+    """
+    if service.is_reprocess_running():
+        raise ReprocessAlreadyRunningException()
+
+    bg_tasks.add_task(service.reprocess_outdated, from_stage=from_stage, max_rows=max_rows)
+    return {"message": "일괄 재처리가 시작되었습니다.", "last_run": service.reprocess_status()}
+
+@router.get(
+    "/admin/reprocess",
+    summary="[관리자] 일괄 재처리 진행 상황",
+    dependencies=[Depends(require_admin)],
+)
+def get_reprocess_status():
+    return {"running": service.is_reprocess_running(), "last_run": service.reprocess_status()}
+
+# "/admin/reprocess"가 먼저 매칭되도록 관리자 라우트 뒤에 선언
+@router.post(
+    "/{diary_id}/reprocess",
+    response_model=schemas.DiaryReprocessResponse,
+    status_code=202,
+    summary="일기 재분석 (저장된 단계 결과 이후부터)"
+)
+def reprocess_diary(
+        diary_id: int,
+        from_stage: Optional[ReprocessStage] = None,
+        db: Session = Depends(get_db)
+):
+    """
+    저장된 결과가 없거나 버전이 바뀐 단계부터 다시 실행합니다. (STT 등 완료된 앞 단계는 재사용)
+    from_stage를 지정하면 그 단계와 이후 단계를 강제로 다시 실행합니다.
+    """
+    stages = service.reprocess_diary(db, diary_id, from_stage)
+    message = "재분석이 시작되었습니다." if stages else "모든 단계가 최신 상태입니다."
+    return {"id": diary_id, "stages": stages, "message": message}
@@ -8,6 +8,12 @@ class DiaryCreate(BaseModel):
 class DiaryCreateResponse(BaseModel):
     id: int
 
+class DiaryReprocessResponse(BaseModel):
+    id: int
+    # 다시 실행할 단계 (비어 있으면 모든 단계가 최신이라 작업을 등록하지 않음)
+    stages: List[str]
+    message: str
+
 class DiaryUpdate(BaseModel):
     title: Optional[str] = None
     transcript: Optional[str] = None
@@ -29,9 +35,13 @@ class DiaryResponse(BaseModel):
 
     # [New] 프론트엔드로 진행 상황 텍스트 전달
     process_message: Optional[str] = None
+    progress: Optional[int] = None
 
     emotion_label: Optional[str] = None
     emotion_score: Optional[Any] = None
+    emotion_timeline: Optional[Any] = None
+    emotion_version: Optional[str] = None
+    stage_versions: Optional[Any] = None
     status: str
     model_version: str
     created_at: datetime
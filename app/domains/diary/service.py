@@ -1,44 +1,305 @@
 # app/domains/diary/service.py
-import shutil
+import hashlib
+import threading
 import uuid
 import os
-from fastapi import UploadFile, BackgroundTasks, HTTPException
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, or_
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.exceptions import (
+    AnalysisQueueFullException,
+    AudioTooLargeException,
+    AudioTooLongException,
+    BusinessException,
+    DiaryAlreadyProcessingException,
+    ReprocessAlreadyRunningException,
+    UnsupportedAudioFormatException,
+)
+from app.core.metrics import DIARY_CACHE
 from app.domains.diary.models import Diary
-from app.services.diary_task import process_audio_task
+from app.services.audio_probe import SNIFF_BYTES, probe_duration, sniff_audio_format
+from app.services import job_queue
+from app.services.diary_task import DIARY_JOB_KIND, diary_job_key, invalidate_stages, stages_to_run
+from app.services.llm_scheduler import Priority
 
 UPLOAD_DIR = "data/audio"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-def create_new_diary(db: Session, file: UploadFile, bg_tasks: BackgroundTasks) -> Diary:
-    # 1. 파일 저장
+# 업로드 스트리밍 단위 (1MB)
+CHUNK_SIZE = 1024 * 1024
+
+# 캐시 적중 시 이전 일기에서 복사해오는 분석 결과 필드
+CACHED_FIELDS = (
+    "transcript", "summary", "title", "advice",
+    "emotion_label", "emotion_score", "emotion_timeline", "emotion_version", "model_version",
+    "stage_versions",
+)
+
+def _is_current_version(model_version: Optional[str]) -> bool:
+    # model_version은 "파이프라인 버전+STT 티어" 형식 (예: v1.0+stt-medium-b5)
+    return model_version == settings.MODEL_VERSION or (
+        model_version or ""
+    ).startswith(f"{settings.MODEL_VERSION}+")
+
+def _find_same_audio(db: Session, audio_hash: str) -> Optional[Diary]:
+    """같은 음성 파일로 만들어진 기존 일기 (분석 완료 + 현재 모델 버전 우선)"""
+    query = db.query(Diary).filter(Diary.audio_hash == audio_hash)
+    cached = (
+        query.filter(Diary.status == "COMPLETED")
+        .filter(or_(
+            Diary.model_version == settings.MODEL_VERSION,
+            Diary.model_version.like(f"{settings.MODEL_VERSION}+%"),
+        ))
+        .order_by(desc(Diary.id))
+        .first()
+    )
+    return cached or query.order_by(desc(Diary.id)).first()
+
+@dataclass(frozen=True)
+class StoredUpload:
+    uuid: str
+    path: str
+    sha256: str
+    size: int
+    audio_format: str
+    duration_sec: Optional[float]
+
+def _write_chunk(buffer, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    buffer.write(chunk)
+
+def _discard(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+async def save_upload(file: UploadFile) -> StoredUpload:
+    """
+    업로드 파일을 고정 크기 청크로 비동기 저장합니다. (이벤트 루프를 막지 않음)
+    - 파일 앞부분으로 오디오 형식을 먼저 확인하고, 오디오가 아니면 저장 전에 거절
+    - 저장 중 UPLOAD_MAX_BYTES를 넘으면 즉시 중단하고 거절
+    - 저장 후 헤더 기준 재생 길이가 UPLOAD_MAX_DURATION_SEC를 넘으면 거절
+    (일기 레코드/분석 작업이 만들어지기 전에 모두 검사됨)
+    """
+    header = await file.read(SNIFF_BYTES)
+    audio_format = sniff_audio_format(header)
+    if audio_format is None:
+        raise UnsupportedAudioFormatException(file.filename or "")
+
     file_uuid = str(uuid.uuid4())
-    # 확장자 추출 (없으면 .wav 기본값)
-    ext = os.path.splitext(file.filename)[1] or ".wav"
+    # 확장자 추출 (없으면 판별한 형식 사용)
+    ext = os.path.splitext(file.filename or "")[1] or f".{audio_format}"
     save_path = os.path.join(UPLOAD_DIR, f"{file_uuid}{ext}")
 
+    # 저장하면서 SHA-256 해시 계산
+    hasher = hashlib.sha256()
+    size = 0
     try:
         with open(save_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            chunk = header
+            while chunk:
+                size += len(chunk)
+                if size > settings.UPLOAD_MAX_BYTES:
+                    raise AudioTooLargeException(settings.UPLOAD_MAX_BYTES)
+                await run_in_threadpool(_write_chunk, buffer, hasher, chunk)
+                chunk = await file.read(CHUNK_SIZE)
+    except BusinessException:
+        _discard(save_path)
+        raise
     except Exception as e:
+        _discard(save_path)
         raise HTTPException(status_code=500, detail=f"File save failed: {str(e)}")
 
-    # 2. DB 저장
-    new_diary = Diary(
+    duration = await run_in_threadpool(probe_duration, save_path, audio_format)
+    if duration is not None and duration > settings.UPLOAD_MAX_DURATION_SEC:
+        _discard(save_path)
+        raise AudioTooLongException(duration, settings.UPLOAD_MAX_DURATION_SEC)
+
+    return StoredUpload(
         uuid=file_uuid,
+        path=save_path,
+        sha256=hasher.hexdigest(),
+        size=size,
+        audio_format=audio_format,
+        duration_sec=duration,
+    )
+
+async def create_new_diary(db: Session, file: UploadFile) -> Diary:
+    # 0. 작업 대기열이 가득 차 있으면 업로드를 받지 않음 (429, 클라이언트 재시도)
+    # LLM 스케줄러는 작업 워커 프로세스 안에 있으므로 API 프로세스에서는 DB의 대기 작업 수로 판단
+    if await run_in_threadpool(job_queue.is_backlogged, db):
+        raise AnalysisQueueFullException()
+
+    # 1. 파일 저장 (검증 실패 시 여기서 예외 → 레코드/작업 생성 안 됨)
+    upload = await save_upload(file)
+
+    # DB 작업은 동기 세션이므로 스레드풀에서 실행
+    return await run_in_threadpool(register_diary, db, upload)
+
+def register_diary(db: Session, upload: StoredUpload) -> Diary:
+    save_path = upload.path
+    audio_hash = upload.sha256
+
+    # 2. 같은 음성이 이미 있으면 파일은 기존 것을 재사용 (중복 저장 방지)
+    same_audio = _find_same_audio(db, audio_hash)
+    if same_audio and os.path.exists(same_audio.audio_path):
+        os.remove(save_path)
+        save_path = same_audio.audio_path
+
+    # 3. DB 저장
+    new_diary = Diary(
+        uuid=upload.uuid,
         audio_path=save_path,
+        audio_hash=audio_hash,
+        model_version=settings.MODEL_VERSION,
         status="PENDING"
     )
+
+    # 4. 같은 음성 + 같은 모델 버전의 분석 결과가 있으면 재사용
+    #    모든 단계 버전이 현재와 같으면 즉시 완료(hit), 일부 단계(감정/LLM)가 바뀌었으면
+    #    그 단계부터만 다시 실행(partial, 나머지 단계는 체크포인트로 재사용)
+    cache_result = "miss"
+    if (
+        same_audio is not None
+        and same_audio.status == "COMPLETED"
+        and _is_current_version(same_audio.model_version)
+    ):
+        for field in CACHED_FIELDS:
+            setattr(new_diary, field, getattr(same_audio, field))
+        new_diary.status = "COMPLETED"
+        new_diary.progress = 100
+        new_diary.process_message = "✅ 분석이 완료되었습니다!"
+        # 재사용할 단계만 체크포인트로 남김 (예전 일기처럼 stage_versions가 없으면 STT/감정 컬럼 기준)
+        todo = invalidate_stages(new_diary)
+        cache_result = "partial" if todo else "hit"
+        if todo:
+            new_diary.status = "PENDING"
+            new_diary.process_message = "🔁 바뀐 단계만 다시 분석할 준비를 하고 있어요..."
+
     db.add(new_diary)
+    db.flush()
+
+    # 5. 분석 작업 등록 (전체 적중 시 생략) - 일기 레코드와 같은 트랜잭션으로 저장
+    DIARY_CACHE.labels(result=cache_result).inc()
+    if cache_result != "hit":
+        job_queue.enqueue(
+            db, DIARY_JOB_KIND, {"diary_id": new_diary.id},
+            priority=Priority.INTERACTIVE, dedupe_key=diary_job_key(new_diary.id),
+        )
+
     db.commit()
     db.refresh(new_diary)
 
-    # 3. 백그라운드 태스크 요청
-    bg_tasks.add_task(process_audio_task, new_diary.id)
-
     return new_diary
 
+def _enqueue_reprocess(db: Session, diary: Diary, rerun: List[str]) -> List[str]:
+    """
+    재처리 작업을 등록하고 체크포인트를 정리합니다. 다시 실행할 단계가 없으면 아무것도 바꾸지 않습니다.
+    같은 일기의 작업이 대기/실행 중이면 job_queue.DuplicateJobError (일기를 바꾸기 전에 DB가 확인하므로
+    실행 중인 작업의 체크포인트를 덮어쓰지 않음, 호출자는 rollback)
+    """
+    if not stages_to_run(diary, rerun):
+        return []
+    # 완료된 일기의 재생성은 새 업로드보다 뒤에 실행 (LLM 요청도 BATCH 우선순위)
+    priority = Priority.BATCH if diary.status == "COMPLETED" else Priority.INTERACTIVE
+    job_queue.enqueue(db, DIARY_JOB_KIND, {"diary_id": diary.id}, priority=priority, dedupe_key=diary_job_key(diary.id))
+
+    stages = invalidate_stages(diary, rerun)
+    if diary.status != "COMPLETED":
+        diary.status = "PENDING"
+        diary.process_message = "🔁 다시 분석할 준비를 하고 있어요..."
+    return stages
+
+def reprocess_diary(db: Session, diary_id: int, from_stage: Optional[str] = None) -> List[str]:
+    """
+    저장된 단계 결과 중 없거나 버전이 바뀐 첫 단계부터 다시 실행합니다.
+    from_stage를 주면 그 단계(와 이후 단계)를 강제로 다시 실행합니다. ("llm"이면 LLM 생성 단계만)
+    """
+    diary = get_diary_by_id(db, diary_id)
+    try:
+        stages = _enqueue_reprocess(db, diary, [from_stage] if from_stage else [])
+        db.commit()
+    except job_queue.DuplicateJobError:
+        db.rollback()
+        raise DiaryAlreadyProcessingException(diary_id)
+    return stages
+
+# 일괄 재처리가 같은 프로세스에서 동시에 두 번 돌지 않도록 막음 (일기별 중복 등록은 DB가 막음)
+_reprocess_running = threading.Lock()
+# 마지막 일괄 재처리의 진행 상황 (GET /diaries/admin/reprocess)
+_reprocess_state: Optional[dict] = None
+
+def is_reprocess_running() -> bool:
+    return _reprocess_running.locked()
+
+def reprocess_status() -> Optional[dict]:
+    return dict(_reprocess_state) if _reprocess_state else None
+
+def reprocess_outdated(from_stage: Optional[str] = None, max_rows: Optional[int] = None, page_size: int = 200) -> dict:
+    """
+    완료된 일기 중 다시 실행할 단계가 있는 일기를 모두 재처리 대기열에 넣습니다. (백그라운드 작업으로 실행)
+    (프롬프트를 바꾼 뒤 호출하면 버전이 달라진 LLM 단계만 다시 생성)
+    체크포인트 도입 전에 완료된 일기(stage_versions 없음)는 LLM 단계 버전을 알 수 없으므로,
+    from_stage를 지정했을 때만 재처리하고 나머지는 legacy_skipped로 셉니다.
+    """
+    global _reprocess_state
+    if not _reprocess_running.acquire(blocking=False):
+        raise ReprocessAlreadyRunningException()
+
+    state = _reprocess_state = {
+        "status": "RUNNING",
+        "from_stage": from_stage,
+        "last_id": 0,
+        "scanned": 0,
+        "queued": 0,
+        "legacy_skipped": 0,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    rerun = [from_stage] if from_stage else []
+    try:
+        with SessionLocal() as db:
+            while max_rows is None or state["queued"] < max_rows:
+                page = (
+                    db.query(Diary)
+                    .filter(Diary.status == "COMPLETED", Diary.id > state["last_id"])
+                    .order_by(Diary.id)
+                    .limit(page_size)
+                    .all()
+                )
+                if not page:
+                    break
+                for diary in page:
+                    if max_rows is not None and state["queued"] >= max_rows:
+                        break
+                    state["last_id"] = diary.id
+                    state["scanned"] += 1
+                    if diary.stage_versions is None and not from_stage:
+                        state["legacy_skipped"] += 1
+                        continue
+                    if job_queue.is_active(db, diary_job_key(diary.id)):
+                        continue
+                    try:
+                        if _enqueue_reprocess(db, diary, rerun):
+                            state["queued"] += 1
+                        db.commit()
+                    except job_queue.DuplicateJobError:
+                        # 확인 직후 다른 요청이 먼저 등록함
+                        db.rollback()
+
+        state["status"] = "COMPLETED"
+        return state
+    except Exception:
+        state["status"] = "FAILED"
+        raise
+    finally:
+        state["finished_at"] = datetime.now().isoformat(timespec="seconds")
+        _reprocess_running.release()
+
 def get_diary_by_id(db: Session, diary_id: int) -> Diary:
     diary = db.query(Diary).filter(Diary.id == diary_id).first()
     if not diary:
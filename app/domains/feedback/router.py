@@ -2,13 +2,13 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta
 from typing import Optional
-import os
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.security import require_admin
 from app.domains.feedback.models import Feedback, FeedbackKeyword, FeedbackCategory
 from app.domains.feedback.schema import (
     AdminFeedbackRow,
@@ -28,13 +28,6 @@ router = APIRouter()
 # Common helpers
 # ------------------------
 
-def _require_admin(x_admin_token: Optional[str]) -> None:
-    expected = os.getenv("ADMIN_TOKEN")
-    # expected가 설정돼 있으면 반드시 매칭되어야 함
-    if expected and x_admin_token != expected:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-
-
 def _range_days(days: int) -> datetime:
     return datetime.utcnow() - timedelta(days=days)
 
@@ -43,14 +36,11 @@ def _range_days(days: int) -> datetime:
 # Admin APIs
 # ------------------------
 
-@router.get("/summary", response_model=AdminSummaryResponse)
+@router.get("/summary", response_model=AdminSummaryResponse, dependencies=[Depends(require_admin)])
 def feedback_summary(
     days: int = 30,
-    x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token"),
     db: Session = Depends(get_db),
 ):
-    _require_admin(x_admin_token)
-
     since = _range_days(days)
     base_q = db.query(Feedback).filter(Feedback.created_at >= since)
 
@@ -104,14 +94,11 @@ def feedback_summary(
     )
 
 
-@router.get("/categories", response_model=list[CategoryDistributionItem])
+@router.get("/categories", response_model=list[CategoryDistributionItem], dependencies=[Depends(require_admin)])
 def category_distribution(
     days: int = 30,
-    x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token"),
     db: Session = Depends(get_db),
 ):
-    _require_admin(x_admin_token)
-
     since = _range_days(days)
     rows = (
         db.query(Feedback.user_category, func.count(Feedback.id))
@@ -138,15 +125,12 @@ def category_distribution(
     return result
 
 
-@router.get("/keywords/top", response_model=list[KeywordTopItem])
+@router.get("/keywords/top", response_model=list[KeywordTopItem], dependencies=[Depends(require_admin)])
 def top_keywords(
     days: int = 30,
     category: Optional[FeedbackCategory] = None,
-    x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token"),
     db: Session = Depends(get_db),
 ):
-    _require_admin(x_admin_token)
-
     since = _range_days(days)
 
     q = (
@@ -166,17 +150,14 @@ def top_keywords(
     return [KeywordTopItem(keyword=k, count=int(c)) for k, c in rows]
 
 
-@router.get("", response_model=list[AdminFeedbackRow])
+@router.get("", response_model=list[AdminFeedbackRow], dependencies=[Depends(require_admin)])
 def list_feedbacks(
     days: int = 30,
     category: Optional[FeedbackCategory] = None,
     low_only: bool = False,
     q: Optional[str] = None,
-    x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token"),
     db: Session = Depends(get_db),
 ):
-    _require_admin(x_admin_token)
-
     since = _range_days(days)
     query = db.query(Feedback).filter(Feedback.created_at >= since)
 
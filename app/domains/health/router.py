@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.model_registry import model_registry
+
+router = APIRouter()
+
+
+@router.get(
+    "/live",
+    summary="프로세스 생존 확인 (Liveness)"
+)
+def liveness():
+    # 모델 로딩 여부와 무관하게, 프로세스가 요청을 받을 수 있으면 OK
+    return {"status": "ok"}
+
+
+@router.get(
+    "/ready",
+    summary="AI 모델 로딩 상태 확인 (Readiness)"
+)
+def readiness():
+    ready = model_registry.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "loading",
+            "models": model_registry.status(),
+        }
+    )
@@ -0,0 +1,59 @@
+from enum import Enum as PyEnum
+
+from sqlalchemy import JSON, Column, DateTime, Enum, Index, Integer, String, Text, func
+
+from app.core.database import Base
+
+
+class JobStatus(PyEnum):
+    PENDING = "PENDING"      # 실행 대기 (run_at 이후 실행 가능)
+    RUNNING = "RUNNING"      # 워커가 임대(lease) 중
+    SUCCEEDED = "SUCCEEDED"
+    DEAD = "DEAD"            # 재시도 한도 초과 (dead-letter)
+
+
+class Job(Base):
+    """
+    분석 작업 대기열 테이블 (API 프로세스 재시작/배포와 무관하게 유지)
+    워커는 PENDING 작업을 임대(locked_by, lease_expires_at)해 실행하고,
+    실행 중에는 heartbeat로 임대를 연장합니다. 임대가 만료된 작업은 다른 워커가 회수합니다.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False, index=True)
+    payload = Column(JSON, nullable=False)
+    # 작을수록 먼저 실행 (llm_scheduler.Priority 값과 동일)
+    priority = Column(Integer, nullable=False, default=0)
+    # 같은 대상의 작업이 동시에 두 개 대기/실행되지 않도록 확인하는 키 (예: diary:42)
+    dedupe_key = Column(String(100), nullable=True, index=True)
+    # 대기/실행 중일 때만 dedupe_key 값을 갖고, 끝나면(SUCCEEDED/DEAD) NULL
+    # (유니크 인덱스로 같은 키의 활성 작업이 두 개 생기는 것을 DB가 막음, NULL은 중복 허용)
+    active_key = Column(String(100), nullable=True)
+
+    status = Column(
+        Enum(JobStatus, native_enum=False),
+        nullable=False,
+        default=JobStatus.PENDING,
+        server_default=JobStatus.PENDING.value,
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    # 이 시각 이후에 실행 (재시도 backoff)
+    run_at = Column(DateTime, nullable=False)
+
+    # 임대 정보 (워커 id = 호스트:pid:스레드)
+    locked_by = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # 대기 작업 조회 / 만료 임대 회수
+        Index("ix_jobs_status_run_at", "status", "priority", "run_at"),
+        Index("ix_jobs_status_lease", "status", "lease_expires_at"),
+        Index("ux_jobs_active_key", "active_key", unique=True),
+    )
@@ -14,11 +14,16 @@ from app.core.database import Base, engine, SessionLocal
 from app.core.exceptions import BusinessException
 from app.core.config import settings
 from app.core.init_data import init_data
+from app.core.migrations import upgrade_schema
 
 from app.services.monitoring_service import update_business_metrics
+from app.services.model_registry import model_registry
 from app.domains.auth import models as auth_models
 from app.domains.diary import models as diary_models
 from app.domains.feedback import models as feedback_models
+from app.domains.job import models as job_models
+from app.services.diary_task import DIARY_JOB_KIND
+from app.services.job_queue import JobWorker
 
 # ==========================================
 # 1. 로깅 설정 로드
@@ -56,6 +61,8 @@ async def lifespan(app: FastAPI):
 
     # 1. DB 테이블 생성 (테이블이 없을 때만 생성됨)
     Base.metadata.create_all(bind=engine)
+    # 기존 테이블에 새로 추가된 컬럼 반영
+    upgrade_schema(engine)
 
     # 2. 초기 데이터 주입
     init_data()
@@ -64,6 +71,18 @@ async def lifespan(app: FastAPI):
     metrics_task = asyncio.create_task(periodic_metrics_update())
     logger.info("📈 Background metrics task started.")
 
+    # 4. AI 모델 워밍업 (백그라운드 스레드, 요청 처리를 막지 않음)
+    if settings.MODEL_WARMUP_ON_STARTUP:
+        model_registry.start_warmup()
+        logger.info("🔥 Background model warmup started.")
+
+    # 5. 작업 대기열 워커 (별도 워커 프로세스만 쓰려면 JOB_INLINE_WORKERS=0)
+    job_worker = None
+    if settings.JOB_INLINE_WORKERS > 0:
+        job_worker = JobWorker(kinds=[DIARY_JOB_KIND], threads=settings.JOB_INLINE_WORKERS)
+        job_worker.start()
+        logger.info(f"👷 {settings.JOB_INLINE_WORKERS} inline job worker(s) started.")
+
     yield # 🟢 앱 실행 중 (여기서 대기)
 
     # [Shutdown] 서버 종료 시 실행
@@ -73,6 +92,13 @@ async def lifespan(app: FastAPI):
     except asyncio.CancelledError:
         pass
 
+    # 실행 중인 작업은 기다리지 않음 (임대가 만료되면 다른 워커가 회수해 재시도)
+    if job_worker is not None:
+        job_worker.stop(timeout=0)
+
+    # STT 워커 프로세스 등 모델 리소스 정리
+    model_registry.shutdown()
+
     logger.info("👋 Vench Backend Server is shutting down...")
 
 # ==========================================
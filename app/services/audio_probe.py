@@ -0,0 +1,54 @@
+import wave
+from typing import Optional
+
+# 파일 앞부분만 보고 컨테이너 형식을 판별하기 위해 필요한 바이트 수
+SNIFF_BYTES = 64
+
+
+def sniff_audio_format(header: bytes) -> Optional[str]:
+    """
+    파일 앞부분(매직 넘버)으로 오디오 컨테이너 형식을 판별합니다.
+    오디오가 아니거나 지원하지 않는 형식이면 None을 반환합니다.
+    """
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"   # Matroska/WebM (브라우저 MediaRecorder 기본 형식)
+    if header[4:8] == b"ftyp":
+        return "mp4"    # m4a/mp4 (iOS 음성 메모 등)
+    if header[:3] == b"ID3":
+        return "mp3"
+    if len(header) >= 2 and header[0] == 0xFF:
+        if header[1] & 0xF6 == 0xF0:
+            return "aac"    # ADTS AAC (mp3 프레임 동기화보다 먼저 검사)
+        if header[1] & 0xE0 == 0xE0:
+            return "mp3"    # ID3 태그 없는 MPEG 오디오 프레임
+    return None
+
+
+def probe_duration(path: str, audio_format: str) -> Optional[float]:
+    """
+    전체 디코딩 없이 헤더/컨테이너 메타데이터로 재생 길이(초)를 구합니다.
+    알 수 없으면 None을 반환합니다.
+    """
+    try:
+        if audio_format == "wav":
+            with wave.open(path, "rb") as f:
+                return f.getnframes() / float(f.getframerate())
+
+        # 그 외 형식은 PyAV(faster-whisper 의존성)로 컨테이너 정보만 읽음
+        import av
+
+        with av.open(path) as container:
+            if container.duration is not None:
+                return container.duration / av.time_base
+            stream = container.streams.audio[0]
+            if stream.duration is not None and stream.time_base is not None:
+                return float(stream.duration * stream.time_base)
+    except Exception:
+        return None
+    return None
@@ -1,86 +1,460 @@
+import hashlib
+import json
 import os
 import re
-from huggingface_hub import hf_hub_download
-from llama_cpp import Llama
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import LLM_MAP_REDUCE_CHUNKS, LLM_PROMPT_TOKENS, LLM_TOKENS_PER_SEC
+from app.services.llm_draft import InstrumentedDraftModel
+from app.services.llm_grammars import get_grammar
+from app.services.llm_prefix_cache import PromptPrefixCache
+from app.services.llm_scheduler import LLMDeadlineExceededError, LLMQueueFullError, llm_scheduler
+from app.services.model_registry import model_registry
+
+
+# 생성 모델 (GGUF)
+LLM_REPO_ID = "mradermacher/EXAONE-3.0-7.8B-Instruct-GGUF"
+LLM_FILENAME = "EXAONE-3.0-7.8B-Instruct.Q4_K_M.gguf"
+
+
+def _load_llm():
+    """EXAONE GGUF 다운로드 및 로딩 (레지스트리에서 최초 1회 호출)"""
+    from huggingface_hub import hf_hub_download
+    from llama_cpp import Llama
+
+    print("⏳ Downloading LG EXAONE 3.0 7.8B (GGUF Quantized)...")
+    model_path = hf_hub_download(
+        repo_id=LLM_REPO_ID,
+        filename=LLM_FILENAME,
+        cache_dir="./data/models"
+    )
+    print(f"✅ Downloaded to: {model_path}")
+
+    # 추측 디코딩(speculative decoding): draft가 제안한 토큰들을 본 모델이 한 번에 검증
+    from app.services.llm_draft import build_draft_model
+    draft_model = build_draft_model(
+        settings.LLM_SPECULATIVE, settings.LLM_DRAFT_NUM_TOKENS, settings.LLM_DRAFT_MODEL_PATH
+    )
+
+    llm = Llama(
+        model_path=model_path,
+        n_ctx=settings.LLM_CONTEXT_TOKENS,
+        n_gpu_layers=0,
+        draft_model=draft_model,
+        verbose=False
+    )
+    print("✅ LG EXAONE Model Loaded!")
+    return llm
+
+def _load_llm_instances():
+    """
+    LLM_INSTANCES 개수만큼 Llama 인스턴스를 로딩합니다. (스케줄러가 인스턴스별로 요청을 직렬 실행)
+    GGUF 파일은 mmap으로 열리므로 가중치 메모리는 인스턴스끼리 공유되고, KV 캐시만 인스턴스마다 따로 잡힙니다.
+    """
+    return [_load_llm() for _ in range(max(1, settings.LLM_INSTANCES))]
+
+model_registry.register("llm", _load_llm_instances)
+
+
+# 스트리밍 생성 시 토큰 조각을 받는 콜백
+TokenCallback = Callable[[str], None]
+
+
+@dataclass
+class GeneratedDiary:
+    body: str
+    title: str
+    advice: str
+
+
+# 통합 생성 시 출력 형식 (llama.cpp가 이 스키마의 JSON만 생성하도록 제약)
+COMBINED_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "body": {"type": "string"},
+        "title": {"type": "string"},
+        "advice": {"type": "string"},
+    },
+    "required": ["body", "title", "advice"],
+}
+
+
+# 시스템 프롬프트 (고정 접두사: 프롬프트 캐시로 KV 상태를 재사용)
+DIARY_SYSTEM_PROMPT = (
+    "당신은 '감성 일기 에디터'입니다. 사용자의 말을 다듬어 일기 본문을 작성하세요.\n"
+    "1. [사실 기반]: 없는 내용은 절대 지어내지 마세요.\n"
+    "2. [문체]: '~했다', '~였다' 등 차분한 독백체로 작성하세요.\n"
+    "3. [형식]: 제목을 쓰지 말고, 바로 본문 내용만 작성하세요."
+)
+
+TITLE_SYSTEM_PROMPT = (
+    "당신은 '일기 제목 작가'입니다. 주어진 일기 내용을 읽고 가장 어울리는 제목을 지어주세요.\n"
+    "규칙:\n"
+    "1. 내용을 함축하는 **감성적이고 은유적인 제목**을 지으세요.\n"
+    "2. 길이는 **공백 포함 20자 이내**로 짧게 하세요.\n"
+    "3. 따옴표나 '제목:' 같은 접두사를 붙이지 말고 오직 제목 텍스트만 출력하세요."
+)
+
+ADVICE_SYSTEM_PROMPT = (
+    "당신은 공감 능력이 뛰어난 '전문 심리 상담사'입니다. "
+    "사용자의 이야기와 감정을 듣고 따뜻한 위로와 격려의 말을 건네주세요.\n"
+    "규칙:\n"
+    "1. 말투: '~해요', '~네요' 등 부드럽고 친절한 존댓말을 사용하세요.\n"
+    "2. 길이: 3문장 이내로 간결하지만 진심이 느껴지게 작성하세요.\n"
+    "3. 내용: 사용자의 감정(기쁨/슬픔/분노 등)을 인정해주고, 긍정적인 메시지로 마무리하세요."
+)
+
+SUMMARY_SYSTEM_PROMPT = (
+    "당신은 '녹음 요약가'입니다. 긴 음성 기록의 한 구간을 읽고 핵심 내용을 정리하세요.\n"
+    "1. [사실 기반]: 없는 내용은 절대 지어내지 마세요.\n"
+    "2. [보존]: 있었던 일, 등장 인물, 감정 표현은 빠뜨리지 말고 남기세요.\n"
+    "3. [형식]: 머리말이나 설명 없이 요약 문장만 작성하세요."
+)
+
+COMBINED_SYSTEM_PROMPT = (
+    "당신은 '감성 일기 에디터'이자 공감 능력이 뛰어난 '전문 심리 상담사'입니다. "
+    "사용자의 이야기로 일기 본문, 제목, 위로 메시지를 작성해 JSON으로만 답하세요.\n"
+    "1. body: 사용자의 말을 다듬은 일기 본문. 없는 내용은 절대 지어내지 말고, "
+    "'~했다', '~였다' 등 차분한 독백체로 작성하세요. 제목은 넣지 마세요.\n"
+    "2. title: 본문을 함축하는 감성적이고 은유적인 제목. 공백 포함 20자 이내, 따옴표나 접두사 없이.\n"
+    "3. advice: 사용자의 감정을 인정해주는 따뜻한 위로와 격려. "
+    "'~해요', '~네요' 등 부드러운 존댓말로 3문장 이내, 긍정적인 메시지로 마무리하세요."
+)
+
+SYSTEM_PROMPTS = {
+    "diary": DIARY_SYSTEM_PROMPT,
+    "title": TITLE_SYSTEM_PROMPT,
+    "advice": ADVICE_SYSTEM_PROMPT,
+    "combined": COMBINED_SYSTEM_PROMPT,
+    "summary": SUMMARY_SYSTEM_PROMPT,
+}
+
+
+def prompt_version(*names: str) -> str:
+    """
+    생성 결과 버전 태그 (모델/시스템 프롬프트/출력 문법 설정이 바뀌면 자동으로 달라짐)
+    예: EXAONE-3.0-7.8B-Instruct.Q4_K_M@1a2b3c4d → 저장된 값과 다르면 해당 단계만 다시 생성
+    """
+    return "{}@{}".format(
+        os.path.splitext(LLM_FILENAME)[0],
+        hashlib.sha1(
+            "|".join([*(SYSTEM_PROMPTS[name] for name in names), str(settings.LLM_GRAMMAR)]).encode("utf-8")
+        ).hexdigest()[:8],
+    )
+
+# 스케줄러 과부하 오류 (대체 문구로 채우지 않고 호출자에게 전달 → 작업 대기열이 나중에 재시도)
+_OVERLOAD_ERRORS = (LLMQueueFullError, LLMDeadlineExceededError)
+
+# 시스템 프롬프트 + 채팅 템플릿 + 사용자 메시지 안내 문구 몫으로 남겨둘 토큰 수
+_PROMPT_OVERHEAD_TOKENS = 384
+# 생성 토큰 하한 (본문 / 구간 요약)
+_MIN_BODY_TOKENS = 96
+_MIN_SUMMARY_TOKENS = 64
+# 구간 요약을 합쳐도 길 때 다시 요약하는 최대 횟수
+_MAX_REDUCE_DEPTH = 2
+# 요약 결과를 보관할 원문 수 (본문/위로 생성이 같은 요약을 공유)
+_CONDENSED_CACHE_SIZE = 8
+
+# 문장 경계 (문장부호 뒤 공백 또는 줄바꿈)
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def _strip_han(text: str) -> str:
+    """한자 및 어시스턴트 마커 제거"""
+    text = re.sub(r'[\u4e00-\u9fff]+', '', text)
+    return text.replace("()", "").replace("[|assistant|]", "").strip()
+
+
+def _clean_title(title: str) -> str:
+    # 따옴표, 특수문자, 한자 제거 후 첫 줄만 사용
+    title = title.replace('"', '').replace("'", "").replace(".", "").strip()
+    title = re.sub(r'[\u4e00-\u9fff]+', '', title)
+    if "\n" in title: title = title.split("\n")[0]
+    return title
+
 
 class DiaryGenerationService:
     _instance = None
 
     def __new__(cls):
+        # 모델 로딩은 레지스트리가 담당하므로 여기서는 인스턴스만 생성
         if cls._instance is None:
-            # 모델 로딩 (기존과 동일)
-            print("⏳ Downloading LG EXAONE 3.0 7.8B (GGUF Quantized)...")
-            model_path = hf_hub_download(
-                repo_id="mradermacher/EXAONE-3.0-7.8B-Instruct-GGUF",
-                filename="EXAONE-3.0-7.8B-Instruct.Q4_K_M.gguf",
-                cache_dir="./data/models"
-            )
-            print(f"✅ Downloaded to: {model_path}")
-
             cls._instance = super().__new__(cls)
-            cls.llm = Llama(
-                model_path=model_path,
-                n_ctx=4096,
-                n_gpu_layers=0,
-                verbose=False
-            )
-            print("✅ LG EXAONE Model Loaded!")
+            # Llama 인스턴스별 시스템 프롬프트 KV 캐시
+            cls._instance._prefix_caches = {}
+            # 긴 원문 해시 → 구간 요약 Future (진행 중인 요약도 공유)
+            cls._instance._condensed = OrderedDict()
+            cls._instance._condensed_lock = threading.Lock()
         return cls._instance
 
-    def generate_diary(self, transcript: str, emotion: str) -> str:
-        """일기 내용 본문 생성"""
-        if not transcript or len(transcript) < 10:
-            return transcript
+    @property
+    def llm(self):
+        # 첫 번째 인스턴스 (벤치마크/디버깅용, 생성 요청은 _chat을 통해 스케줄러로 실행)
+        return model_registry.get("llm")[0]
 
-        messages = [
-            {
-                "role": "system",
-                "content": (
-                    "당신은 '감성 일기 에디터'입니다. 사용자의 말을 다듬어 일기 본문을 작성하세요.\n"
-                    "1. [사실 기반]: 없는 내용은 절대 지어내지 마세요.\n"
-                    "2. [문체]: '~했다', '~였다' 등 차분한 독백체로 작성하세요.\n"
-                    "3. [형식]: 제목을 쓰지 말고, 바로 본문 내용만 작성하세요."
+    def prefix_cache(self, llm) -> PromptPrefixCache:
+        """인스턴스의 시스템 프롬프트 KV 캐시 (최초 사용 시 모든 고정 프롬프트를 미리 계산)"""
+        cache = self._prefix_caches.get(id(llm))
+        if cache is None or cache.llm is not llm:
+            cache = PromptPrefixCache(llm, max_entries=settings.LLM_PREFIX_CACHE_MAX_ENTRIES)
+            for name, prompt in SYSTEM_PROMPTS.items():
+                cache.restore(name, prompt)
+            self._prefix_caches[id(llm)] = cache
+        return cache
+
+    def _submit_chat(self, name: str, messages: list, on_token: Optional[TokenCallback] = None, **kwargs) -> Future:
+        """
+        create_chat_completion 요청을 제출하고 결과 Future를 반환합니다. 요청은 LLM 스케줄러의 대기열을 거쳐
+        비어 있는 Llama 인스턴스에서 하나씩 실행됩니다. (우선순위/기한/대기열 제한 적용)
+        프롬프트 캐시가 켜져 있으면 시스템 프롬프트의 KV 상태를 불러온 뒤 생성해
+        사용자 메시지 부분만 새로 평가합니다.
+        LLM_GRAMMAR가 켜져 있으면 출력 종류별 GBNF 문법으로 디코딩을 제약합니다.
+        생성은 항상 stream=True로 하며(on_token이 있으면 토큰 조각마다 호출),
+        응답은 일반 호출과 같은 형식으로 합쳐서 반환합니다.
+        """
+        if settings.LLM_GRAMMAR and "response_format" not in kwargs:
+            grammar = get_grammar(name)
+            if grammar is not None:
+                kwargs["grammar"] = grammar
+
+        def run(llm):
+            if settings.LLM_PREFIX_CACHE:
+                try:
+                    self.prefix_cache(llm).restore(name, messages[0]["content"])
+                except Exception as e:
+                    # 캐시 실패는 성능 문제일 뿐이므로 일반 생성으로 진행
+                    print(f"⚠️ Prompt prefix cache unavailable: {e}")
+
+            # 내부적으로는 항상 스트리밍으로 생성해 토큰 단위 처리 속도를 측정
+            draft = getattr(llm, "draft_model", None)
+            if isinstance(draft, InstrumentedDraftModel):
+                draft.begin(name)
+            pieces = []
+            first_token_at = last_token_at = None
+            try:
+                for chunk in llm.create_chat_completion(messages=messages, stream=True, **kwargs):
+                    delta = chunk["choices"][0]["delta"].get("content")
+                    if not delta:
+                        continue
+                    last_token_at = time.perf_counter()
+                    first_token_at = first_token_at or last_token_at
+                    pieces.append(delta)
+                    if on_token is not None:
+                        on_token(delta)
+            finally:
+                if isinstance(draft, InstrumentedDraftModel):
+                    draft.end()
+
+            # 디코딩 속도 (첫 토큰 이후 구간, 프롬프트 평가 시간 제외)
+            if len(pieces) > 1 and last_token_at > first_token_at:
+                LLM_TOKENS_PER_SEC.labels(output=name).observe((len(pieces) - 1) / (last_token_at - first_token_at))
+            return {"choices": [{"message": {"role": "assistant", "content": "".join(pieces)}}]}
+
+        return llm_scheduler.submit(run)
+
+    def _chat(self, name: str, messages: list, on_token: Optional[TokenCallback] = None, **kwargs) -> dict:
+        """_submit_chat 후 결과를 기다립니다."""
+        return self._submit_chat(name, messages, on_token=on_token, **kwargs).result()
+
+    def count_tokens(self, text: str) -> int:
+        """LLM 토크나이저 기준 토큰 수 (토크나이저는 모델 가중치만 사용하므로 생성 중에도 호출 가능)"""
+        return len(self.llm.tokenize(text.encode("utf-8"), add_bos=False))
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        tokens = self.llm.tokenize(text.encode("utf-8"), add_bos=False)
+        if len(tokens) <= max_tokens:
+            return text
+        return self.llm.detokenize(tokens[:max_tokens]).decode("utf-8", errors="ignore")
+
+    def _fit_max_tokens(self, prompt_tokens: int, wanted: int) -> int:
+        """프롬프트와 생성 토큰이 컨텍스트 안에 들어가도록 max_tokens를 줄입니다."""
+        room = settings.LLM_CONTEXT_TOKENS - prompt_tokens - _PROMPT_OVERHEAD_TOKENS
+        return max(_MIN_BODY_TOKENS, min(wanted, room))
+
+    def _body_max_tokens(self, source_tokens: int) -> int:
+        """본문은 원문을 다듬은 글이므로 원문 길이에 비례 (짧은 원문에 긴 max_tokens를 잡지 않음)"""
+        wanted = min(settings.LLM_BODY_MAX_TOKENS, max(_MIN_BODY_TOKENS, int(source_tokens * 1.2) + 64))
+        return self._fit_max_tokens(source_tokens, wanted)
+
+    def _split_chunks(self, text: str, chunk_tokens: int) -> List[str]:
+        """문장 경계 기준으로 chunk_tokens 이내의 구간으로 나눕니다. (문장부호 없이 긴 발화는 토큰 단위로 자름)"""
+        pieces = []
+        for sentence in (s.strip() for s in _SENTENCE_BOUNDARY.split(text)):
+            if not sentence:
+                continue
+            tokens = self.llm.tokenize(sentence.encode("utf-8"), add_bos=False)
+            for start in range(0, len(tokens), chunk_tokens):
+                part = tokens[start:start + chunk_tokens]
+                text_part = sentence if len(tokens) <= chunk_tokens else self.llm.detokenize(part).decode("utf-8", errors="ignore")
+                pieces.append((text_part, len(part)))
+
+        chunks, current, current_tokens = [], [], 0
+        for piece, n in pieces:
+            if current and current_tokens + n > chunk_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += n
+        if current:
+            chunks.append(" ".join(current))
+        return chunks
+
+    def _summarize_chunks(self, chunks: List[str], max_tokens: int, strict: bool = False) -> List[str]:
+        """
+        구간별 요약(map). 인스턴스 수만큼씩 제출해 병렬로 실행하되 대기열을 한꺼번에 채우지 않습니다.
+        요약에 실패한 구간은 앞부분을 잘라 그대로 사용합니다. (strict이면 예외를 그대로 던짐)
+        """
+        wave = max(1, settings.LLM_INSTANCES)
+        summaries = []
+        for start in range(0, len(chunks), wave):
+            batch = chunks[start:start + wave]
+            futures = [
+                self._submit_chat(
+                    "summary",
+                    [
+                        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                        {"role": "user", "content": f"녹음 구간: \"{chunk}\"\n\n이 구간의 핵심 내용을 요약해줘."},
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=0.2,
+                    top_p=0.9,
                 )
-            },
-            {
-                "role": "user",
-                "content": f"원문: \"{transcript}\"\n\n위 내용을 차분한 일기 본문으로 다듬어줘."
-            }
-        ]
+                for chunk in batch
+            ]
+            for chunk, future in zip(batch, futures):
+                try:
+                    summary = _strip_han(future.result()["choices"][0]["message"]["content"])
+                except _OVERLOAD_ERRORS:
+                    raise
+                except Exception as e:
+                    print(f"⚠️ Chunk Summary Error: {e}")
+                    if strict:
+                        raise
+                    summary = ""
+                summaries.append(summary or self._truncate(chunk, max_tokens))
+        return summaries
+
+    def _map_reduce(self, text: str, depth: int = 0, strict: bool = False) -> str:
+        tokens = self.count_tokens(text)
+        if tokens <= settings.LLM_MAP_REDUCE_THRESHOLD_TOKENS:
+            return text
+        if depth > _MAX_REDUCE_DEPTH:
+            # 여러 번 요약해도 길면 예산만큼 잘라서 사용 (생성 시간 상한 보장)
+            return self._truncate(text, settings.LLM_MAP_REDUCE_THRESHOLD_TOKENS)
+
+        chunks = self._split_chunks(text, settings.LLM_MAP_CHUNK_TOKENS)
+        LLM_MAP_REDUCE_CHUNKS.observe(len(chunks))
+        # 요약을 모두 합쳐도 LLM_MAP_SUMMARY_TOKENS 안에 들어가도록 구간별 길이를 나눔
+        per_chunk = max(_MIN_SUMMARY_TOKENS, settings.LLM_MAP_SUMMARY_TOKENS // len(chunks))
+        print(f"✂️ Long transcript ({tokens} tokens) → {len(chunks)} chunks x {per_chunk} tokens")
+        condensed = "\n".join(self._summarize_chunks(chunks, per_chunk, strict=strict))
+        # 구간이 많아 요약을 합쳐도 길면 한 번 더 요약
+        return self._map_reduce(condensed, depth + 1, strict=strict)
+
+    def condense_transcript(self, transcript: str, strict: bool = False) -> str:
+        """
+        원문이 LLM_MAP_REDUCE_THRESHOLD_TOKENS보다 길면 구간별 요약을 이어 붙인 텍스트를, 아니면 원문을 반환합니다.
+        요약은 원문 해시별 Future로 캐시되어, 본문/위로 메시지 생성이 동시에 요청해도 한 번만 요약합니다.
+        (나중에 온 요청은 진행 중인 요약을 기다림, 실패하면 캐시에서 빼서 다음 요청이 다시 시도)
+        strict이면 구간 요약 실패 시 잘라낸 원문으로 대체하지 않고 예외를 던집니다.
+        (대체 구간이 섞인 요약은 strict 요청과 공유하지 않도록 캐시 키를 나눔)
+        """
+        if self.count_tokens(transcript) <= settings.LLM_MAP_REDUCE_THRESHOLD_TOKENS:
+            return transcript
+
+        key = (hashlib.sha256(transcript.encode("utf-8")).hexdigest(), strict)
+        with self._condensed_lock:
+            future = self._condensed.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._condensed[key] = future
+                while len(self._condensed) > _CONDENSED_CACHE_SIZE:
+                    self._condensed.popitem(last=False)
+            else:
+                self._condensed.move_to_end(key)
+
+        if not owner:
+            return future.result()
+
+        try:
+            future.set_result(self._map_reduce(transcript, strict=strict))
+        except BaseException as e:
+            with self._condensed_lock:
+                if self._condensed.get(key) is future:
+                    del self._condensed[key]
+            future.set_exception(e)
+        return future.result()
+
+    def generate_diary(
+        self,
+        transcript: str,
+        emotion: Optional[str] = None,
+        on_token: Optional[TokenCallback] = None,
+        strict: bool = False,
+    ) -> str:
+        """
+        일기 내용 본문 생성 (on_token: 생성되는 토큰을 실시간으로 받을 콜백)
+        본문은 원문만으로 생성하므로(emotion은 프롬프트에 쓰지 않음) 감정 분석과 동시에 실행할 수 있습니다.
+        strict이면 생성 오류 시 대체 문구(원문) 대신 예외를 던집니다. (파이프라인 단계 실패 → 체크포인트 안 남김)
+        """
+        if not transcript or len(transcript) < 10:
+            return transcript
 
         try:
-            response = self.llm.create_chat_completion(
-                messages=messages,
-                max_tokens=400,
+            # 긴 원문은 구간 요약으로 대체하고, max_tokens는 원문 길이에 맞춤
+            source = self.condense_transcript(transcript, strict=strict)
+            source_tokens = self.count_tokens(source)
+            LLM_PROMPT_TOKENS.labels(output="diary").observe(source_tokens)
+            label = "원문" if source == transcript else "원문(긴 녹음을 구간별로 요약한 내용)"
+
+            messages = [
+                {
+                    "role": "system",
+                    "content": DIARY_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": f"{label}: \"{source}\"\n\n위 내용을 차분한 일기 본문으로 다듬어줘."
+                }
+            ]
+
+            response = self._chat(
+                "diary",
+                messages,
+                on_token=on_token,
+                max_tokens=self._body_max_tokens(source_tokens),
                 temperature=0.3,
                 top_p=0.9
             )
             generated_text = response["choices"][0]["message"]["content"]
 
             # 후처리
-            final_diary = re.sub(r'[\u4e00-\u9fff]+', '', generated_text)
-            final_diary = final_diary.replace("()", "").replace("[|assistant|]", "").strip()
-            return final_diary
+            return _strip_han(generated_text)
 
+        except _OVERLOAD_ERRORS:
+            raise
         except Exception as e:
+            if strict:
+                raise
             print(f"❌ Diary Body Error: {e}")
             return transcript
 
-    def generate_title(self, diary_content: str) -> str:
-        """[New] 일기 내용을 읽고 '감성 제목'을 별도로 생성"""
+    def generate_title(self, diary_content: str, strict: bool = False) -> str:
+        """[New] 일기 내용을 읽고 '감성 제목'을 별도로 생성 (strict이면 실패 시 첫 문장 대신 예외)"""
         if not diary_content: return "오늘의 기록"
 
         # 제목 생성을 위한 전용 프롬프트
         messages = [
             {
                 "role": "system",
-                "content": (
-                    "당신은 '일기 제목 작가'입니다. 주어진 일기 내용을 읽고 가장 어울리는 제목을 지어주세요.\n"
-                    "규칙:\n"
-                    "1. 내용을 함축하는 **감성적이고 은유적인 제목**을 지으세요.\n"
-                    "2. 길이는 **공백 포함 20자 이내**로 짧게 하세요.\n"
-                    "3. 따옴표나 '제목:' 같은 접두사를 붙이지 말고 오직 제목 텍스트만 출력하세요."
-                )
+                "content": TITLE_SYSTEM_PROMPT
             },
             {
                 "role": "user",
@@ -90,70 +464,149 @@ class DiaryGenerationService:
 
         try:
             # 제목은 짧으니까 max_tokens를 작게 설정 (속도 최적화)
-            response = self.llm.create_chat_completion(
-                messages=messages,
+            response = self._chat(
+                "title",
+                messages,
                 max_tokens=50,
                 temperature=0.7,
             )
             title = response["choices"][0]["message"]["content"]
 
-            # 후처리 (따옴표, 특수문자 제거)
-            title = title.replace('"', '').replace("'", "").replace(".", "").strip()
-            title = re.sub(r'[\u4e00-\u9fff]+', '', title) # 한자 제거
-
-            # 혹시 모를 긴 설명 방지
-            if "\n" in title: title = title.split("\n")[0]
-
-            return title
+            # 후처리 (따옴표, 특수문자, 한자 제거 / 혹시 모를 긴 설명 방지)
+            return _clean_title(title)
 
+        except _OVERLOAD_ERRORS:
+            raise
         except Exception as e:
+            if strict:
+                raise
             print(f"❌ Title Generation Error: {e}")
             # 실패 시 기존 방식(첫 문장)으로 백업
             return diary_content.split("\n")[0][:20] + "..."
 
-    def generate_advice(self, transcript: str, emotion_label: str) -> str:
-        """[New] 사용자 감정과 내용을 바탕으로 따뜻한 위로 메시지 생성"""
+    def generate_advice(
+        self,
+        transcript: str,
+        emotion_label: str,
+        on_token: Optional[TokenCallback] = None,
+        strict: bool = False,
+    ) -> str:
+        """
+        [New] 사용자 감정과 내용을 바탕으로 따뜻한 위로 메시지 생성 (on_token: 실시간 토큰 콜백)
+        strict이면 실패 시 고정 위로 문구 대신 예외를 던집니다.
+        """
         if not transcript: return "오늘 하루도 수고 많으셨어요."
 
-        messages = [
-            {
-                "role": "system",
-                "content": (
-                    "당신은 공감 능력이 뛰어난 '전문 심리 상담사'입니다. "
-                    "사용자의 이야기와 감정을 듣고 따뜻한 위로와 격려의 말을 건네주세요.\n"
-                    "규칙:\n"
-                    "1. 말투: '~해요', '~네요' 등 부드럽고 친절한 존댓말을 사용하세요.\n"
-                    "2. 길이: 3문장 이내로 간결하지만 진심이 느껴지게 작성하세요.\n"
-                    "3. 내용: 사용자의 감정(기쁨/슬픔/분노 등)을 인정해주고, 긍정적인 메시지로 마무리하세요."
-                )
-            },
-            {
-                "role": "user",
-                "content": (
-                    f"사용자 감정: {emotion_label}\n"
-                    f"사용자 이야기: \"{transcript}\"\n\n"
-                    "위 내용에 대해 따뜻한 위로의 말을 해줘."
-                )
-            }
-        ]
-
         try:
-            response = self.llm.create_chat_completion(
-                messages=messages,
+            # 긴 원문은 본문 생성과 같은 구간 요약을 사용 (캐시됨)
+            source = self.condense_transcript(transcript, strict=strict)
+            LLM_PROMPT_TOKENS.labels(output="advice").observe(self.count_tokens(source))
+
+            messages = [
+                {
+                    "role": "system",
+                    "content": ADVICE_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": (
+                        f"사용자 감정: {emotion_label}\n"
+                        f"사용자 이야기: \"{source}\"\n\n"
+                        "위 내용에 대해 따뜻한 위로의 말을 해줘."
+                    )
+                }
+            ]
+
+            response = self._chat(
+                "advice",
+                messages,
+                on_token=on_token,
                 max_tokens=150,  # 짧고 굵게
                 temperature=0.7, # 감성적인 답변을 위해 약간 높게
             )
             advice = response["choices"][0]["message"]["content"]
 
             # 후처리
-            advice = re.sub(r'[\u4e00-\u9fff]+', '', advice)
-            advice = advice.replace("[|assistant|]", "").strip()
-
-            return advice
+            return _strip_han(advice)
 
+        except _OVERLOAD_ERRORS:
+            raise
         except Exception as e:
+            if strict:
+                raise
             print(f"❌ Advice Generation Error: {e}")
             return "당신의 이야기를 들어줄 수 있어 기뻐요. 내일은 더 좋은 하루가 될 거예요."
 
+    def generate_all(self, transcript: str, emotion_label: str, strict: bool = False) -> GeneratedDiary:
+        """
+        [New] 본문/제목/위로 메시지를 한 번의 completion으로 생성합니다.
+        원문 transcript의 프롬프트 평가를 세 번이 아니라 한 번만 하므로 CPU 시간이 크게 줄어듭니다.
+        JSON 파싱에 실패하거나 비어 있는 필드는 기존 개별 생성 함수로 채웁니다.
+        strict이면 생성 오류는 (JSON 형식 오류 제외) 예외로 전달하고, 개별 생성도 strict로 호출합니다.
+        """
+        if not transcript or len(transcript) < 10:
+            body = self.generate_diary(transcript, emotion_label, strict=strict)
+            return GeneratedDiary(
+                body,
+                self.generate_title(body, strict=strict),
+                self.generate_advice(transcript, emotion_label, strict=strict),
+            )
+
+        parsed: Optional[dict] = None
+        try:
+            source = self.condense_transcript(transcript, strict=strict)
+            source_tokens = self.count_tokens(source)
+            LLM_PROMPT_TOKENS.labels(output="combined").observe(source_tokens)
+            label = "원문" if source == transcript else "원문(긴 녹음을 구간별로 요약한 내용)"
+
+            messages = [
+                {
+                    "role": "system",
+                    "content": COMBINED_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": (
+                        f"사용자 감정: {emotion_label}\n"
+                        f"{label}: \"{source}\"\n\n"
+                        '{"body": ..., "title": ..., "advice": ...} 형식으로 작성해줘.'
+                    )
+                }
+            ]
+
+            # 본문 예산 + 제목/위로 메시지/JSON 구조 몫
+            response = self._chat(
+                "combined",
+                messages,
+                max_tokens=self._fit_max_tokens(source_tokens, self._body_max_tokens(source_tokens) + 300),
+                temperature=0.5,
+                top_p=0.9,
+                response_format={"type": "json_object", "schema": COMBINED_SCHEMA},
+            )
+            parsed = json.loads(response["choices"][0]["message"]["content"])
+            if not isinstance(parsed, dict):
+                parsed = None
+        except _OVERLOAD_ERRORS:
+            raise
+        except Exception as e:
+            # JSON 형식 오류는 개별 생성으로 보충할 수 있으므로 strict여도 계속 진행
+            if strict and not isinstance(e, ValueError):
+                raise
+            print(f"⚠️ Combined Generation Error, falling back to per-field calls: {e}")
+
+        parsed = parsed or {}
+        body = _strip_han(str(parsed.get("body") or ""))
+        title = _clean_title(str(parsed.get("title") or ""))
+        advice = _strip_han(str(parsed.get("advice") or ""))
+
+        # 비어 있는 필드만 개별 호출로 보충
+        if not body:
+            body = self.generate_diary(transcript, emotion_label, strict=strict)
+        if not title:
+            title = self.generate_title(body, strict=strict)
+        if not advice:
+            advice = self.generate_advice(transcript, emotion_label, strict=strict)
+        return GeneratedDiary(body=body, title=title, advice=advice)
+
 # 싱글톤 인스턴스
 diary_service = DiaryGenerationService()
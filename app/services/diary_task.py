@@ -1,74 +1,354 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.domains.diary.models import Diary
 
-from app.services.stt_service import transcribe
-from app.services.emotion_service import analyze_emotion
-from app.services.diary_generation_service import diary_service
+from app.services.model_registry import model_registry
+from app.services.pipeline import Stage, StagePipeline
+from app.services.progress import DiaryProgressPublisher
+from app.services.stream_hub import stream_hub
+from app.services.stt_service import transcribe_audio
+from app.services.emotion_service import EMOTION_VERSION, analyze_emotion
+from app.services.diary_generation_service import GeneratedDiary, diary_service, prompt_version
+from app.services.job_queue import LeaseLostError, ensure_lease, register_handler
+
+# jobs 테이블의 작업 종류 (payload: {"diary_id": int})
+DIARY_JOB_KIND = "diary.process"
+
+# 재처리 시 'LLM 생성 단계만 다시 실행'을 뜻하는 값 (프롬프트 변경 후 재생성)
+LLM_STAGES = "llm"
+
+def diary_job_key(diary_id: int) -> str:
+    """같은 일기의 분석 작업이 중복으로 대기하지 않도록 하는 키"""
+    return f"diary:{diary_id}"
+
+# 단계 종류별 executor (동시에 처리 중인 작업들이 공유)
+# - stt: STT 워커 풀이 동시에 처리할 수 있는 수만큼 (PIPELINE_STT_THREADS)
+# - cpu: 감정 분류 (모델 하나를 CPU로 돌리므로 기본 1개)
+# - llm: LLM 생성 (실제 실행은 LLM 스케줄러가 인스턴스별로 직렬화)
+_EXECUTORS = {
+    "stt": ThreadPoolExecutor(max_workers=settings.PIPELINE_STT_THREADS, thread_name_prefix="pipeline-stt"),
+    "cpu": ThreadPoolExecutor(max_workers=settings.PIPELINE_CPU_THREADS, thread_name_prefix="pipeline-cpu"),
+    "llm": ThreadPoolExecutor(max_workers=settings.PIPELINE_LLM_THREADS, thread_name_prefix="pipeline-llm"),
+}
+
+# 단계가 시작될 때 사용자에게 보여줄 메시지
+STAGE_MESSAGES = {
+    "stt": "🎤 목소리를 글로 옮기고 있어요... (STT)",
+    "emotion": "🧠 목소리에 담긴 감정을 분석하고 있어요...",
+    "body": "✍️ 오늘의 이야기를 일기로 다듬고 있어요...",
+    "combined": "✍️ 오늘의 이야기를 일기로 다듬고 있어요...",
+    "advice": "💌 당신을 위한 위로의 한마디를 고민 중이에요...",
+}
+
+
+class EmptyTranscriptError(RuntimeError):
+    """
+    음성 인식이 정상적으로 끝났는데 말소리가 없을 때 (재시도해도 같으므로 바로 FAILED)
+    STT 오류(대기열 포화, 워커 오류 등)는 이 예외가 아니라 그대로 전달되어 작업 대기열이 재시도합니다.
+    """
+
+
+def build_pipeline(diary_id: int, audio_path: str) -> StagePipeline:
+    """
+    일기 분석 단계 DAG
+        stt → emotion → advice
+        stt → body → title
+    감정 분류(cpu)와 본문 생성(llm)이 동시에 실행되고, 제목과 위로 메시지도 서로 기다리지 않습니다.
+    (LLM_COMBINED_GENERATION이면 stt → emotion → combined)
+    """
+    def run_stt(results: dict):
+        # 세그먼트가 나올 때마다 부분 텍스트/진행률을 기록하고,
+        # 첫 텍스트가 나오면 다음 단계 모델(감정/LLM)을 미리 올려둠
+        publisher = DiaryProgressPublisher(diary_id)
+
+        def on_stt_progress(text: str, percent: float) -> None:
+            if not (model_registry.is_loaded("emotion") and model_registry.is_loaded("llm")):
+                model_registry.start_warmup(["emotion", "llm"])
+            publisher.publish(text, percent)
+
+        try:
+            return transcribe_audio(audio_path, on_progress=on_stt_progress)
+        finally:
+            publisher.close()
+
+    def run_emotion(results: dict):
+        return analyze_emotion(results["stt"].text)
+
+    # 생성 중인 토큰은 SSE(/diaries/{id}/stream)로 실시간 전달
+    # strict: 생성 실패 시 대체 문구를 저장(체크포인트)하지 않고 단계를 실패시켜 작업 재시도 때 다시 생성
+    def run_body(results: dict):
+        return diary_service.generate_diary(
+            results["stt"].text,
+            on_token=lambda token: stream_hub.publish(diary_id, "summary", token),
+            strict=True,
+        )
+
+    def run_title(results: dict):
+        return diary_service.generate_title(results["body"], strict=True)
+
+    def run_advice(results: dict):
+        return diary_service.generate_advice(
+            results["stt"].text, results["emotion"]["label"],
+            on_token=lambda token: stream_hub.publish(diary_id, "advice", token),
+            strict=True,
+        )
+
+    def run_combined(results: dict):
+        # 본문/제목/위로 메시지 한 번에 생성 (프롬프트 평가 1회, JSON이라 완성 후 한 번에 전달)
+        return diary_service.generate_all(results["stt"].text, results["emotion"]["label"], strict=True)
+
+    stages = [
+        Stage("stt", run_stt, executor="stt"),
+        Stage("emotion", run_emotion, deps=("stt",), executor="cpu"),
+    ]
+    if settings.LLM_COMBINED_GENERATION:
+        stages.append(Stage("combined", run_combined, deps=("stt", "emotion"), executor="llm"))
+    else:
+        stages += [
+            Stage("body", run_body, deps=("stt",), executor="llm"),
+            Stage("title", run_title, deps=("body",), executor="llm"),
+            Stage("advice", run_advice, deps=("stt", "emotion"), executor="llm"),
+        ]
+    return StagePipeline("diary", stages)
+
+
+# ==========================================
+# 단계 체크포인트
+# ==========================================
+def current_stage_versions() -> Dict[str, str]:
+    """단계별 현재 버전 (저장된 버전과 다르면 그 단계부터 다시 실행)"""
+    return {
+        "stt": settings.MODEL_VERSION,
+        "emotion": EMOTION_VERSION,
+        "body": prompt_version("diary", "summary"),
+        "title": prompt_version("title"),
+        "advice": prompt_version("advice"),
+        "combined": prompt_version("combined", "summary"),
+    }
+
+def _is_current(stored: Optional[str], current: str) -> bool:
+    # 저장된 값 뒤에 실행 정보가 붙을 수 있음 (예: v1.0+stt-small-b2, <감정 버전>+fast)
+    return stored is not None and (stored == current or stored.startswith(f"{current}+"))
+
+def _stored_version(diary: Diary, stage: str) -> Optional[str]:
+    versions = diary.stage_versions
+    if versions is None:
+        # 체크포인트 도입 전에 완료된 일기: STT/감정은 기존 버전 컬럼으로 판단, LLM 단계는 버전을 알 수 없음
+        if diary.status != "COMPLETED":
+            return None
+        return {"stt": diary.model_version, "emotion": diary.emotion_version}.get(stage)
+    if stage not in versions:
+        return None
+    # 감정 백필은 emotion_version 컬럼만 갱신하므로 컬럼 값을 사용
+    return diary.emotion_version if stage == "emotion" else versions[stage]
+
+def _checkpoint(diary: Diary, stage: str):
+    """저장된 단계 결과를 파이프라인 결과 형식으로 복원"""
+    if stage == "stt":
+        return SimpleNamespace(text=diary.transcript)
+    if stage == "emotion":
+        return {
+            "label": diary.emotion_label,
+            "all_scores": diary.emotion_score,
+            "timeline": diary.emotion_timeline,
+            "version": diary.emotion_version,
+        }
+    if stage == "combined":
+        return GeneratedDiary(body=diary.summary, title=diary.title, advice=diary.advice)
+    return {"body": diary.summary, "title": diary.title, "advice": diary.advice}[stage]
+
+def plan_stages(pipeline: StagePipeline, diary: Diary, rerun: Sequence[str] = ()) -> List[str]:
+    """
+    다시 실행할 단계 목록 (의존 순서)
+    저장된 결과가 없거나 버전이 다른 단계, rerun으로 지정한 단계, 그리고 이들에 의존하는 단계가 포함됩니다.
+    rerun에 LLM_STAGES("llm")를 넣으면 LLM 생성 단계 전체를 지정합니다.
+    """
+    forced = set()
+    for name in rerun:
+        if name == LLM_STAGES:
+            forced.update(n for n in pipeline.order if pipeline.stages[n].executor == "llm")
+        elif name in pipeline.stages:
+            forced.add(name)
+        elif name in ("body", "title", "advice") and "combined" in pipeline.stages:
+            forced.add("combined")
+
+    versions = current_stage_versions()
+    stale = [
+        name for name in pipeline.order
+        if name in forced or not _is_current(_stored_version(diary, name), versions[name])
+    ]
+    return pipeline.descendants(stale)
+
+def stages_to_run(diary: Diary, rerun: Sequence[str] = ()) -> List[str]:
+    """plan_stages와 같지만 일기를 바꾸지 않음 (작업 등록 전에 재처리할 단계가 있는지 확인)"""
+    return plan_stages(build_pipeline(diary.id, diary.audio_path), diary, rerun)
+
+def invalidate_stages(diary: Diary, rerun: Sequence[str] = ()) -> List[str]:
+    """
+    다시 실행할 단계를 정하고 그 체크포인트(버전)를 지웁니다. (commit은 호출자)
+    재처리 요청 시 작업 등록과 같은 트랜잭션에서 호출하면, 작업이 중간에 실패해 재시도되더라도
+    이미 다시 생성한 단계는 건너뛰고 남은 단계부터 이어서 실행합니다.
+    """
+    pipeline = build_pipeline(diary.id, diary.audio_path)
+    todo = plan_stages(pipeline, diary, rerun)
+    diary.stage_versions = {
+        name: _stored_version(diary, name) for name in pipeline.order if name not in todo
+    }
+    return todo
+
 
 def process_audio_task(diary_id: int):
+    """
+    일기 분석 파이프라인 (작업 대기열 워커에서 실행)
+    단계들은 각자의 executor에서 실행되고, 결과는 끝나는 대로 이 스레드의 세션으로 일기에 저장됩니다.
+    단계 결과는 버전과 함께 체크포인트로 남으므로, 재시도/재처리 시 저장된 결과가 없거나
+    버전이 바뀐 첫 단계부터 이어서 실행합니다.
+    일시적인 오류는 예외를 다시 던져 작업 대기열이 재시도하게 하고,
+    재시도 한도를 넘으면 mark_diary_failed가 일기를 FAILED로 표시합니다.
+    모든 commit 전에 작업 임대를 확인하므로(ensure_lease), 임대를 잃은 워커는 더 이상 일기에 쓰지 않고 중단됩니다.
+    """
     print(f"🔄 Task Started for Diary ID: {diary_id}")
     db: Session = SessionLocal()
+    serial_executor = None
+    lease_lost = False
+
+    def save() -> None:
+        # 임대를 잃었으면 LeaseLostError (회수한 워커가 같은 일기를 다시 처리 중)
+        ensure_lease(db)
+        db.commit()
+
     try:
         diary = db.query(Diary).filter(Diary.id == diary_id).first()
         if not diary: return
 
-        # 0. 시작
-        diary.status = "PROCESSING"
-        diary.process_message = "🎧 오디오 파일을 확인하고 있어요..."
-        db.commit() # 중간 저장
-
-        # 1. STT
-        diary.process_message = "🎤 목소리를 글로 옮기고 있어요... (STT)"
-        db.commit() # 중간 저장
+        # 0. 다시 실행할 단계 결정 (나머지는 저장된 결과를 사용)
+        pipeline = build_pipeline(diary_id, diary.audio_path)
+        # 다시 실행할 단계의 버전은 지워 둠 (중간에 실패하면 재시도 때 그 단계부터 다시 실행)
+        todo = invalidate_stages(diary)
+        kept = [name for name in pipeline.order if name not in todo]
+        versions = current_stage_versions()
+        initial = {name: _checkpoint(diary, name) for name in kept}
+        if kept:
+            print(f"♻️ Resuming Diary {diary_id}: reuse {kept}, run {todo}")
 
-        transcript = transcribe(diary.audio_path)
-        if not transcript:
-            print("❌ STT Result Empty")
-            diary.status = "FAILED"
-            diary.process_message = "음성 인식에 실패했습니다."
-            db.commit()
-            return
-        diary.transcript = transcript
-
-        # 2. 감정 분석
-        diary.process_message = "🧠 목소리에 담긴 감정을 분석하고 있어요..."
-        db.commit() # 중간 저장
+        # 완료된 일기를 다시 생성할 때는 기존 결과를 계속 보여줌 (단계가 끝날 때마다 교체)
+        if diary.status != "COMPLETED":
+            diary.status = "PROCESSING"
+        if "stt" in todo:
+            diary.process_message = "🎧 오디오 파일을 확인하고 있어요..."
+        save() # 중간 저장
+        if "stt" in initial:
+            stream_hub.open(diary_id)
 
-        emotion_res = analyze_emotion(transcript)
-        diary.emotion_label = emotion_res["label"]
-        diary.emotion_score = emotion_res["all_scores"]
+        def stream_status(message: str) -> None:
+            diary.process_message = message
+            save() # 중간 저장
+            stream_hub.publish(diary_id, "status", message)
 
-        # 3. 일기 및 위로 메시지 생성
-        print("✍️ Generating Diary & Advice...")
+        def on_start(stage: str) -> None:
+            if stage in STAGE_MESSAGES:
+                stream_status(STAGE_MESSAGES[stage])
 
-        # 3-1. 일기 본문
-        diary.process_message = "✍️ 오늘의 이야기를 일기로 다듬고 있어요..."
-        db.commit() # 중간 저장
-        generated_diary = diary_service.generate_diary(transcript, diary.emotion_label)
-        diary.summary = generated_diary
+        def on_done(stage: str, result) -> None:
+            # 스트림 이벤트를 보내기 전에 임대 확인 (임대 행 잠금은 아래 commit까지 유지)
+            ensure_lease(db)
+            version = versions[stage]
+            if stage == "stt":
+                # 부하에 따라 선택된 STT 티어를 모델 버전에 기록 (예: v1.0+stt-small-b2)
+                diary.model_version = f"{settings.MODEL_VERSION}+{result.tier.tag}"
+                if not result.text:
+                    raise EmptyTranscriptError()
+                diary.transcript = result.text
+                diary.progress = 100
+                version = diary.model_version
+                # LLM 단계의 토큰 스트림 시작
+                stream_hub.open(diary_id)
+            elif stage == "emotion":
+                diary.emotion_label = result["label"]
+                diary.emotion_score = result["all_scores"]
+                diary.emotion_timeline = result["timeline"]
+                diary.emotion_version = result["version"]
+                version = result["version"]
+            elif stage == "body":
+                diary.summary = result
+                # 후처리된 최종 본문으로 교체
+                stream_hub.publish(diary_id, "summary_done", result)
+            elif stage == "title":
+                diary.title = result
+                stream_hub.publish(diary_id, "title", result)
+            elif stage == "advice":
+                diary.advice = result
+                stream_hub.publish(diary_id, "advice_done", result)
+            elif stage == "combined":
+                diary.summary, diary.title, diary.advice = result.body, result.title, result.advice
+                stream_hub.publish(diary_id, "summary_done", result.body)
+                stream_hub.publish(diary_id, "title", result.title)
+                stream_hub.publish(diary_id, "advice_done", result.advice)
+            # 체크포인트 기록 (JSON 컬럼은 새 dict를 대입해야 변경이 감지됨)
+            diary.stage_versions = {**(diary.stage_versions or {}), stage: version}
+            save() # 단계가 끝날 때마다 저장
 
-        # 3-2. 제목
-        diary.title = diary_service.generate_title(generated_diary)
+        executors = _EXECUTORS
+        if not settings.PIPELINE_CONCURRENT:
+            # 비교용: 모든 단계를 하나의 스레드에서 순서대로 실행
+            serial_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-serial")
+            executors = {name: serial_executor for name in _EXECUTORS}
 
-        # 3-3. 위로 메시지
-        diary.process_message = "💌 당신을 위한 위로의 한마디를 고민 중이에요..."
-        db.commit() # 중간 저장
-        diary.advice = diary_service.generate_advice(transcript, diary.emotion_label)
+        pipeline.run(executors, initial=initial, on_start=on_start, on_done=on_done)
 
-        # 4. 완료
+        # 완료
         diary.status = "COMPLETED"
         diary.process_message = "✅ 분석이 완료되었습니다!"
-        db.commit()
+        save()
         print("✅ Task Completed!")
 
+    except EmptyTranscriptError:
+        print("❌ STT Result Empty")
+        diary.status = "FAILED"
+        diary.process_message = "음성 인식에 실패했습니다."
+        save()
+    except LeaseLostError:
+        # 결과는 회수한 워커가 기록하므로 아무것도 쓰지 않고 중단
+        print(f"⚠️ Lease lost for Diary {diary_id}, discarding this run")
+        lease_lost = True
+        db.rollback()
+        raise
     except Exception as e:
         print(f"🔥 Task Error: {e}")
+        db.rollback()
         diary = db.query(Diary).filter(Diary.id == diary_id).first()
         if diary:
+            diary.process_message = "⏳ 일시적인 오류로 잠시 후 다시 분석할게요..."
+            try:
+                save()
+            except LeaseLostError:
+                lease_lost = True
+                db.rollback()
+        raise
+    finally:
+        if serial_executor is not None:
+            serial_executor.shutdown(wait=False)
+        # 스트림 구독자에게 종료 알림 (최종 결과는 GET /diaries/{id}로 조회)
+        # 임대를 잃었으면 다시 처리 중인 워커의 스트림을 닫지 않음
+        if not lease_lost:
+            stream_hub.close(diary_id)
+        db.close()
+
+def mark_diary_failed(payload: dict, error: str) -> None:
+    """재시도 한도를 넘은(dead-letter) 분석 작업의 일기를 FAILED로 표시"""
+    db: Session = SessionLocal()
+    try:
+        diary = db.query(Diary).filter(Diary.id == payload.get("diary_id")).first()
+        if diary and diary.status != "COMPLETED":
             diary.status = "FAILED"
             diary.process_message = "서버 오류가 발생했습니다."
             db.commit()
     finally:
         db.close()
+
+register_handler(DIARY_JOB_KIND, process_audio_task, on_dead=mark_diary_failed)
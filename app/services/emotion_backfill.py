@@ -0,0 +1,183 @@
+"""
+감정 재분석(백필)
+
+CANDIDATE_LABELS나 가설 템플릿이 바뀌면 EMOTION_VERSION이 달라집니다.
+이 모듈은 버전이 다른 일기들의 transcript를 id 순서의 keyset 페이지로 읽어 큰 배치로 다시 분류하고,
+emotion_label / emotion_score / emotion_timeline / emotion_version을 bulk update 합니다.
+페이지마다 체크포인트(마지막 id)를 남기므로 중단되어도 이어서 실행할 수 있습니다.
+
+사용법:
+    python -m app.services.emotion_backfill                 # 체크포인트부터 이어서 실행
+    python -m app.services.emotion_backfill --reset --all   # 처음부터, 현재 버전인 일기도 포함
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import or_
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.exceptions import BackfillAlreadyRunningException
+from app.core.metrics import EMOTION_BACKFILL_ROWS
+from app.domains.diary.models import Diary
+from app.services.emotion_service import EMOTION_VERSION, analyze_emotions
+
+logger = logging.getLogger("Vench.EmotionBackfill")
+
+# 같은 프로세스 안에서 백필이 동시에 두 번 돌지 않도록 막음
+_running = threading.Lock()
+
+
+# ==========================================
+# 1. 체크포인트
+# ==========================================
+def load_checkpoint(path: Optional[str] = None) -> Optional[dict]:
+    path = path or settings.EMOTION_BACKFILL_CHECKPOINT
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_checkpoint(path: str, state: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # 임시 파일에 쓴 뒤 교체 (쓰는 도중 중단돼도 이전 체크포인트가 깨지지 않음)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+# ==========================================
+# 2. 백필 실행
+# ==========================================
+def is_running() -> bool:
+    return _running.locked()
+
+
+def backfill_emotions(
+    page_size: Optional[int] = None,
+    batch_pairs: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    only_outdated: bool = True,
+    reset: bool = False,
+    max_rows: Optional[int] = None,
+) -> dict:
+    """
+    transcript가 있는 일기를 id 오름차순 keyset 페이지로 읽어 감정을 다시 분류합니다.
+    - only_outdated: emotion_version이 현재 EMOTION_VERSION과 다른 일기만 대상
+    - reset: 체크포인트를 무시하고 처음부터 실행
+    - max_rows: 이번 실행에서 처리할 최대 건수 (나머지는 다음 실행에서 이어서 처리)
+    체크포인트의 버전이 현재 EMOTION_VERSION과 다르면 처음부터 다시 시작합니다.
+    """
+    if not _running.acquire(blocking=False):
+        raise BackfillAlreadyRunningException()
+
+    try:
+        page_size = page_size or settings.EMOTION_BACKFILL_PAGE_SIZE
+        batch_pairs = batch_pairs or settings.EMOTION_BACKFILL_BATCH_PAIRS
+        checkpoint_path = checkpoint_path or settings.EMOTION_BACKFILL_CHECKPOINT
+
+        checkpoint = None if reset else load_checkpoint(checkpoint_path)
+        if checkpoint and checkpoint.get("emotion_version") != EMOTION_VERSION:
+            logger.info(f"🔁 Checkpoint is for {checkpoint.get('emotion_version')}, restarting from the beginning.")
+            checkpoint = None
+
+        state = checkpoint or {
+            "emotion_version": EMOTION_VERSION,
+            "last_id": 0,
+            "processed": 0,
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        state["status"] = "RUNNING"
+        state["only_outdated"] = only_outdated
+
+        logger.info(f"🧠 Emotion backfill started (version={EMOTION_VERSION}, from id>{state['last_id']})")
+        processed_now = 0
+        started = time.perf_counter()
+
+        while max_rows is None or processed_now < max_rows:
+            limit = page_size if max_rows is None else min(page_size, max_rows - processed_now)
+            with SessionLocal() as db:
+                query = (
+                    db.query(Diary.id, Diary.transcript)
+                    .filter(Diary.id > state["last_id"])
+                    .filter(Diary.transcript.isnot(None))
+                    .filter(Diary.transcript != "")
+                )
+                if only_outdated:
+                    query = query.filter(or_(
+                        Diary.emotion_version.is_(None),
+                        Diary.emotion_version != EMOTION_VERSION,
+                    ))
+                rows = query.order_by(Diary.id).limit(limit).all()
+                if not rows:
+                    break
+
+                # 백필은 항상 NLI 모델로 분류 (경량 헤드 학습 데이터로도 쓰이므로)
+                results = analyze_emotions(
+                    [row.transcript for row in rows], max_pairs_per_batch=batch_pairs, use_fast_path=False
+                )
+                db.bulk_update_mappings(Diary, [
+                    {
+                        "id": row.id,
+                        "emotion_label": res["label"],
+                        "emotion_score": res["all_scores"],
+                        "emotion_timeline": res["timeline"],
+                        "emotion_version": res["version"],
+                    }
+                    for row, res in zip(rows, results)
+                ])
+                db.commit()
+
+            # 커밋된 페이지까지만 체크포인트에 기록
+            processed_now += len(rows)
+            EMOTION_BACKFILL_ROWS.inc(len(rows))
+            state["last_id"] = rows[-1].id
+            state["processed"] += len(rows)
+            state["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            _save_checkpoint(checkpoint_path, state)
+
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"   ... {state['processed']} rows (last id={state['last_id']}, "
+                f"{processed_now / max(elapsed, 1e-6):.1f} rows/s)"
+            )
+
+        state["status"] = "COMPLETED" if max_rows is None or processed_now < max_rows else "PAUSED"
+        _save_checkpoint(checkpoint_path, state)
+        logger.info(f"✅ Emotion backfill {state['status'].lower()}: {processed_now} rows this run")
+        return state
+
+    except Exception as e:
+        logger.error(f"🔥 Emotion backfill failed: {e}")
+        raise
+    finally:
+        _running.release()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="일기 감정 재분석(백필)")
+    parser.add_argument("--page-size", type=int, default=None, help="DB에서 한 번에 읽어올 일기 수")
+    parser.add_argument("--batch-pairs", type=int, default=None, help="한 번의 추론에 넣을 (전제, 가설) 쌍 수")
+    parser.add_argument("--checkpoint", default=None, help="체크포인트 파일 경로")
+    parser.add_argument("--all", action="store_true", help="현재 버전으로 분석된 일기도 다시 분류")
+    parser.add_argument("--reset", action="store_true", help="체크포인트를 무시하고 처음부터 실행")
+    parser.add_argument("--max-rows", type=int, default=None, help="이번 실행에서 처리할 최대 건수")
+    args = parser.parse_args()
+
+    result = backfill_emotions(
+        page_size=args.page_size,
+        batch_pairs=args.batch_pairs,
+        checkpoint_path=args.checkpoint,
+        only_outdated=not args.all,
+        reset=args.reset,
+        max_rows=args.max_rows,
+    )
+    print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -0,0 +1,266 @@
+"""
+경량 감정 분류 헤드 (제로샷 NLI 모델의 증류)
+
+NLI 모델이 저장해 둔 일기별 감정 점수(emotion_score)를 soft target으로,
+사용자 감정 교정(Feedback.corrected_emotion)을 정답으로 삼아
+해시 문자 n-gram 특징 위의 선형(softmax) 분류기를 학습합니다.
+analyze_emotion은 이 헤드의 확신도가 임계값 이상이면 NLI 추론을 건너뜁니다.
+
+사용법:
+    python -m app.services.emotion_distill                  # 학습 후 EMOTION_HEAD_PATH에 저장
+    python -m app.services.emotion_distill --epochs 30 --holdout 0.2
+"""
+import argparse
+import json
+import os
+import threading
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.emotion_service import EMOTION_VERSION, KOREAN_LABELS
+
+# 희소 특징 벡터 (해시 인덱스, 값)
+SparseVector = Tuple[np.ndarray, np.ndarray]
+
+
+# ==========================================
+# 1. 해시 문자 n-gram 선형 분류기
+# ==========================================
+class CharNgramEmotionHead:
+    """
+    문자 n-gram을 고정 크기 공간으로 해싱한 희소 특징 + softmax 선형 분류기입니다.
+    (형태소 분석 없이 한국어 어미/구어체 변형에도 견고하고, 추론은 수 ms 이내)
+    """
+
+    def __init__(
+        self,
+        labels: Sequence[str] = KOREAN_LABELS,
+        n_features: int = 2 ** 18,
+        ngram_range: Tuple[int, int] = (1, 3),
+    ):
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.W = np.zeros((n_features, len(self.labels)), dtype=np.float32)
+        self.b = np.zeros(len(self.labels), dtype=np.float32)
+        self.meta: dict = {}
+
+    def featurize(self, text: str) -> SparseVector:
+        # 공백을 하나로 합치고 양 끝에 경계 표시를 붙여 어절 시작/끝 n-gram도 구분
+        text = f" {' '.join(text.split())} "
+        counts = {}
+        lo, hi = self.ngram_range
+        for n in range(lo, hi + 1):
+            for i in range(len(text) - n + 1):
+                # Python hash()는 프로세스마다 달라지므로 crc32 사용
+                idx = zlib.crc32(text[i : i + n].encode("utf-8")) % self.n_features
+                counts[idx] = counts.get(idx, 0) + 1
+
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.log1p(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        norm = np.linalg.norm(values)
+        return indices, values / norm if norm > 0 else values
+
+    def _logits(self, vectors: List[SparseVector]) -> np.ndarray:
+        return np.stack([values @ self.W[indices] for indices, values in vectors]) + self.b
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        logits = self._logits([self.featurize(t) for t in texts])
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def fit(
+        self,
+        texts: Sequence[str],
+        targets: np.ndarray,
+        sample_weight: Optional[np.ndarray] = None,
+        epochs: int = 20,
+        lr: float = 0.5,
+        l2: float = 1e-5,
+        batch_size: int = 64,
+        seed: int = 0,
+    ) -> "CharNgramEmotionHead":
+        """targets: (샘플 수, 라벨 수) 확률 분포 (soft target 또는 one-hot)"""
+        rng = np.random.default_rng(seed)
+        vectors = [self.featurize(t) for t in texts]
+        weights = np.ones(len(vectors), dtype=np.float32) if sample_weight is None else sample_weight
+
+        for epoch in range(epochs):
+            order = rng.permutation(len(vectors))
+            step_lr = lr / (1 + epoch * 0.1)
+            for start in range(0, len(order), batch_size):
+                batch = order[start : start + batch_size]
+                logits = self._logits([vectors[i] for i in batch])
+                logits -= logits.max(axis=1, keepdims=True)
+                probs = np.exp(logits)
+                probs /= probs.sum(axis=1, keepdims=True)
+
+                # soft-target 교차 엔트로피의 로짓 기울기
+                grad = (probs - targets[batch]) * weights[batch, None] / len(batch)
+                for row, i in enumerate(batch):
+                    indices, values = vectors[i]
+                    np.add.at(self.W, indices, -step_lr * values[:, None] * grad[row])
+                self.b -= step_lr * grad.sum(axis=0)
+                if l2:
+                    self.b *= 1 - step_lr * l2
+            if l2:
+                self.W *= 1 - step_lr * l2
+        return self
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        meta = {
+            **self.meta,
+            "labels": self.labels,
+            "n_features": self.n_features,
+            "ngram_range": list(self.ngram_range),
+        }
+        # 대부분 0인 가중치는 압축 저장
+        np.savez_compressed(path, W=self.W, b=self.b, meta=json.dumps(meta, ensure_ascii=False))
+
+    @classmethod
+    def load(cls, path: str) -> "CharNgramEmotionHead":
+        data = np.load(path)
+        meta = json.loads(str(data["meta"]))
+        head = cls(meta["labels"], meta["n_features"], tuple(meta["ngram_range"]))
+        head.W, head.b, head.meta = data["W"], data["b"], meta
+        return head
+
+
+# ==========================================
+# 2. 서비스용 로딩 (파일이 갱신되면 다시 로딩)
+# ==========================================
+_head_lock = threading.Lock()
+_head_cache: dict = {"mtime": None, "head": None}
+
+
+def get_fast_head() -> Optional[CharNgramEmotionHead]:
+    """
+    학습된 헤드를 반환합니다. 파일이 없거나, 헤드가 다른 감정 버전(라벨)으로 학습됐으면 None.
+    재학습으로 파일이 바뀌면 서버 재시작 없이 다시 로딩합니다.
+    """
+    path = settings.EMOTION_HEAD_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _head_lock:
+        if _head_cache["mtime"] != mtime:
+            head = CharNgramEmotionHead.load(path)
+            if head.meta.get("emotion_version") != EMOTION_VERSION:
+                print(f"⚠️ Emotion head was trained for {head.meta.get('emotion_version')}, ignoring it.")
+                head = None
+            _head_cache.update(mtime=mtime, head=head)
+        return _head_cache["head"]
+
+
+# ==========================================
+# 3. 학습 데이터 수집 / 학습 명령
+# ==========================================
+def load_training_data(correction_weight: float = 3.0):
+    """
+    (텍스트 목록, 목표 분포, 샘플 가중치)를 반환합니다.
+    - 현재 버전 NLI 결과(emotion_score)는 soft target
+    - 사용자 교정 라벨이 있으면 그 라벨의 one-hot으로 대체하고 가중치를 높임
+    """
+    from app.core.database import SessionLocal
+    from app.domains.diary.models import Diary
+    from app.domains.feedback.models import Feedback
+
+    label_index = {label: i for i, label in enumerate(KOREAN_LABELS)}
+    texts, targets, weights = [], [], []
+
+    with SessionLocal() as db:
+        # 일기별 가장 최근 교정 라벨
+        corrections = {}
+        for diary_id, label in (
+            db.query(Feedback.diary_id, Feedback.corrected_emotion)
+            .filter(Feedback.corrected_emotion.isnot(None))
+            .order_by(Feedback.id)
+        ):
+            if label in label_index:
+                corrections[diary_id] = label
+
+        rows = (
+            db.query(Diary.id, Diary.transcript, Diary.emotion_score, Diary.emotion_version)
+            .filter(Diary.transcript.isnot(None))
+            .filter(Diary.transcript != "")
+        )
+        for diary_id, transcript, scores, version in rows.yield_per(500):
+            target = np.zeros(len(KOREAN_LABELS), dtype=np.float32)
+            if diary_id in corrections:
+                target[label_index[corrections[diary_id]]] = 1.0
+                weight = correction_weight
+            elif version == EMOTION_VERSION and scores:
+                # 빠른 경로 결과("...+fast")는 학습에 다시 쓰지 않음 (자기 강화 방지)
+                for item in scores:
+                    if item.get("label") in label_index:
+                        target[label_index[item["label"]]] = float(item.get("score", 0.0))
+                if target.sum() <= 0:
+                    continue
+                target /= target.sum()
+                weight = 1.0
+            else:
+                continue
+            texts.append(transcript)
+            targets.append(target)
+            weights.append(weight)
+
+    return texts, np.array(targets, dtype=np.float32).reshape(-1, len(KOREAN_LABELS)), np.array(weights, dtype=np.float32)
+
+
+def _report(head: CharNgramEmotionHead, texts: List[str], targets: np.ndarray) -> None:
+    """검증 세트에서 임계값별 빠른 경로 적중률/정확도를 출력합니다."""
+    probs = head.predict_proba(texts)
+    confident = probs.max(axis=1)
+    correct = probs.argmax(axis=1) == targets.argmax(axis=1)
+    print(f"\n📊 holdout={len(texts)} accuracy={correct.mean():.1%}")
+    print(f"{'threshold':>10}{'hit ratio':>12}{'accuracy@hit':>14}")
+    for threshold in (0.5, 0.6, 0.7, 0.8, 0.9):
+        hit = confident >= threshold
+        acc = correct[hit].mean() if hit.any() else float("nan")
+        print(f"{threshold:>10.2f}{hit.mean():>12.1%}{acc:>14.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경량 감정 분류 헤드 학습")
+    parser.add_argument("--output", default=None, help="저장 경로 (기본: EMOTION_HEAD_PATH)")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--lr", type=float, default=0.5)
+    parser.add_argument("--holdout", type=float, default=0.2, help="검증용으로 떼어둘 비율")
+    parser.add_argument("--correction-weight", type=float, default=3.0, help="사용자 교정 샘플 가중치")
+    parser.add_argument("--min-samples", type=int, default=50)
+    args = parser.parse_args()
+
+    texts, targets, weights = load_training_data(args.correction_weight)
+    print(f"📚 Loaded {len(texts)} samples ({int((weights > 1).sum())} user corrections)")
+    if len(texts) < args.min_samples:
+        print(f"❌ Not enough samples (< {args.min_samples}). Skipping training.")
+        return
+
+    order = np.random.default_rng(0).permutation(len(texts))
+    n_holdout = int(len(texts) * args.holdout)
+    valid, train = order[:n_holdout], order[n_holdout:]
+
+    head = CharNgramEmotionHead()
+    head.fit([texts[i] for i in train], targets[train], weights[train], epochs=args.epochs, lr=args.lr)
+    if n_holdout:
+        _report(head, [texts[i] for i in valid], targets[valid])
+
+    # 최종 모델은 전체 데이터로 다시 학습
+    head = CharNgramEmotionHead()
+    head.fit(texts, targets, weights, epochs=args.epochs, lr=args.lr)
+    head.meta = {"emotion_version": EMOTION_VERSION, "samples": len(texts)}
+
+    output = args.output or settings.EMOTION_HEAD_PATH
+    head.save(output)
+    print(f"✅ Emotion head saved: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import logging
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("Vench.EmotionEngine")
+
+
+class NLIZeroShotScorer:
+    """
+    제로샷(NLI) 감정 분류 엔진입니다.
+    transformers zero-shot pipeline과 같은 점수(후보별 entailment 로짓의 softmax)를 내지만,
+    - 가설 문장("The emotion of this text is {}.")은 고정이므로 토큰화를 한 번만 해서 캐시하고
+    - 텍스트 하나의 (전제, 가설) 16쌍을 하나의 패딩된 텐서 배치로 한 번에 추론합니다.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        candidate_labels: Sequence[str],
+        hypothesis_template: str,
+        max_length: int = 512,
+        max_pairs_per_batch: int = 64,
+    ):
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.candidate_labels = list(candidate_labels)
+        self.max_length = max_length
+        self.max_pairs_per_batch = max_pairs_per_batch
+
+        # entailment 클래스 인덱스 (pipeline과 동일하게 label2id에서 "entail*" 탐색)
+        label2id = self._load_model(model_name)
+        self.entailment_id = next(
+            (idx for label, idx in label2id.items() if label.lower().startswith("entail")),
+            -1,
+        )
+
+        # 가설 쪽 토큰 캐시 (특수 토큰 제외)
+        self._hypothesis_ids = [
+            self.tokenizer.encode(hypothesis_template.format(label), add_special_tokens=False)
+            for label in self.candidate_labels
+        ]
+        self._num_special = self.tokenizer.num_special_tokens_to_add(pair=True)
+        self._use_token_type_ids = "token_type_ids" in self.tokenizer.model_input_names
+
+    def _load_model(self, model_name: str) -> dict:
+        """추론 백엔드를 준비하고 모델의 label2id를 반환합니다. (기본: PyTorch)"""
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        self._torch = torch
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+        return self.model.config.label2id
+
+    def _build_pairs(self, premise_ids: List[int]) -> List[tuple]:
+        """전제 토큰 하나 + 캐시된 가설 토큰들 → (input_ids, token_type_ids) 목록"""
+        pairs = []
+        for hyp_ids in self._hypothesis_ids:
+            # pipeline의 truncation="only_first"와 같이 전제 쪽만 잘라냄
+            budget = self.max_length - len(hyp_ids) - self._num_special
+            premise = premise_ids[:budget]
+            input_ids = self.tokenizer.build_inputs_with_special_tokens(premise, hyp_ids)
+            token_type_ids = self.tokenizer.create_token_type_ids_from_sequences(premise, hyp_ids)
+            pairs.append((input_ids, token_type_ids))
+        return pairs
+
+    def _forward(self, pairs: List[tuple]) -> np.ndarray:
+        """(input_ids, token_type_ids) 목록을 패딩해 한 번에 추론하고 entailment 로짓을 반환"""
+        width = max(len(ids) for ids, _ in pairs)
+        pad_id = self.tokenizer.pad_token_id or 0
+
+        input_ids = np.full((len(pairs), width), pad_id, dtype=np.int64)
+        token_type_ids = np.zeros((len(pairs), width), dtype=np.int64)
+        attention_mask = np.zeros((len(pairs), width), dtype=np.int64)
+        for row, (ids, types) in enumerate(pairs):
+            input_ids[row, : len(ids)] = ids
+            token_type_ids[row, : len(types)] = types
+            attention_mask[row, : len(ids)] = 1
+
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if self._use_token_type_ids:
+            inputs["token_type_ids"] = token_type_ids
+        return self._run(inputs)[:, self.entailment_id]
+
+    def _run(self, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        """numpy 입력 → 로짓 (배치, 클래스 수)"""
+        torch = self._torch
+        with torch.inference_mode():
+            logits = self.model(**{k: torch.from_numpy(v) for k, v in inputs.items()}).logits
+        return logits.float().numpy()
+
+    def score(self, texts: Sequence[str], max_pairs_per_batch: Optional[int] = None) -> np.ndarray:
+        """
+        텍스트 목록의 후보 라벨별 확률을 (텍스트 수, 라벨 수) 배열로 반환합니다.
+        (multi_label=False 와 동일: 후보 라벨 간 softmax)
+        max_pairs_per_batch로 한 번에 추론할 (전제, 가설) 쌍 수를 조정할 수 있습니다. (백필 등 대량 처리용)
+        """
+        num_labels = len(self.candidate_labels)
+        per_batch = max_pairs_per_batch or self.max_pairs_per_batch
+        texts_per_batch = max(1, per_batch // num_labels)
+
+        premises = self.tokenizer(list(texts), add_special_tokens=False)["input_ids"]
+        # 길이가 비슷한 텍스트끼리 묶어 패딩 낭비를 줄임 (결과는 원래 순서로 복원)
+        order = sorted(range(len(premises)), key=lambda i: len(premises[i]))
+
+        # 여러 텍스트를 한꺼번에 넣는 경우를 위해 배치 단위로 나눠 추론
+        # (텍스트 하나의 16쌍은 항상 한 배치 안에서 처리됨)
+        entail = np.empty((len(premises), num_labels), dtype=np.float32)
+        for start in range(0, len(order), texts_per_batch):
+            rows = order[start : start + texts_per_batch]
+            pairs = [pair for i in rows for pair in self._build_pairs(premises[i])]
+            entail[rows] = self._forward(pairs).reshape(len(rows), num_labels)
+
+        entail = entail - entail.max(axis=1, keepdims=True)
+        probs = np.exp(entail)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+
+class ONNXNLIZeroShotScorer(NLIZeroShotScorer):
+    """
+    NLIZeroShotScorer의 ONNX Runtime 백엔드입니다.
+    처음 실행 시 모델을 ONNX로 내보내고 int8 동적 양자화한 파일을 onnx_dir에 저장해 두며,
+    이후에는 저장된 파일을 바로 로딩합니다. (PyTorch 없이 추론, 지연 시간과 메모리 사용량 감소)
+    """
+
+    FP32_FILE = "model.onnx"
+    INT8_FILE = "model.int8.onnx"
+
+    def __init__(self, *args, onnx_dir: str, intra_op_threads: int = 0, **kwargs):
+        self.onnx_dir = onnx_dir
+        self.intra_op_threads = intra_op_threads
+        super().__init__(*args, **kwargs)
+
+    def _load_model(self, model_name: str) -> dict:
+        import onnxruntime as ort
+        from transformers import AutoConfig
+
+        model_path = os.path.join(self.onnx_dir, self.INT8_FILE)
+        if not os.path.exists(model_path):
+            export_quantized_onnx(model_name, self.onnx_dir, self.tokenizer)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.intra_op_threads > 0:
+            options.intra_op_num_threads = self.intra_op_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        return AutoConfig.from_pretrained(model_name).label2id
+
+    def _run(self, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        feed = {k: v for k, v in inputs.items() if k in self._input_names}
+        return self.session.run(["logits"], feed)[0].astype(np.float32)
+
+
+def export_quantized_onnx(model_name: str, onnx_dir: str, tokenizer=None) -> str:
+    """
+    Hugging Face 모델을 ONNX(fp32)로 내보낸 뒤 int8 동적 양자화합니다.
+    양자화된 모델 경로를 반환합니다.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    os.makedirs(onnx_dir, exist_ok=True)
+    fp32_path = os.path.join(onnx_dir, ONNXNLIZeroShotScorer.FP32_FILE)
+    int8_path = os.path.join(onnx_dir, ONNXNLIZeroShotScorer.INT8_FILE)
+
+    logger.info(f"📦 Exporting {model_name} to ONNX ({onnx_dir})...")
+    tokenizer = tokenizer or AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    sample = tokenizer("오늘은 좋은 하루였다.", "The emotion of this text is joy.", return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+        )
+
+    # 가중치만 int8로 양자화 (활성값은 실행 시 동적 양자화)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+    logger.info(f"✅ Quantized ONNX model saved: {int8_path}")
+    return int8_path
@@ -1,11 +1,50 @@
-from transformers import pipeline
+import hashlib
+import importlib.util
+import math
+import os
+import time
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
-# 1. Zero-Shot 분류 모델 로드
-emotion_classifier = pipeline(
-    "zero-shot-classification",
-    model="MoritzLaurer/mDeBERTa-v3-base-mnli-xnli",
-    device=-1 # CPU 사용
-)
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import EMOTION_FAST_PATH, EMOTION_FAST_PATH_SAVED, EMOTION_LATENCY
+from app.services.model_registry import model_registry
+
+EMOTION_MODEL_NAME = "MoritzLaurer/mDeBERTa-v3-base-mnli-xnli"
+HYPOTHESIS_TEMPLATE = "The emotion of this text is {}."
+
+# 1. Zero-Shot 분류 모델 로드 (레지스트리를 통한 지연 로딩, CPU 사용)
+# 가설 토큰을 캐시하고 16개 (전제, 가설) 쌍을 한 번에 추론하는 전용 엔진 사용
+# EMOTION_BACKEND=onnx 이면 int8 양자화된 ONNX Runtime 백엔드 사용 (onnxruntime 미설치 시 torch로 대체)
+def _resolve_backend() -> str:
+    """실제로 사용할 백엔드 + 정밀도 태그 (점수가 달라지므로 EMOTION_VERSION에 포함)"""
+    if settings.EMOTION_BACKEND == "onnx" and importlib.util.find_spec("onnxruntime") is not None:
+        return "onnx-int8"
+    return "torch-fp32"
+
+EMOTION_BACKEND_TAG = _resolve_backend()
+
+def _load_emotion_classifier():
+    from app.services.emotion_engine import NLIZeroShotScorer, ONNXNLIZeroShotScorer
+
+    if EMOTION_BACKEND_TAG == "onnx-int8":
+        return ONNXNLIZeroShotScorer(
+            EMOTION_MODEL_NAME, CANDIDATE_LABELS, HYPOTHESIS_TEMPLATE,
+            onnx_dir=emotion_onnx_dir(),
+            intra_op_threads=settings.EMOTION_ONNX_THREADS,
+        )
+
+    if settings.EMOTION_BACKEND == "onnx":
+        print("⚠️ onnxruntime is not installed. Falling back to the torch emotion backend.")
+    return NLIZeroShotScorer(EMOTION_MODEL_NAME, CANDIDATE_LABELS, HYPOTHESIS_TEMPLATE)
+
+def emotion_onnx_dir() -> str:
+    """모델별 ONNX 변환 결과 저장 경로 (모델이 바뀌면 새로 변환)"""
+    return os.path.join(settings.EMOTION_ONNX_DIR, EMOTION_MODEL_NAME.split("/")[-1])
+
+model_registry.register("emotion", _load_emotion_classifier)
 
 # 2. [Vench v2.0] 8가지 감정을 위한 정교한 영문 라벨 정의
 # 모델은 영문 뉘앙스를 훨씬 잘 이해하므로, 비슷한 유의어를 여러 개 넣어 정확도를 높입니다.
@@ -43,51 +82,190 @@ LABEL_MAP = {
     "anticipating": "설렘",
 }
 
-def analyze_emotion(text: str):
-    """
-    텍스트를 입력받아 8가지 세분화된 감정 중 하나로 분류합니다.
-    """
-    if not text:
-        return {"label": "평온", "score": 0.0, "all_scores": []}
-
-    # 4. 제로샷 분석 수행
-    results = emotion_classifier(
-        text,
-        CANDIDATE_LABELS,
-        multi_label=False,
-        hypothesis_template="The emotion of this text is {}."
-    )
-
-    # 5. 점수가 가장 높은 감정 추출
-    top_raw_label = results['labels'][0]
-    top_score = results['scores'][0]
+# 4. UI용 한국어 라벨 (8종) 및 영문 16개 → 한국어 8개 합산 행렬
+KOREAN_LABELS = ["기쁨", "슬픔", "분노", "불안", "평온", "피로", "뿌듯", "설렘"]
 
-    # 6. 한국어 라벨로 변환
-    final_label = LABEL_MAP.get(top_raw_label, "평온")
+_COLLAPSE = np.zeros((len(CANDIDATE_LABELS), len(KOREAN_LABELS)), dtype=np.float32)
+for _i, _label in enumerate(CANDIDATE_LABELS):
+    _COLLAPSE[_i, KOREAN_LABELS.index(LABEL_MAP.get(_label, "평온"))] = 1.0
 
-    # 7. 프론트엔드 차트용 점수 데이터 가공 (중복된 한글 라벨은 합산)
-    score_dict = {
-        "기쁨": 0.0, "슬픔": 0.0, "분노": 0.0, "불안": 0.0, "평온": 0.0,
-        "피로": 0.0, "뿌듯": 0.0, "설렘": 0.0
-    }
+# 5. 감정 분류 버전 태그 (모델/백엔드·정밀도/후보 라벨/가설 템플릿이 바뀌면 자동으로 달라짐)
+# 예: mDeBERTa-v3-base-mnli-xnli-onnx-int8@3f2a9c1d → 이 값과 다른 일기는 백필 대상
+# (torch fp32와 ONNX int8은 점수가 조금씩 달라서 서로 다른 버전으로 취급)
+EMOTION_VERSION = "{}-{}@{}".format(
+    EMOTION_MODEL_NAME.split("/")[-1],
+    EMOTION_BACKEND_TAG,
+    hashlib.sha1(
+        "|".join([
+            HYPOTHESIS_TEMPLATE, *CANDIDATE_LABELS, *KOREAN_LABELS, str(settings.EMOTION_WINDOW_TOKENS),
+        ]).encode("utf-8")
+    ).hexdigest()[:8],
+)
 
-    for label, score in zip(results['labels'], results['scores']):
-        korean_label = LABEL_MAP.get(label, "평온")
-        if korean_label in score_dict:
-            score_dict[korean_label] += score
+def _format_result(raw_scores: np.ndarray) -> dict:
+    """영문 후보 라벨별 확률 (16,) → analyze_emotion 응답 형식"""
+    # 점수가 가장 높은 감정 추출 후 한국어 라벨로 변환
+    top = int(np.argmax(raw_scores))
+    final_label = LABEL_MAP.get(CANDIDATE_LABELS[top], "평온")
 
-    # 리스트 형태로 변환 (점수 높은 순 정렬)
+    # 프론트엔드 차트용 점수 데이터 가공 (중복된 한글 라벨은 행렬곱으로 합산, 점수 높은 순 정렬)
+    korean_scores = raw_scores @ _COLLAPSE
+    order = np.argsort(-korean_scores, kind="stable")
     formatted_scores = [
-        {"label": k, "score": v}
-        for k, v in sorted(score_dict.items(), key=lambda item: item[1], reverse=True)
+        {"label": KOREAN_LABELS[i], "score": float(korean_scores[i])}
+        for i in order
     ]
 
     return {
         "label": final_label,
-        "score": top_score,
+        "score": float(raw_scores[top]),
         "all_scores": formatted_scores
     }
 
+# 6. 긴 텍스트 문장 단위 분할
+# 모델 최대 길이에서 잘리지 않도록, 그리고 어텐션 비용이 창 크기로 제한되도록
+# 문장들을 EMOTION_WINDOW_TOKENS 이하의 창으로 묶어 각각 분류합니다.
+@lru_cache(maxsize=1)
+def _sentence_splitter():
+    from kiwipiepy import Kiwi
+    return Kiwi()
+
+def split_windows(text: str, tokenizer, max_tokens: int) -> List[Tuple[int, int, int]]:
+    """텍스트 → (시작 글자, 끝 글자, 토큰 수) 창 목록. 짧은 텍스트는 창 하나."""
+    total = len(tokenizer.encode(text, add_special_tokens=False))
+    if total <= max_tokens:
+        return [(0, len(text), total)]
+
+    sentences = [(s.start, s.end) for s in _sentence_splitter().split_into_sents(text)] or [(0, len(text))]
+    counts = [
+        len(ids)
+        for ids in tokenizer([text[a:b] for a, b in sentences], add_special_tokens=False)["input_ids"]
+    ]
+
+    windows = []
+    start, end, tokens = None, 0, 0
+    for (a, b), n in zip(sentences, counts):
+        if start is not None and tokens + n > max_tokens:
+            windows.append((start, end, tokens))
+            start, tokens = None, 0
+
+        # 문장 하나가 창보다 길면 글자 수 기준으로 균등 분할
+        if n > max_tokens:
+            pieces = math.ceil(n / max_tokens)
+            step = math.ceil((b - a) / pieces)
+            windows.extend((p, min(p + step, b), math.ceil(n / pieces)) for p in range(a, b, step))
+            continue
+
+        if start is None:
+            start = a
+        end, tokens = b, tokens + n
+
+    if start is not None:
+        windows.append((start, end, tokens))
+    return windows
+
+# 7. 경량 헤드 빠른 경로 (emotion_distill로 학습된 헤드가 충분히 확신하면 NLI 생략)
+FAST_PATH_VERSION = f"{EMOTION_VERSION}+fast"
+
+# 텍스트 1건당 NLI 추론 시간의 이동 평균 (빠른 경로로 절약한 시간 추정용)
+_nli_sec_per_text: Optional[float] = None
+
+def _observe_nli_latency(sec_per_text: float) -> None:
+    global _nli_sec_per_text
+    EMOTION_LATENCY.labels(path="nli").observe(sec_per_text)
+    _nli_sec_per_text = sec_per_text if _nli_sec_per_text is None else 0.8 * _nli_sec_per_text + 0.2 * sec_per_text
+
+def _apply_fast_path(texts: List[str], targets: List[int], results: List[dict]) -> List[int]:
+    """헤드가 확신하는 텍스트는 results에 채우고, NLI로 넘길 나머지 인덱스를 반환"""
+    from app.services.emotion_distill import get_fast_head
+
+    head = get_fast_head()
+    if head is None:
+        return targets
+
+    started = time.perf_counter()
+    probs = head.predict_proba([texts[i] for i in targets])
+    sec_per_text = (time.perf_counter() - started) / len(targets)
+
+    remaining = []
+    for i, row in zip(targets, probs):
+        top = int(np.argmax(row))
+        if row[top] < settings.EMOTION_FAST_PATH_THRESHOLD:
+            EMOTION_FAST_PATH.labels(result="miss").inc()
+            remaining.append(i)
+            continue
+
+        EMOTION_FAST_PATH.labels(result="hit").inc()
+        EMOTION_LATENCY.labels(path="fast").observe(sec_per_text)
+        if _nli_sec_per_text is not None:
+            EMOTION_FAST_PATH_SAVED.inc(max(0.0, _nli_sec_per_text - sec_per_text))
+
+        order = np.argsort(-row, kind="stable")
+        results[i] = {
+            "label": head.labels[top],
+            "score": float(row[top]),
+            "all_scores": [{"label": head.labels[j], "score": float(row[j])} for j in order],
+            "timeline": [{"start": 0, "end": len(texts[i]), "label": head.labels[top], "score": float(row[top])}],
+            "version": FAST_PATH_VERSION,
+        }
+    return remaining
+
+def analyze_emotions(
+    texts: List[str],
+    max_pairs_per_batch: Optional[int] = None,
+    use_fast_path: bool = True,
+) -> List[dict]:
+    """
+    여러 텍스트를 한 번에 분류합니다. (빈 텍스트는 기본값)
+    EMOTION_FAST_PATH가 켜져 있으면 경량 헤드를 먼저 적용하고, 확신도가 낮은 텍스트만 NLI로 분류합니다.
+    긴 텍스트는 문장 창으로 나누고, 모든 창을 한 배치로 분류한 뒤 토큰 수 가중 평균으로 합칩니다.
+    창별 결과는 "timeline"에, 분류에 쓰인 버전은 "version"에 담깁니다.
+    """
+    results = [
+        {"label": "평온", "score": 0.0, "all_scores": [], "timeline": [], "version": EMOTION_VERSION}
+        for _ in texts
+    ]
+    targets = [i for i, text in enumerate(texts) if text]
+    if targets and use_fast_path and settings.EMOTION_FAST_PATH:
+        targets = _apply_fast_path(texts, targets, results)
+    if not targets:
+        return results
+
+    started = time.perf_counter()
+    scorer = model_registry.get("emotion")
+    windows = {i: split_windows(texts[i], scorer.tokenizer, settings.EMOTION_WINDOW_TOKENS) for i in targets}
+    raw_scores = scorer.score(
+        [texts[i][a:b] for i in targets for a, b, _ in windows[i]],
+        max_pairs_per_batch=max_pairs_per_batch,
+    )
+
+    offset = 0
+    for i in targets:
+        rows = raw_scores[offset : offset + len(windows[i])]
+        offset += len(windows[i])
+
+        weights = np.array([max(n, 1) for _, _, n in windows[i]], dtype=np.float32)
+        results[i] = _format_result(weights @ rows / weights.sum())
+        results[i]["version"] = EMOTION_VERSION
+        results[i]["timeline"] = []
+        for (a, b, _), row in zip(windows[i], rows):
+            top = int(np.argmax(row))
+            results[i]["timeline"].append({
+                "start": a,
+                "end": b,
+                "label": LABEL_MAP.get(CANDIDATE_LABELS[top], "평온"),
+                "score": float(row[top]),
+            })
+
+    _observe_nli_latency((time.perf_counter() - started) / len(targets))
+    return results
+
+def analyze_emotion(text: str):
+    """
+    텍스트를 입력받아 8가지 세분화된 감정 중 하나로 분류합니다.
+    """
+    return analyze_emotions([text])[0]
+
 if __name__ == "__main__":
     test_cases = [
         "와, 드디어 해냈다! 진짜 너무 기분 좋아.",   # 기쁨 or 뿌듯
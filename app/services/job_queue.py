@@ -0,0 +1,464 @@
+"""
+DB 기반 작업 대기열
+
+작업은 jobs 테이블에 저장되므로 API 프로세스가 재시작되어도 사라지지 않고,
+여러 노드의 워커 프로세스(python -m app.worker)가 같은 테이블에서 작업을 나눠 가져갑니다.
+
+- 가져오기(claim): SELECT ... FOR UPDATE SKIP LOCKED로 다른 워커가 잡고 있는 행을 건너뛰고,
+  조건부 UPDATE(status=PENDING일 때만)로 임대를 기록합니다.
+  (SQLite는 FOR UPDATE를 지원하지 않으므로 조건부 UPDATE만으로 중복 실행을 막음)
+- 임대(lease): 실행 중에는 heartbeat로 lease_expires_at을 연장합니다.
+  워커가 죽어 heartbeat가 끊기면 임대가 만료되고, reclaim_expired가 작업을 다시 대기 상태로 돌립니다.
+- 재시도: 실패하면 지수 backoff 후 다시 실행하고, max_attempts를 넘으면 DEAD(dead-letter)로 옮긴 뒤
+  핸들러의 on_dead를 호출합니다.
+- 중복 방지: 대기/실행 중인 작업은 active_key(=dedupe_key)를 가지며 유니크 인덱스가 걸려 있어,
+  같은 키의 작업을 동시에 등록하면 한쪽만 성공합니다. (끝난 작업은 active_key를 비움)
+- 임대 확인: 핸들러는 결과를 commit하기 전에 ensure_lease(db)를 호출합니다.
+  임대를 잃은(회수된) 워커는 LeaseLostError로 중단되어 다시 실행 중인 워커와 같은 행에 쓰지 않습니다.
+"""
+import contextvars
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import JOB_EVENTS, JOB_QUEUE_LATENCY
+from app.domains.job.models import Job, JobStatus
+
+logger = logging.getLogger("Vench.JobQueue")
+
+# 한 번에 잠글 후보 수 (SQLite처럼 SKIP LOCKED가 없을 때 경합에 진 경우 다음 후보 시도)
+_CLAIM_CANDIDATES = 5
+
+
+@dataclass(frozen=True)
+class JobHandler:
+    fn: Callable[..., None]                            # fn(**payload)
+    on_dead: Optional[Callable[[dict, str], None]] = None  # on_dead(payload, error)
+
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+class DuplicateJobError(RuntimeError):
+    """같은 dedupe_key의 작업이 이미 대기/실행 중일 때 발생합니다. (호출자는 세션을 rollback해야 함)"""
+
+
+class LeaseLostError(RuntimeError):
+    """실행 중인 작업의 임대가 만료되어 다른 워커에게 회수되었을 때 발생합니다. (결과를 기록하지 말 것)"""
+
+
+@dataclass
+class JobLease:
+    """핸들러를 실행 중인 워커의 임대 정보 (heartbeat가 임대를 잃으면 lost를 설정)"""
+    job_id: int
+    worker_id: str
+    lost: threading.Event = field(default_factory=threading.Event)
+
+
+# 현재 스레드(컨텍스트)에서 실행 중인 작업의 임대 (파이프라인 단계 스레드에도 컨텍스트가 복사됨)
+_current_lease: contextvars.ContextVar[Optional[JobLease]] = contextvars.ContextVar("job_lease", default=None)
+
+
+def register_handler(kind: str, fn: Callable[..., None], on_dead: Optional[Callable[[dict, str], None]] = None) -> None:
+    _handlers[kind] = JobHandler(fn=fn, on_dead=on_dead)
+
+
+def _now() -> datetime:
+    # DB에는 timezone 없는 UTC로 저장 (DB 서버 시간대와 무관하게 비교)
+    return datetime.utcnow()
+
+
+def retry_delay(attempts: int) -> float:
+    """attempts번 실패한 뒤 다음 실행까지 대기 시간 (지수 backoff + ±20% jitter)"""
+    delay = min(settings.JOB_RETRY_MAX_SEC, settings.JOB_RETRY_BASE_SEC * (2 ** max(attempts - 1, 0)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+# ==========================================
+# 1. 작업 등록 / 조회
+# ==========================================
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: dict,
+    priority: int = 0,
+    max_attempts: Optional[int] = None,
+    dedupe_key: Optional[str] = None,
+) -> Job:
+    """
+    작업을 추가합니다. commit은 호출자가 합니다.
+    (일기 레코드와 같은 트랜잭션으로 저장하면 '레코드는 있는데 작업이 없는' 상태가 생기지 않음)
+    dedupe_key가 같은 작업이 이미 대기/실행 중이면 DuplicateJobError를 던집니다. (active_key 유니크 인덱스)
+    """
+    job = Job(
+        kind=kind,
+        payload=payload,
+        priority=priority,
+        dedupe_key=dedupe_key,
+        active_key=dedupe_key,
+        status=JobStatus.PENDING,
+        attempts=0,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_at=_now(),
+    )
+    db.add(job)
+    if dedupe_key is not None:
+        # 중복 여부를 commit 전에 확인 (같은 트랜잭션의 다른 변경도 함께 rollback되도록 호출자에게 알림)
+        try:
+            db.flush()
+        except IntegrityError as e:
+            raise DuplicateJobError(f"Job '{dedupe_key}' is already pending or running") from e
+    return job
+
+
+def pending_count(db: Session, priority: Optional[int] = None) -> int:
+    query = db.query(Job).filter(Job.status == JobStatus.PENDING)
+    if priority is not None:
+        query = query.filter(Job.priority == priority)
+    return query.count()
+
+
+def is_backlogged(db: Session, priority: int = 0) -> bool:
+    """
+    priority 작업이 JOB_MAX_PENDING개 이상 대기 중인지 (0이면 제한 없음)
+    우선순위가 낮은 일괄 작업(재생성 등)은 나중에 실행되므로 새 업로드를 막는 기준에 넣지 않음
+    """
+    return settings.JOB_MAX_PENDING > 0 and pending_count(db, priority) >= settings.JOB_MAX_PENDING
+
+
+def is_active(db: Session, dedupe_key: str) -> bool:
+    """같은 키의 작업이 대기 또는 실행 중인지 (미리 확인용, 실제 중복 방지는 enqueue의 유니크 인덱스)"""
+    return db.query(
+        db.query(Job)
+        .filter(Job.dedupe_key == dedupe_key, Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING]))
+        .exists()
+    ).scalar()
+
+
+# ==========================================
+# 2. 임대 (claim / heartbeat / 완료 / 실패)
+# ==========================================
+@contextmanager
+def job_lease(lease: JobLease):
+    """with 블록 안에서 실행되는 핸들러의 임대를 지정합니다."""
+    token = _current_lease.set(lease)
+    try:
+        yield lease
+    finally:
+        _current_lease.reset(token)
+
+
+def ensure_lease(db: Session) -> None:
+    """
+    결과를 commit하기 직전에 호출해 이 워커가 아직 작업을 임대 중인지 확인합니다.
+    임대 행을 FOR UPDATE로 잠그므로 commit할 때까지 다른 워커가 회수하지 못합니다.
+    임대를 잃었으면 LeaseLostError (작업 대기열 밖에서 실행 중이면 확인하지 않음)
+    """
+    lease = _current_lease.get()
+    if lease is None:
+        return
+    if not lease.lost.is_set():
+        owned = _owned(db, lease.job_id, lease.worker_id).with_for_update().first()
+        if owned is not None:
+            return
+        lease.lost.set()
+    raise LeaseLostError(f"Lost lease on job {lease.job_id} ({lease.worker_id})")
+
+
+def claim(db: Session, worker_id: str, kinds: Optional[Sequence[str]] = None) -> Optional[Job]:
+    """실행 가능한 작업 하나를 임대합니다. (없으면 None)"""
+    now = _now()
+    query = db.query(Job).filter(Job.status == JobStatus.PENDING, Job.run_at <= now)
+    if kinds:
+        query = query.filter(Job.kind.in_(list(kinds)))
+    candidates = (
+        query.order_by(Job.priority, Job.run_at, Job.id)
+        .with_for_update(skip_locked=True)
+        .limit(_CLAIM_CANDIDATES)
+        .all()
+    )
+
+    for candidate in candidates:
+        claimed = (
+            db.query(Job)
+            .filter(Job.id == candidate.id, Job.status == JobStatus.PENDING)
+            .update(
+                {
+                    Job.status: JobStatus.RUNNING,
+                    Job.attempts: Job.attempts + 1,
+                    Job.locked_by: worker_id,
+                    Job.lease_expires_at: now + timedelta(seconds=settings.JOB_LEASE_SEC),
+                    Job.heartbeat_at: now,
+                },
+                synchronize_session=False,
+            )
+        )
+        if claimed:
+            db.commit()
+            db.refresh(candidate)
+            JOB_EVENTS.labels(kind=candidate.kind, event="claimed").inc()
+            JOB_QUEUE_LATENCY.labels(kind=candidate.kind).observe(max((now - candidate.run_at).total_seconds(), 0.0))
+            return candidate
+
+    db.commit()
+    return None
+
+
+def _owned(db: Session, job_id: int, worker_id: str):
+    return db.query(Job).filter(
+        Job.id == job_id,
+        Job.status == JobStatus.RUNNING,
+        Job.locked_by == worker_id,
+    )
+
+
+def heartbeat(db: Session, job_id: int, worker_id: str) -> bool:
+    """임대를 연장합니다. 이미 임대를 잃었으면(회수됨) False."""
+    now = _now()
+    extended = _owned(db, job_id, worker_id).update(
+        {
+            Job.lease_expires_at: now + timedelta(seconds=settings.JOB_LEASE_SEC),
+            Job.heartbeat_at: now,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    return bool(extended)
+
+
+def complete(db: Session, job_id: int, worker_id: str) -> bool:
+    done = _owned(db, job_id, worker_id).update(
+        {
+            Job.status: JobStatus.SUCCEEDED,
+            Job.active_key: None,
+            Job.locked_by: None,
+            Job.lease_expires_at: None,
+            Job.finished_at: _now(),
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    return bool(done)
+
+
+def _dead_letter(job: Job, error: str) -> None:
+    """DEAD로 옮겨진 작업의 후처리 (예: 일기를 FAILED로 표시)"""
+    JOB_EVENTS.labels(kind=job.kind, event="dead").inc()
+    logger.error(f"💀 Job {job.id} ({job.kind}) moved to dead-letter after {job.attempts} attempts: {error}")
+    handler = _handlers.get(job.kind)
+    if handler is not None and handler.on_dead is not None:
+        try:
+            handler.on_dead(dict(job.payload), error)
+        except Exception as e:
+            logger.error(f"on_dead hook failed for job {job.id}: {e}")
+
+
+def _retry_or_bury(job: Job, error: str) -> bool:
+    """실패한 작업을 재시도 대기 상태 또는 DEAD로 바꿉니다. (commit은 호출자) DEAD면 True."""
+    now = _now()
+    job.locked_by = None
+    job.lease_expires_at = None
+    job.last_error = error[-4000:]
+    if job.attempts >= job.max_attempts:
+        job.status = JobStatus.DEAD
+        job.active_key = None
+        job.finished_at = now
+        return True
+    job.status = JobStatus.PENDING
+    job.run_at = now + timedelta(seconds=retry_delay(job.attempts))
+    JOB_EVENTS.labels(kind=job.kind, event="retried").inc()
+    return False
+
+
+def fail(db: Session, job_id: int, worker_id: str, error: str) -> Optional[JobStatus]:
+    """실패를 기록합니다. 임대를 이미 잃었으면 None (회수한 쪽이 처리)."""
+    job = _owned(db, job_id, worker_id).with_for_update().first()
+    if job is None:
+        db.commit()
+        return None
+    dead = _retry_or_bury(job, error)
+    db.commit()
+    if dead:
+        _dead_letter(job, error)
+    return job.status
+
+
+def reclaim_expired(db: Session) -> int:
+    """임대가 만료된(워커가 죽거나 멈춘) 작업을 회수합니다. 회수한 작업 수를 반환합니다."""
+    expired = (
+        db.query(Job)
+        .filter(Job.status == JobStatus.RUNNING, Job.lease_expires_at < _now())
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    buried = []
+    for job in expired:
+        logger.warning(f"♻️ Reclaiming job {job.id} ({job.kind}) from {job.locked_by} (lease expired)")
+        JOB_EVENTS.labels(kind=job.kind, event="reclaimed").inc()
+        if _retry_or_bury(job, f"lease expired (worker {job.locked_by})"):
+            buried.append(job)
+    db.commit()
+    for job in buried:
+        _dead_letter(job, job.last_error)
+    return len(expired)
+
+
+def requeue_dead(db: Session, job_ids: Optional[List[int]] = None) -> int:
+    """
+    DEAD 작업을 다시 대기열에 넣습니다. (시도 횟수 초기화)
+    같은 dedupe_key의 작업이 이미 대기/실행 중이면(그 사이 재처리 등) 건너뜁니다.
+    """
+    query = db.query(Job).filter(Job.status == JobStatus.DEAD)
+    if job_ids:
+        query = query.filter(Job.id.in_(job_ids))
+    active = {key for (key,) in db.query(Job.active_key).filter(Job.active_key.isnot(None))}
+
+    count = 0
+    for job in query.order_by(Job.id.desc()).all():
+        if job.dedupe_key is not None and job.dedupe_key in active:
+            continue
+        job.status = JobStatus.PENDING
+        job.active_key = job.dedupe_key
+        job.attempts = 0
+        job.run_at = _now()
+        job.finished_at = None
+        if job.dedupe_key is not None:
+            active.add(job.dedupe_key)
+        count += 1
+    db.commit()
+    return count
+
+
+# ==========================================
+# 3. 워커
+# ==========================================
+class JobWorker:
+    """
+    jobs 테이블을 폴링해 작업을 실행하는 워커입니다.
+    threads개의 실행 스레드를 띄우며, 스레드마다 고유한 worker id로 임대합니다.
+    python -m app.worker로 독립 실행하거나, API 프로세스 안에서(JOB_INLINE_WORKERS) 실행할 수 있습니다.
+    """
+
+    def __init__(self, kinds: Optional[Sequence[str]] = None, threads: int = 1):
+        self.kinds = list(kinds) if kinds else None
+        self.threads = max(1, threads)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._last_reclaim = 0.0
+
+    def _worker_id(self, index: int) -> str:
+        return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+    def _maybe_reclaim(self, db: Session) -> None:
+        now = _now().timestamp()
+        if now - self._last_reclaim < settings.JOB_LEASE_SEC / 2:
+            return
+        self._last_reclaim = now
+        reclaim_expired(db)
+
+    def _heartbeat_loop(self, lease: JobLease, done: threading.Event) -> None:
+        job_id = lease.job_id
+        while not done.wait(settings.JOB_HEARTBEAT_SEC):
+            try:
+                with SessionLocal() as db:
+                    if not heartbeat(db, job_id, lease.worker_id):
+                        # 핸들러는 다음 ensure_lease에서 LeaseLostError로 중단됨
+                        logger.warning(f"⚠️ Lost lease on job {job_id}; stopping its writes")
+                        lease.lost.set()
+                        return
+            except Exception as e:
+                # 일시적인 DB 오류는 다음 주기에 재시도 (lease가 끝나기 전에 복구되면 문제 없음)
+                logger.warning(f"Heartbeat failed for job {job_id}: {e}")
+
+    def _execute(self, job: Job, worker_id: str) -> None:
+        # 핸들러 안의 LLM 요청은 작업 우선순위로 스케줄링
+        from app.services.llm_scheduler import Priority, llm_priority
+
+        handler = _handlers.get(job.kind)
+        job_id, kind, payload = job.id, job.kind, dict(job.payload)
+        logger.info(f"▶️ Job {job_id} ({kind}) attempt {job.attempts}/{job.max_attempts} on {worker_id}")
+
+        done = threading.Event()
+        lease = JobLease(job_id=job_id, worker_id=worker_id)
+        beat = threading.Thread(target=self._heartbeat_loop, args=(lease, done), daemon=True)
+        beat.start()
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler registered for job kind '{kind}'")
+            with llm_priority(Priority(job.priority)), job_lease(lease):
+                handler.fn(**payload)
+        except Exception as e:
+            done.set()
+            error = f"{e}\n{traceback.format_exc()}"
+            with SessionLocal() as db:
+                status = fail(db, job_id, worker_id, error)
+            logger.warning(f"❌ Job {job_id} ({kind}) failed: {e} → {status.value if status else 'lease lost'}")
+            return
+        finally:
+            done.set()
+
+        with SessionLocal() as db:
+            if complete(db, job_id, worker_id):
+                JOB_EVENTS.labels(kind=kind, event="succeeded").inc()
+                logger.info(f"✅ Job {job_id} ({kind}) succeeded")
+            else:
+                logger.warning(f"⚠️ Job {job_id} ({kind}) finished after its lease was reclaimed")
+
+    def run_once(self, worker_id: str) -> bool:
+        """작업 하나를 가져와 실행합니다. 실행할 작업이 없었으면 False."""
+        with SessionLocal() as db:
+            self._maybe_reclaim(db)
+            job = claim(db, worker_id, self.kinds)
+            if job is not None:
+                db.expunge(job)
+        if job is None:
+            return False
+        self._execute(job, worker_id)
+        return True
+
+    def _loop(self, index: int) -> None:
+        worker_id = self._worker_id(index)
+        logger.info(f"👷 Job worker {worker_id} started (kinds={self.kinds or 'all'})")
+        while not self._stop.is_set():
+            try:
+                if self.run_once(worker_id):
+                    continue
+            except Exception as e:
+                logger.error(f"Job worker loop error: {e}")
+            self._stop.wait(settings.JOB_POLL_INTERVAL_SEC)
+        logger.info(f"👋 Job worker {worker_id} stopped")
+
+    def start(self) -> None:
+        for index in range(self.threads):
+            thread = threading.Thread(target=self._loop, args=(index,), name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """새 작업을 가져오지 않고, 실행 중인 작업이 끝나기를 timeout초까지 기다립니다."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def run_forever(self) -> None:
+        self.start()
+        try:
+            while any(thread.is_alive() for thread in self._threads):
+                for thread in self._threads:
+                    thread.join(1.0)
+        except KeyboardInterrupt:
+            logger.info("🛑 Stopping job worker (waiting for running jobs)...")
+            self.stop()
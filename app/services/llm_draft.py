@@ -0,0 +1,85 @@
+from typing import Optional
+
+import numpy as np
+
+from app.core.metrics import LLM_DRAFT_TOKENS
+
+
+# llama-cpp는 draft_model을 draft_model(input_ids) 형태로만 호출하므로
+# LlamaDraftModel을 상속하지 않아도 되며, llama_cpp는 실제로 만들 때만 import 합니다.
+class GGUFDraftModel:
+    """
+    작은 GGUF 모델로 다음 토큰들을 미리 예측하는 draft 모델입니다.
+    (본 모델과 같은 토크나이저/어휘를 쓰는 모델이어야 함)
+    llama-cpp의 generate는 이전 입력과의 공통 접두사를 재사용하므로 매 호출마다 새 토큰만 평가합니다.
+    """
+
+    def __init__(self, model_path: str, num_pred_tokens: int = 8, n_ctx: int = 4096):
+        from llama_cpp import Llama
+
+        self.num_pred_tokens = num_pred_tokens
+        self.llm = Llama(model_path=model_path, n_ctx=n_ctx, n_gpu_layers=0, verbose=False)
+
+    def __call__(self, input_ids: np.ndarray, /, **kwargs) -> np.ndarray:
+        draft = []
+        for token in self.llm.generate(input_ids.tolist(), top_k=1, temp=0.0, reset=True):
+            if token == self.llm.token_eos():
+                break
+            draft.append(token)
+            if len(draft) >= self.num_pred_tokens:
+                break
+        return np.array(draft, dtype=np.intc)
+
+
+class InstrumentedDraftModel:
+    """
+    draft 모델을 감싸 출력 종류별 제안/채택 토큰 수를 집계합니다.
+
+    llama-cpp는 채택 여부를 알려주지 않으므로 연속된 두 호출의 입력 길이 차이로 추정합니다.
+    (한 단계에서 입력은 '채택된 draft 토큰 + 본 모델이 고른 토큰 1개'만큼 늘어남)
+    생성 직전 begin(), 직후 end()를 호출해야 하며, 인스턴스당 한 번에 한 생성만 실행된다고 가정합니다.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self._kind = "unknown"
+        self._last_len: Optional[int] = None
+        self._last_proposed = 0
+
+    def begin(self, kind: str) -> None:
+        self._kind = kind
+        self._last_len = None
+        self._last_proposed = 0
+
+    def end(self) -> None:
+        # 마지막 제안은 채택 여부를 알 수 없으므로 집계하지 않음
+        self._last_len = None
+        self._last_proposed = 0
+
+    def __call__(self, input_ids: np.ndarray, /, **kwargs) -> np.ndarray:
+        length = len(input_ids)
+        if self._last_len is not None and self._last_proposed:
+            accepted = min(max(length - self._last_len - 1, 0), self._last_proposed)
+            LLM_DRAFT_TOKENS.labels(output=self._kind, result="proposed").inc(self._last_proposed)
+            LLM_DRAFT_TOKENS.labels(output=self._kind, result="accepted").inc(accepted)
+
+        draft = self.inner(input_ids, **kwargs)
+        self._last_len = length
+        self._last_proposed = len(draft)
+        return draft
+
+
+def build_draft_model(mode: str, num_pred_tokens: int, model_path: str = "") -> Optional[InstrumentedDraftModel]:
+    """
+    LLM_SPECULATIVE 설정값으로 draft 모델을 만듭니다.
+    - prompt_lookup: 프롬프트(원문)에서 n-gram이 일치하는 다음 토큰들을 제안 (원문을 많이 옮겨 쓰는 본문 생성에 효과적)
+    - draft: 작은 GGUF 모델(model_path)로 제안
+    """
+    if mode == "prompt_lookup":
+        from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+        return InstrumentedDraftModel(LlamaPromptLookupDecoding(num_pred_tokens=num_pred_tokens))
+    if mode == "draft":
+        if not model_path:
+            raise ValueError("LLM_DRAFT_MODEL_PATH is required when LLM_SPECULATIVE=draft")
+        return InstrumentedDraftModel(GGUFDraftModel(model_path, num_pred_tokens=num_pred_tokens))
+    return None
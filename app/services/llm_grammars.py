@@ -0,0 +1,34 @@
+from functools import lru_cache
+from typing import Optional
+
+# llama.cpp GBNF 문법: 출력 형식을 디코딩 단계에서 강제해
+# 한자/어시스턴트 마커/긴 설명 같은 버려질 토큰을 아예 생성하지 않게 합니다.
+# 문법이 완성되면 EOS만 허용되므로 생성이 즉시 끝납니다.
+GRAMMARS = {
+    # 제목: 한글 + 공백, 한 줄, 1~20자 (공백으로 시작/끝나지 않음)
+    "title": r'''
+root ::= [가-힣] ([가-힣 ]{0,18} [가-힣])?
+''',
+    # 위로 메시지: 최대 3문장, 문장마다 마침표/느낌표/물음표로 끝남 (줄바꿈/한자/마커 없음)
+    "advice": r'''
+root     ::= sentence (" " sentence){0,2}
+sentence ::= [^.!?\n\[\]一-鿿]{1,150} [.!?]
+''',
+    # 본문: 한자와 마커 시작 문자("[")만 금지
+    "diary": r'''
+root ::= [^\[一-鿿]+
+''',
+}
+
+
+@lru_cache(maxsize=None)
+def _compile(name: str):
+    from llama_cpp import LlamaGrammar
+    return LlamaGrammar.from_string(GRAMMARS[name], verbose=False)
+
+
+def get_grammar(name: str) -> Optional[object]:
+    """출력 종류별 컴파일된 LlamaGrammar (정의가 없으면 None)"""
+    if name not in GRAMMARS:
+        return None
+    return _compile(name)
@@ -0,0 +1,86 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.metrics import LLM_PREFIX_CACHE
+
+logger = logging.getLogger("Vench.PromptPrefixCache")
+
+# 시스템 프롬프트 뒤에 오는 사용자 메시지 위치를 찾기 위한 표식
+_USER_SENTINEL = "\u0000VENCH_USER\u0000"
+
+# GGUF에 채팅 템플릿이 없을 때 쓰는 EXAONE 3.0 형식
+_EXAONE_TEMPLATE = "[|system|]{system}[|endofturn|]\n[|user|]{user}\n[|assistant|]"
+
+
+class PromptPrefixCache:
+    """
+    고정된 시스템 프롬프트 부분의 KV 상태를 미리 계산해 두고 재사용합니다.
+
+    restore()로 저장해 둔 상태를 불러오면, llama-cpp의 create_chat_completion이
+    이미 평가된 토큰과 새 프롬프트의 공통 접두사를 찾아 그 뒤(사용자 메시지)만 평가합니다.
+    키는 (모델, 시스템 프롬프트)의 해시이므로 프롬프트가 바뀌면 자동으로 새로 계산됩니다.
+    렌더링한 접두사가 실제 프롬프트와 조금 달라도 일치하는 토큰까지만 재사용하므로 결과는 항상 같습니다.
+    (Llama 인스턴스는 스레드 안전하지 않으므로 호출자가 lock 안에서 restore → 생성을 실행해야 합니다)
+    """
+
+    def __init__(self, llm, max_entries: int = 8):
+        self.llm = llm
+        self.max_entries = max_entries
+        self._states: "OrderedDict[str, object]" = OrderedDict()
+
+    def _key(self, system_prompt: str) -> str:
+        model_path = getattr(self.llm, "model_path", "")
+        return hashlib.sha256(f"{model_path}\n{system_prompt}".encode("utf-8")).hexdigest()
+
+    def _render_prefix(self, system_prompt: str) -> tuple:
+        """채팅 템플릿으로 시스템 메시지까지의 프롬프트 문자열을 만듭니다. → (문자열, BOS 추가 여부)"""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": _USER_SENTINEL},
+        ]
+        template = (getattr(self.llm, "metadata", None) or {}).get("tokenizer.chat_template")
+        if template:
+            from llama_cpp.llama_chat_format import Jinja2ChatFormatter
+
+            def token_text(token_id: int) -> str:
+                return self.llm.detokenize([token_id]).decode("utf-8", errors="ignore")
+
+            formatter = Jinja2ChatFormatter(
+                template=template,
+                eos_token=token_text(self.llm.token_eos()),
+                bos_token=token_text(self.llm.token_bos()),
+            )
+            result = formatter(messages=messages)
+            prompt, add_bos = result.prompt, not result.added_special
+        else:
+            prompt, add_bos = _EXAONE_TEMPLATE.format(system=system_prompt, user=_USER_SENTINEL), True
+        return prompt[: prompt.index(_USER_SENTINEL)], add_bos
+
+    def _build(self, system_prompt: str):
+        prefix, add_bos = self._render_prefix(system_prompt)
+        tokens = self.llm.tokenize(prefix.encode("utf-8"), add_bos=add_bos, special=True)
+        self.llm.reset()
+        self.llm.eval(tokens)
+        return self.llm.save_state()
+
+    def restore(self, name: str, system_prompt: str) -> bool:
+        """시스템 프롬프트의 KV 상태를 모델에 불러옵니다. 캐시에 있었으면 True."""
+        key = self._key(system_prompt)
+        state: Optional[object] = self._states.get(key)
+        hit = state is not None
+        LLM_PREFIX_CACHE.labels(prompt=name, result="hit" if hit else "miss").inc()
+
+        if hit:
+            self._states.move_to_end(key)
+        else:
+            logger.info(f"🧩 Building prompt prefix cache for '{name}'...")
+            state = self._build(system_prompt)
+            self._states[key] = state
+            # 오래된 접두사(예: 변경 전 프롬프트)부터 제거
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+
+        self.llm.load_state(state)
+        return hit
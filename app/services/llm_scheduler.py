@@ -0,0 +1,168 @@
+import contextvars
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT
+
+logger = logging.getLogger("Vench.LLMScheduler")
+
+
+class LLMQueueFullError(RuntimeError):
+    """LLM 대기열이 가득 차서 요청을 받을 수 없을 때 발생합니다."""
+
+
+class LLMDeadlineExceededError(TimeoutError):
+    """요청이 기한 안에 시작되지 못했을 때 발생합니다."""
+
+
+class Priority(IntEnum):
+    # 값이 작을수록 먼저 처리
+    INTERACTIVE = 0   # 새로 업로드된 일기 (사용자가 결과를 기다리는 중)
+    BATCH = 1         # 재분석/백필 등 일괄 작업
+
+
+# 현재 실행 흐름의 LLM 요청 우선순위 (기본: INTERACTIVE)
+_current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "llm_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def llm_priority(priority: Priority):
+    """with 블록 안에서 발생하는 LLM 요청의 우선순위를 지정합니다."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    fn: Callable[[Any], Any] = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    deadline: Optional[float] = field(compare=False)
+    future: Future = field(compare=False, default_factory=Future)
+
+
+class LLMScheduler:
+    """
+    Llama 인스턴스(스레드 안전하지 않음) 앞단의 추론 스케줄러입니다.
+    - 인스턴스마다 전용 워커 스레드 1개 → 한 인스턴스에서 동시에 두 요청이 실행되지 않음
+    - 우선순위 큐: INTERACTIVE 요청이 BATCH 요청보다 먼저 처리 (같은 우선순위는 도착 순)
+    - 대기열 크기 제한: 가득 차면 LLMQueueFullError
+    - 요청별 기한: 기한까지 시작되지 못한 요청은 실행하지 않고 LLMDeadlineExceededError
+    """
+
+    def __init__(self, instances_provider: Callable[[], List[Any]], queue_size: int):
+        self._instances_provider = instances_provider
+        self.queue_size = queue_size
+        self._queue: "queue.PriorityQueue[_Job]" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._pending = {p: 0 for p in Priority}
+        self._lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+
+    @classmethod
+    def from_settings(cls) -> "LLMScheduler":
+        from app.services.model_registry import model_registry
+        return cls(lambda: model_registry.get("llm"), queue_size=settings.LLM_QUEUE_SIZE)
+
+    def pending(self, priority: Optional[Priority] = None) -> int:
+        """대기 중인 요청 수 (실행 중인 요청 제외)"""
+        with self._lock:
+            return self._pending[priority] if priority is not None else sum(self._pending.values())
+
+    def _ensure_workers(self) -> None:
+        with self._lock:
+            if self._workers:
+                return
+        # 모델 로딩은 lock 밖에서 (레지스트리가 중복 로딩을 막아줌)
+        instances = self._instances_provider()
+        with self._lock:
+            if self._workers:
+                return
+            for idx, instance in enumerate(instances):
+                worker = threading.Thread(target=self._run, args=(instance,), name=f"llm-worker-{idx}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+            logger.info(f"🧵 LLM scheduler started with {len(instances)} instance(s)")
+
+    def _adjust_pending(self, priority: Priority, delta: int) -> None:
+        # 호출자가 self._lock을 잡고 있어야 함
+        self._pending[priority] += delta
+        LLM_QUEUE_DEPTH.labels(priority=priority.name.lower()).set(self._pending[priority])
+
+    def _change_pending(self, priority: Priority, delta: int) -> None:
+        with self._lock:
+            self._adjust_pending(priority, delta)
+
+    def submit(
+        self,
+        fn: Callable[[Any], Any],
+        priority: Optional[Priority] = None,
+        deadline_sec: Optional[float] = None,
+    ) -> Future:
+        """fn(llm)을 대기열에 넣고 결과 Future를 반환합니다."""
+        priority = _current_priority.get() if priority is None else priority
+        if deadline_sec is None and priority == Priority.INTERACTIVE:
+            deadline_sec = settings.LLM_DEADLINE_SEC or None
+
+        # 크기 확인과 자리 예약을 한 번에 (동시에 제출해도 queue_size를 넘지 않음)
+        with self._lock:
+            if sum(self._pending.values()) >= self.queue_size:
+                raise LLMQueueFullError(f"LLM queue is full ({self.queue_size} requests)")
+            self._adjust_pending(priority, +1)
+        try:
+            self._ensure_workers()
+        except Exception:
+            self._change_pending(priority, -1)
+            raise
+
+        now = time.monotonic()
+        job = _Job(
+            priority=int(priority),
+            seq=next(self._seq),
+            fn=fn,
+            enqueued_at=now,
+            deadline=now + deadline_sec if deadline_sec else None,
+        )
+        self._queue.put(job)
+        return job.future
+
+    def run(self, fn: Callable[[Any], Any], priority: Optional[Priority] = None, deadline_sec: Optional[float] = None) -> Any:
+        """submit 후 결과를 기다립니다."""
+        return self.submit(fn, priority, deadline_sec).result()
+
+    def _run(self, instance: Any) -> None:
+        while True:
+            job = self._queue.get()
+            priority = Priority(job.priority)
+            self._change_pending(priority, -1)
+
+            waited = time.monotonic() - job.enqueued_at
+            LLM_QUEUE_WAIT.labels(priority=priority.name.lower()).observe(waited)
+            if job.deadline is not None and time.monotonic() > job.deadline:
+                job.future.set_exception(LLMDeadlineExceededError(f"LLM request waited {waited:.1f}s past its deadline"))
+                continue
+            if not job.future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                job.future.set_result(job.fn(instance))
+            except Exception as e:
+                job.future.set_exception(e)
+
+
+llm_scheduler = LLMScheduler.from_settings()
@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.core.metrics import MODEL_READY
+
+logger = logging.getLogger("Vench.ModelRegistry")
+
+
+class ModelState(str, Enum):
+    NOT_LOADED = "NOT_LOADED"
+    LOADING = "LOADING"
+    READY = "READY"
+    FAILED = "FAILED"
+
+
+@dataclass
+class _ModelEntry:
+    name: str
+    loader: Callable[[], Any]
+    state: ModelState = ModelState.NOT_LOADED
+    instance: Any = None
+    error: Optional[str] = None
+    load_seconds: Optional[float] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ModelRegistry:
+    """
+    AI 모델(STT/감정/LLM)의 로딩을 한 곳에서 관리하는 레지스트리입니다.
+    모델은 import 시점이 아니라 처음 사용할 때(get) 또는 백그라운드 워밍업에서 로딩됩니다.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """모델 이름과 로더 함수를 등록합니다. (로딩은 하지 않음)"""
+        if name not in self._entries:
+            self._entries[name] = _ModelEntry(name=name, loader=loader)
+            MODEL_READY.labels(model=name).set(0)
+
+    def get(self, name: str) -> Any:
+        """모델 인스턴스를 반환합니다. 아직 로딩 전이면 이 자리에서 로딩합니다."""
+        entry = self._entries[name]
+        if entry.state == ModelState.READY:
+            return entry.instance
+
+        with entry.lock:
+            # 다른 스레드가 먼저 로딩을 끝냈을 수 있음 (double-checked)
+            if entry.state == ModelState.READY:
+                return entry.instance
+
+            entry.state = ModelState.LOADING
+            entry.error = None
+            logger.info(f"⏳ Loading model '{name}'...")
+            started = time.perf_counter()
+            try:
+                entry.instance = entry.loader()
+            except Exception as e:
+                entry.state = ModelState.FAILED
+                entry.error = str(e)
+                logger.error(f"❌ Failed to load model '{name}': {e}")
+                raise
+
+            entry.load_seconds = round(time.perf_counter() - started, 2)
+            entry.state = ModelState.READY
+            MODEL_READY.labels(model=name).set(1)
+            logger.info(f"✅ Model '{name}' loaded in {entry.load_seconds}s")
+            return entry.instance
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.state == ModelState.READY
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> None:
+        """등록된 모델을 순서대로 미리 로딩합니다. 실패해도 다음 모델 로딩은 계속합니다."""
+        for name in list(names or self._entries.keys()):
+            try:
+                self.get(name)
+            except Exception:
+                # 실패 상태는 status()로 노출되고, 다음 get() 호출 시 재시도됨
+                continue
+
+    def start_warmup(self, names: Optional[Iterable[str]] = None) -> None:
+        """워밍업을 데몬 스레드에서 시작합니다. (API 요청 처리를 막지 않음)"""
+        if self._warmup_thread and self._warmup_thread.is_alive():
+            return
+        self._warmup_thread = threading.Thread(
+            target=self.warmup,
+            args=(list(names) if names else None,),
+            name="model-warmup",
+            daemon=True,
+        )
+        self._warmup_thread.start()
+
+    def shutdown(self) -> None:
+        """로딩된 모델 중 정리(shutdown)가 필요한 것(워커 풀 등)을 정리합니다."""
+        for entry in self._entries.values():
+            close = getattr(entry.instance, "shutdown", None)
+            if entry.state == ModelState.READY and callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.error(f"❌ Failed to shut down model '{entry.name}': {e}")
+
+    def status(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "state": entry.state.value,
+                "load_seconds": entry.load_seconds,
+                "error": entry.error,
+            }
+            for name, entry in self._entries.items()
+        }
+
+    def is_ready(self) -> bool:
+        return all(entry.state == ModelState.READY for entry in self._entries.values())
+
+
+# 싱글톤 인스턴스
+model_registry = ModelRegistry()
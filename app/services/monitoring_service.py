@@ -1,9 +1,10 @@
 import logging
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from app.core.metrics import TOTAL_USERS, TOTAL_DIARIES, EMOTION_COUNT
+from app.core.metrics import TOTAL_USERS, TOTAL_DIARIES, EMOTION_COUNT, JOB_COUNT
 from app.domains.auth.models import User
 from app.domains.diary.models import Diary
+from app.domains.job.models import Job, JobStatus
 
 logger = logging.getLogger("Vench.Monitoring")
 
@@ -58,6 +59,11 @@ def update_business_metrics(db: Session):
         for label, score_sum in stats.items():
             EMOTION_COUNT.labels(label=label).set(round(score_sum, 1))
 
+        # 5. 작업 대기열 상태별 작업 수 (DEAD가 늘면 알림 대상)
+        job_counts = dict(db.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
+        for job_status in JobStatus:
+            JOB_COUNT.labels(status=job_status.value).set(job_counts.get(job_status, 0))
+
         # logger.info(f"✅ Metrics Updated: Users={user_count}, Diaries={diary_count}")
 
     except Exception as e:
@@ -0,0 +1,155 @@
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.metrics import PIPELINE_SECONDS, PIPELINE_STAGE_SECONDS
+
+logger = logging.getLogger("Vench.Pipeline")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    파이프라인 단계
+    - fn(results): 앞 단계 결과 dict(이름 → 결과)를 받아 이 단계의 결과를 반환
+    - deps: 먼저 끝나야 하는 단계 이름
+    - executor: 실행할 executor 이름 (예: 감정 분류는 "cpu", LLM 생성은 "llm")
+    """
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    executor: str = "default"
+
+
+@dataclass
+class PipelineRun:
+    results: Dict[str, Any] = field(default_factory=dict)
+    # 단계별 실행 시간(초)
+    timings: Dict[str, float] = field(default_factory=dict)
+    wall_sec: float = 0.0
+
+    @property
+    def serial_sec(self) -> float:
+        """모든 단계를 순서대로 실행했다면 걸렸을 시간"""
+        return sum(self.timings.values())
+
+
+class StagePipeline:
+    """
+    의존 관계(DAG)로 정의된 단계들을 실행합니다.
+    의존 단계가 모두 끝난 단계는 바로 해당 executor에 제출되므로 서로 독립적인 단계는 동시에 실행됩니다.
+    on_start/on_done 콜백은 run()을 호출한 스레드에서 실행되므로 DB 세션처럼
+    스레드 안전하지 않은 객체는 콜백에서만 다루면 됩니다.
+    한 단계가 실패하면 새 단계는 시작하지 않고, 실행 중인 단계가 끝나기를 기다린 뒤 첫 예외를 다시 던집니다.
+    (이미 끝난 단계의 결과는 on_done으로 모두 전달됨)
+    """
+
+    def __init__(self, name: str, stages: Sequence[Stage]):
+        self.name = name
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Duplicate stage name")
+        self._order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order, visiting, visited = [], set(), set()
+
+        def visit(name: str) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle in pipeline at stage '{name}'")
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    @property
+    def order(self) -> List[str]:
+        """의존 단계가 항상 먼저 오는 순서"""
+        return list(self._order)
+
+    def descendants(self, names: Sequence[str]) -> List[str]:
+        """names와, names에 (간접적으로) 의존하는 모든 단계"""
+        affected = set(names)
+        for name in self._order:
+            if any(dep in affected for dep in self.stages[name].deps):
+                affected.add(name)
+        return [name for name in self._order if name in affected]
+
+    def _timed(self, stage: Stage, results: Dict[str, Any]) -> Tuple[Any, float]:
+        started = time.perf_counter()
+        result = stage.fn(results)
+        return result, time.perf_counter() - started
+
+    def run(
+        self,
+        executors: Dict[str, Executor],
+        initial: Optional[Dict[str, Any]] = None,
+        on_start: Optional[Callable[[str], None]] = None,
+        on_done: Optional[Callable[[str, Any], None]] = None,
+    ) -> PipelineRun:
+        """
+        initial에 이미 있는 단계(예: 체크포인트로 저장된 결과)는 건너뜁니다.
+        """
+        run = PipelineRun(results=dict(initial or {}))
+        remaining = [name for name in self._order if name not in run.results]
+        running: Dict[Future, str] = {}
+        error: Optional[BaseException] = None
+        started = time.perf_counter()
+
+        while remaining or running:
+            if error is None:
+                for name in list(remaining):
+                    stage = self.stages[name]
+                    if all(dep in run.results for dep in stage.deps):
+                        remaining.remove(name)
+                        if on_start:
+                            on_start(name)
+                        # 결과 dict는 복사해서 전달 (다른 단계가 끝나며 바뀌는 것을 막음)
+                        # contextvars(예: 작업의 LLM 우선순위)가 executor 스레드에서도 유지되도록 컨텍스트를 복사해 실행
+                        ctx = contextvars.copy_context()
+                        future = executors[stage.executor].submit(ctx.run, self._timed, stage, dict(run.results))
+                        running[future] = name
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    result, elapsed = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ [{self.name}] stage '{name}' failed: {e}")
+                    error = error or e
+                    continue
+                run.results[name] = result
+                run.timings[name] = elapsed
+                PIPELINE_STAGE_SECONDS.labels(stage=name).observe(elapsed)
+                if on_done:
+                    try:
+                        on_done(name, result)
+                    except Exception as e:
+                        error = error or e
+
+        run.wall_sec = time.perf_counter() - started
+        if error is not None:
+            raise error
+
+        PIPELINE_SECONDS.labels(pipeline=self.name).observe(run.wall_sec)
+        timings = ", ".join(f"{name}={sec:.1f}s" for name, sec in run.timings.items())
+        logger.info(
+            f"⏱️ [{self.name}] wall {run.wall_sec:.1f}s vs serial {run.serial_sec:.1f}s ({timings})"
+        )
+        return run
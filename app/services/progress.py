@@ -0,0 +1,68 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.domains.diary.models import Diary
+from app.services.job_queue import LeaseLostError, ensure_lease
+
+logger = logging.getLogger("Vench.Progress")
+
+
+class DiaryProgressPublisher:
+    """
+    STT 부분 결과(텍스트, 진행률)를 일기 레코드에 반영합니다.
+    프론트엔드는 기존처럼 GET /diaries/{id} 폴링으로 이 값을 읽습니다.
+    DB 부하를 막기 위해 min_interval_sec 간격으로만 기록합니다. (마지막 100%는 항상 기록)
+    """
+
+    def __init__(self, diary_id: int, min_interval_sec: Optional[float] = None):
+        self.diary_id = diary_id
+        self.min_interval_sec = (
+            settings.STT_PROGRESS_INTERVAL_SEC if min_interval_sec is None else min_interval_sec
+        )
+        self._last_published = 0.0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def publish(self, text: str, percent: float) -> None:
+        # 기록 중에는 lock을 잡아 close() 이후에 늦은 부분 결과가 최종 결과를 덮어쓰지 않도록 함
+        with self._lock:
+            if self._closed:
+                return
+            now = time.monotonic()
+            if percent < 100 and now - self._last_published < self.min_interval_sec:
+                return
+            self._last_published = now
+            self._write(text, percent)
+
+    def close(self) -> None:
+        """이후 도착하는 부분 결과는 무시합니다. (최종 결과 저장 직전에 호출)"""
+        with self._lock:
+            self._closed = True
+
+    def _write(self, text: str, percent: float) -> None:
+        # 작업 스레드의 세션과 분리된 별도 세션으로 기록
+        db = SessionLocal()
+        try:
+            db.query(Diary).filter(Diary.id == self.diary_id).update(
+                {
+                    Diary.transcript: text,
+                    Diary.progress: int(percent),
+                    Diary.process_message: f"🎤 목소리를 글로 옮기고 있어요... ({int(percent)}%)",
+                },
+                synchronize_session=False,
+            )
+            ensure_lease(db)
+            db.commit()
+        except LeaseLostError:
+            # 작업이 다른 워커에게 회수됨 → 이후 부분 결과도 기록하지 않음
+            db.rollback()
+            self._closed = True
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️ Failed to publish progress for diary {self.diary_id}: {e}")
+        finally:
+            db.close()
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.stream_relay import StreamRelay
+
+# (이벤트 이름, 데이터)
+StreamEvent = Tuple[str, Any]
+
+# 스트림 종료 이벤트 이름
+DONE_EVENT = "done"
+
+
+@dataclass
+class _Channel:
+    events: List[StreamEvent] = field(default_factory=list)
+    subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = field(default_factory=list)
+    closed_at: Optional[float] = None
+
+
+class DiaryStreamHub:
+    """
+    일기 생성 중간 결과(LLM 토큰 등)를 SSE 구독자에게 전달하는 프로세스 내 pub/sub 입니다.
+    - publish: 백그라운드 작업 스레드에서 호출
+    - subscribe: SSE 엔드포인트(이벤트 루프)에서 async for로 구독
+    늦게 구독해도 그동안의 이벤트를 처음부터 다시 받으며, 종료된 채널은 retention_sec 후 정리됩니다.
+    relay가 있으면 이벤트를 DB(StreamRelay)로도 전달해, 별도 워커 프로세스나 다른 API 프로세스에서
+    처리 중인 일기도 subscribe(follow_remote=True)로 구독할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        retention_sec: float = 300,
+        relay: Optional[StreamRelay] = None,
+        remote_idle_sec: float = 120,
+    ):
+        self.retention_sec = retention_sec
+        self.relay = relay
+        # 다른 프로세스의 스트림을 따라갈 때, 이 시간 동안 새 이벤트가 없으면 종료 (워커 중단 등)
+        self.remote_idle_sec = remote_idle_sec
+        self._channels: Dict[int, _Channel] = {}
+        self._lock = threading.Lock()
+
+    def _cleanup(self) -> None:
+        # lock을 잡은 상태에서 호출
+        now = time.monotonic()
+        expired = [
+            key for key, ch in self._channels.items()
+            if ch.closed_at is not None and now - ch.closed_at > self.retention_sec
+        ]
+        for key in expired:
+            del self._channels[key]
+
+    def open(self, diary_id: int) -> None:
+        """새 스트림을 시작합니다. (재처리 시 이전 이벤트는 버림)"""
+        with self._lock:
+            self._cleanup()
+            old = self._channels.get(diary_id)
+            channel = _Channel()
+            if old is not None and old.closed_at is None:
+                channel.subscribers = old.subscribers
+            self._channels[diary_id] = channel
+        if self.relay is not None:
+            self.relay.reset(diary_id)
+
+    def publish(self, diary_id: int, event: str, data: Any = None) -> None:
+        with self._lock:
+            channel = self._channels.get(diary_id)
+            if channel is None or channel.closed_at is not None:
+                return
+            item = (event, data)
+            channel.events.append(item)
+            if event == DONE_EVENT:
+                channel.closed_at = time.monotonic()
+            subscribers = list(channel.subscribers)
+
+        if self.relay is not None:
+            self.relay.put(diary_id, event, data)
+        for loop, q in subscribers:
+            try:
+                loop.call_soon_threadsafe(q.put_nowait, item)
+            except RuntimeError:
+                # 구독자의 이벤트 루프가 이미 종료됨
+                pass
+
+    def close(self, diary_id: int) -> None:
+        self.publish(diary_id, DONE_EVENT)
+
+    async def subscribe(
+        self, diary_id: int, heartbeat_sec: float = 15, follow_remote: bool = False
+    ) -> AsyncIterator[Optional[StreamEvent]]:
+        """
+        이벤트를 순서대로 내보냅니다. DONE_EVENT를 내보낸 뒤 종료합니다.
+        heartbeat_sec 동안 이벤트가 없으면 연결 유지를 위해 None을 내보냅니다.
+        이 프로세스에 스트림이 없을 때 follow_remote이면 relay(DB)의 이벤트를 따라가고, 아니면 바로 종료합니다.
+        """
+        loop = asyncio.get_running_loop()
+        q: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            channel = self._channels.get(diary_id)
+            if channel is not None:
+                history = list(channel.events)
+                channel.subscribers.append((loop, q))
+
+        if channel is None:
+            if follow_remote and self.relay is not None:
+                async for item in self._subscribe_remote(diary_id, heartbeat_sec):
+                    yield item
+            return
+
+        try:
+            for item in history:
+                yield item
+                if item[0] == DONE_EVENT:
+                    return
+            while True:
+                try:
+                    item = await asyncio.wait_for(q.get(), timeout=heartbeat_sec)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield item
+                if item[0] == DONE_EVENT:
+                    return
+        finally:
+            with self._lock:
+                channel = self._channels.get(diary_id)
+                if channel is not None and (loop, q) in channel.subscribers:
+                    channel.subscribers.remove((loop, q))
+
+
+    async def _subscribe_remote(self, diary_id: int, heartbeat_sec: float) -> AsyncIterator[Optional[StreamEvent]]:
+        """relay 테이블을 flush 간격마다 폴링해 다른 프로세스가 기록한 이벤트를 내보냅니다."""
+        loop = asyncio.get_running_loop()
+        after_id = 0
+        idle_since = last_beat = time.monotonic()
+        while True:
+            rows = await loop.run_in_executor(None, self.relay.fetch, diary_id, after_id)
+            now = time.monotonic()
+            if rows:
+                idle_since = last_beat = now
+            for row_id, event, data in rows:
+                after_id = row_id
+                yield event, data
+                if event == DONE_EVENT:
+                    return
+            if now - idle_since > self.remote_idle_sec:
+                return
+            if now - last_beat >= heartbeat_sec:
+                last_beat = now
+                yield None
+            await asyncio.sleep(self.relay.flush_sec)
+
+
+stream_hub = DiaryStreamHub(
+    relay=StreamRelay.from_settings() if settings.STREAM_RELAY else None,
+    remote_idle_sec=settings.STREAM_RELAY_IDLE_SEC,
+)
@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.domains.diary.models import DiaryStreamEvent
+
+logger = logging.getLogger("Vench.StreamRelay")
+
+# 합쳐서 저장할 수 있는 토큰 이벤트 (data가 문자열 조각)
+TOKEN_EVENTS = ("summary", "advice")
+
+# 스트림 재시작 표시 (이 일기의 이전 이벤트 행을 지움, DB에는 기록하지 않음)
+_RESET = "__reset__"
+
+
+class StreamRelay:
+    """
+    DiaryStreamHub 이벤트를 diary_stream_events 테이블로 전달해 다른 프로세스에서도 구독할 수 있게 합니다.
+    - put: 이벤트를 버퍼에 넣기만 하고, 백그라운드 스레드가 flush_sec마다 한 트랜잭션으로 기록
+      (같은 일기의 연속된 토큰 이벤트는 한 행으로 합침 → 토큰마다 INSERT하지 않음)
+    - fetch: 마지막으로 읽은 id 이후의 이벤트 조회 (SSE 엔드포인트가 폴링)
+    기록에 실패한 이벤트는 버리고 로그만 남깁니다. (최종 결과는 일기 레코드에 저장되므로 스트림은 보조 수단)
+    """
+
+    def __init__(self, flush_sec: float, retention_sec: float):
+        self.flush_sec = flush_sec
+        self.retention_sec = retention_sec
+        self._buffer: List[List[Any]] = []   # [diary_id, event, data]
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_cleanup = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "StreamRelay":
+        return cls(
+            flush_sec=settings.STREAM_RELAY_FLUSH_MS / 1000,
+            retention_sec=settings.STREAM_RELAY_RETENTION_SEC,
+        )
+
+    def put(self, diary_id: int, event: str, data: Any = None) -> None:
+        with self._lock:
+            last = self._buffer[-1] if self._buffer else None
+            if event in TOKEN_EVENTS and last is not None and last[0] == diary_id and last[1] == event:
+                last[2] += data
+            else:
+                self._buffer.append([diary_id, event, data])
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="stream-relay", daemon=True)
+                self._thread.start()
+        if event not in TOKEN_EVENTS:
+            # 상태/완료 이벤트는 바로 기록
+            self._wakeup.set()
+
+    def reset(self, diary_id: int) -> None:
+        """재처리로 스트림을 다시 시작할 때 이전 이벤트를 지웁니다."""
+        self.put(diary_id, _RESET)
+
+    def _loop(self) -> None:
+        while True:
+            self._wakeup.wait(timeout=self.flush_sec)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            items, self._buffer = self._buffer, []
+        cleanup = time.monotonic() - self._last_cleanup > self.retention_sec / 10
+        if not items and not cleanup:
+            return
+
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            for diary_id, event, data in items:
+                if event == _RESET:
+                    db.query(DiaryStreamEvent).filter(DiaryStreamEvent.diary_id == diary_id).delete(
+                        synchronize_session=False
+                    )
+                else:
+                    db.add(DiaryStreamEvent(diary_id=diary_id, event=event, data=data, created_at=now))
+            if cleanup:
+                db.query(DiaryStreamEvent).filter(
+                    DiaryStreamEvent.created_at < now - timedelta(seconds=self.retention_sec)
+                ).delete(synchronize_session=False)
+                self._last_cleanup = time.monotonic()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️ Failed to relay {len(items)} stream event(s): {e}")
+        finally:
+            db.close()
+
+    def fetch(self, diary_id: int, after_id: int = 0) -> List[Tuple[int, str, Any]]:
+        """after_id 이후의 (id, 이벤트, 데이터) 목록"""
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(DiaryStreamEvent.id, DiaryStreamEvent.event, DiaryStreamEvent.data)
+                .filter(DiaryStreamEvent.diary_id == diary_id, DiaryStreamEvent.id > after_id)
+                .order_by(DiaryStreamEvent.id)
+                .all()
+            )
+            return [(row.id, row.event, row.data) for row in rows]
+        finally:
+            db.close()
@@ -0,0 +1,98 @@
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from app.core.metrics import STT_BATCH_SIZE
+from app.services.stt_policy import STTTier
+
+logger = logging.getLogger("Vench.STTBatcher")
+
+
+@dataclass
+class _BatchJob:
+    audio: np.ndarray
+    tier: STTTier
+    future: Future = field(default_factory=Future)
+
+
+# (오디오 목록, 티어) → 오디오별 텍스트 목록을 돌려주는 Future
+BatchDispatcher = Callable[[List[np.ndarray], STTTier], Future]
+
+
+class STTBatcher:
+    """
+    대기 중인 STT 작업을 짧은 시간(window) 동안 모아 한 번에 배치 추론합니다.
+    최대 max_batch_size 개가 모이거나 window가 지나면 같은 티어끼리 묶어 dispatch 합니다.
+    """
+
+    def __init__(self, dispatch: BatchDispatcher, max_batch_size: int, window_sec: float):
+        self._dispatch = dispatch
+        self.max_batch_size = max_batch_size
+        self.window_sec = window_sec
+        self._queue: "queue.Queue[Optional[_BatchJob]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch_size > 1
+
+    def submit(self, audio: np.ndarray, tier: STTTier) -> Future:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stt-batcher", daemon=True)
+                self._thread.start()
+
+        job = _BatchJob(audio=audio, tier=tier)
+        self._queue.put(job)
+        return job.future
+
+    def _collect(self) -> List[_BatchJob]:
+        # 첫 작업이 올 때까지 대기 → 이후 window 동안 최대 크기까지 추가 수집
+        jobs = [self._queue.get()]
+        deadline = time.monotonic() + self.window_sec
+        while len(jobs) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return jobs
+
+    def _run(self) -> None:
+        while True:
+            groups = defaultdict(list)
+            for job in self._collect():
+                groups[job.tier].append(job)
+
+            for tier, group in groups.items():
+                STT_BATCH_SIZE.observe(len(group))
+                try:
+                    batch_future = self._dispatch([job.audio for job in group], tier)
+                except Exception as e:
+                    for job in group:
+                        job.future.set_exception(e)
+                    continue
+                batch_future.add_done_callback(lambda f, group=group: self._fan_out(f, group))
+
+    @staticmethod
+    def _fan_out(batch_future: Future, group: List[_BatchJob]) -> None:
+        """배치 결과를 각 작업의 Future로 나눠 전달합니다."""
+        error = batch_future.exception()
+        if error is not None:
+            logger.error(f"❌ STT batch failed ({len(group)} jobs): {error}")
+            for job in group:
+                job.future.set_exception(error)
+            return
+
+        for job, text in zip(group, batch_future.result()):
+            job.future.set_result(text)
@@ -0,0 +1,117 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger("Vench.STTPolicy")
+
+
+@dataclass(frozen=True)
+class STTTier:
+    """Whisper 추론 설정 한 단계 (모델 크기 + 빔 너비)"""
+    model_size: str
+    beam_size: int
+
+    @property
+    def tag(self) -> str:
+        # Diary.model_version 에 기록되는 값 (예: stt-medium-b5)
+        return f"stt-{self.model_size}-b{self.beam_size}"
+
+
+# CPU int8 기준 대략적인 실시간 계수(RTF = 처리 시간 / 오디오 길이) 초기값
+# 실제 처리 시간을 관측하면서 지수 이동 평균으로 보정합니다.
+DEFAULT_RTF: Dict[str, float] = {
+    "large-v3": 1.0,
+    "medium": 0.5,
+    "small": 0.2,
+    "base": 0.1,
+    "tiny": 0.06,
+}
+
+
+def parse_tiers(spec: str) -> List[STTTier]:
+    """"medium:5,small:2,tiny:1" 형식의 설정을 정확도 높은 순서의 티어 목록으로 변환"""
+    tiers = []
+    for item in spec.split(","):
+        size, _, beam = item.strip().partition(":")
+        if size:
+            tiers.append(STTTier(size, int(beam or 1)))
+    return tiers
+
+
+class STTTierPolicy:
+    """
+    STT 워커를 기다리는 작업 수(부하), 오디오 길이, 지연 시간 목표(SLO)를 보고 티어를 고릅니다.
+    - 대기 작업이 없으면(워커가 비어 있으면) 길이와 상관없이 항상 가장 정확한 티어를 사용합니다.
+    - 긴 녹음(STT_LONG_AUDIO_SEC 이상)은 분할 병렬 처리되므로 항상 기본 티어를 사용합니다.
+    - 부하가 있을 때 짧은 녹음만, 예상 지연이 SLO 안에 들어오는 가장 정확한 티어로 낮춥니다.
+      예상 지연 = RTF × (대기 작업 수 / 병렬도 × 최근 평균 오디오 길이 + 오디오 길이)
+      (앞에 대기 중인 작업도 같은 부하에서 같은 티어로 처리된다고 가정)
+      어느 티어도 맞출 수 없으면 가장 가벼운 티어를 사용합니다.
+    """
+
+    def __init__(
+        self,
+        tiers: List[STTTier],
+        slo_sec: float,
+        parallelism: int,
+        long_audio_sec: float = float("inf"),
+        enabled: bool = True,
+    ):
+        self.tiers = tiers
+        self.slo_sec = slo_sec
+        self.parallelism = max(1, parallelism)
+        self.long_audio_sec = long_audio_sec
+        self.enabled = enabled
+        self._rtf = {t.model_size: DEFAULT_RTF.get(t.model_size, 0.5) for t in tiers}
+        # 최근 요청들의 평균 오디오 길이(초) (대기 작업 하나의 처리 시간 추정용)
+        self._mean_duration: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "STTTierPolicy":
+        default = STTTier(settings.STT_MODEL_SIZE, settings.STT_BEAM_SIZE)
+        tiers = [default] + [t for t in parse_tiers(settings.STT_TIERS) if t.model_size != default.model_size]
+        return cls(
+            tiers=tiers,
+            slo_sec=settings.STT_LATENCY_SLO_SEC,
+            parallelism=max(settings.STT_POOL_SIZE, settings.STT_NUM_WORKERS),
+            long_audio_sec=settings.STT_LONG_AUDIO_SEC,
+            enabled=settings.STT_ADAPTIVE_TIER,
+        )
+
+    @property
+    def default(self) -> STTTier:
+        return self.tiers[0]
+
+    def estimate_sec(self, tier: STTTier, duration_sec: float, queue_depth: int) -> float:
+        queued_sec = queue_depth / self.parallelism * (self._mean_duration or duration_sec)
+        return self._rtf[tier.model_size] * (queued_sec + duration_sec)
+
+    def choose(self, duration_sec: float, queue_depth: int) -> STTTier:
+        """queue_depth: 빈 워커를 기다리는 STT 작업 수 (실행 중인 작업 제외)"""
+        with self._lock:
+            prev = self._mean_duration
+            self._mean_duration = duration_sec if prev is None else 0.8 * prev + 0.2 * duration_sec
+
+        if not self.enabled or queue_depth <= 0 or duration_sec >= self.long_audio_sec:
+            return self.default
+
+        for tier in self.tiers:
+            if self.estimate_sec(tier, duration_sec, queue_depth) <= self.slo_sec:
+                return tier
+        return self.tiers[-1]
+
+    def observe(self, tier: STTTier, duration_sec: float, elapsed_sec: float, alpha: float = 0.2) -> None:
+        """대기 없이 처리된 작업의 실제 RTF로 추정치를 보정합니다."""
+        if duration_sec <= 0:
+            return
+        with self._lock:
+            prev = self._rtf[tier.model_size]
+            self._rtf[tier.model_size] = (1 - alpha) * prev + alpha * (elapsed_sec / duration_sec)
+
+
+# 싱글톤 인스턴스
+stt_policy = STTTierPolicy.from_settings()
@@ -0,0 +1,211 @@
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import STT_QUEUE_DEPTH
+
+logger = logging.getLogger("Vench.STTPool")
+
+
+class STTQueueFullError(RuntimeError):
+    """STT 대기열이 가득 차서 작업을 받을 수 없을 때 발생합니다."""
+
+
+# ==========================================
+# 1. 워커 프로세스 측 (각 프로세스가 자기 모델을 보유)
+# ==========================================
+_worker_models: Dict[str, object] = {}
+_worker_options: dict = {}
+# 부분 결과(job_id, 텍스트, 진행률)를 API 프로세스로 보내는 큐
+_event_queue = None
+
+
+def _init_worker(model_size: str, compute_type: str, cpu_threads: int, num_workers: int, event_queue=None) -> None:
+    global _event_queue
+    _event_queue = event_queue
+    _worker_options.update(compute_type=compute_type, cpu_threads=cpu_threads, num_workers=num_workers)
+    # 기본 모델은 기동 시 바로 로딩, 다른 크기(적응형 티어)는 처음 필요할 때 로딩
+    _get_worker_model(model_size)
+
+
+def _get_worker_model(model_size: str):
+    if model_size not in _worker_models:
+        from faster_whisper import WhisperModel
+
+        _worker_models[model_size] = WhisperModel(model_size, device="cpu", **_worker_options)
+    return _worker_models[model_size]
+
+
+def _worker_ping() -> int:
+    # 워커 기동(=모델 로딩) 완료 확인용
+    return os.getpid()
+
+
+def _worker_transcribe(audio, job_id: Optional[int] = None, model_size: Optional[str] = None, beam_size: int = 5) -> str:
+    # audio: 파일 경로 또는 16kHz float32 배열
+    from app.services.stt_service import transcribe_with_model
+
+    model = _get_worker_model(model_size or settings.STT_MODEL_SIZE)
+    on_segment = None
+    if job_id is not None and _event_queue is not None:
+        def on_segment(text: str, percent: float) -> None:
+            _event_queue.put((job_id, text, percent))
+
+    return transcribe_with_model(model, audio, on_segment, beam_size=beam_size)
+
+
+def _worker_transcribe_batch(audios, model_size: Optional[str] = None, beam_size: int = 5):
+    from app.services.stt_service import transcribe_batch_with_model
+
+    model = _get_worker_model(model_size or settings.STT_MODEL_SIZE)
+    return transcribe_batch_with_model(model, audios, beam_size=beam_size)
+
+
+# ==========================================
+# 2. API 프로세스 측 (작업 제출 및 대기열 관리)
+# ==========================================
+class STTWorkerPool:
+    """
+    Whisper 모델을 하나씩 올린 STT 워커 프로세스 풀입니다.
+    처리 중 + 대기 중 작업 수는 size + queue_size 로 제한됩니다.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        queue_size: int,
+        model_size: str,
+        compute_type: str,
+        cpu_threads: int = 0,
+        num_workers: int = 1,
+    ):
+        self.size = size
+        self.queue_size = queue_size
+        self.model_size = model_size
+        self.compute_type = compute_type
+        # 0이면 코어를 워커 수만큼 나눠서 할당 (프로세스끼리 코어 경합 방지)
+        self.cpu_threads = cpu_threads or max(1, (os.cpu_count() or 1) // size)
+        self.num_workers = num_workers
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(size + queue_size)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        # 진행 상황 이벤트 전달용 (job_id → 콜백)
+        self._events = None
+        self._listeners: Dict[int, Callable[[str, float], None]] = {}
+        self._job_ids = itertools.count(1)
+
+    @classmethod
+    def from_settings(cls) -> "STTWorkerPool":
+        return cls(
+            size=settings.STT_POOL_SIZE,
+            queue_size=settings.STT_QUEUE_SIZE,
+            model_size=settings.STT_MODEL_SIZE,
+            compute_type=settings.STT_COMPUTE_TYPE,
+            cpu_threads=settings.STT_CPU_THREADS,
+            num_workers=settings.STT_NUM_WORKERS,
+        )
+
+    def start(self) -> "STTWorkerPool":
+        # CTranslate2/torch는 fork와 궁합이 좋지 않으므로 spawn 사용
+        ctx = mp.get_context("spawn")
+        self._events = ctx.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(self.model_size, self.compute_type, self.cpu_threads, self.num_workers, self._events),
+        )
+        threading.Thread(target=self._dispatch_events, name="stt-events", daemon=True).start()
+
+        # 워커 수만큼 ping을 보내 모든 프로세스가 모델을 올리도록 함
+        pids = {f.result() for f in [self._executor.submit(_worker_ping) for _ in range(self.size)]}
+        logger.info(
+            f"✅ STT worker pool started: {len(pids)} workers "
+            f"(model={self.model_size}, cpu_threads={self.cpu_threads}, num_workers={self.num_workers})"
+        )
+        return self
+
+    def _dispatch_events(self) -> None:
+        """워커가 보낸 부분 결과를 해당 작업의 콜백으로 전달합니다."""
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            job_id, text, percent = event
+            callback = self._listeners.get(job_id)
+            if callback is None:
+                continue  # 이미 끝난 작업의 늦게 도착한 이벤트
+            try:
+                callback(text, percent)
+            except Exception as e:
+                logger.warning(f"⚠️ STT progress callback error: {e}")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _release(self, _: Future) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+            STT_QUEUE_DEPTH.set(self._pending)
+        self._slots.release()
+
+    def submit(self, fn, *args) -> Future:
+        if self._executor is None:
+            raise RuntimeError("STT worker pool is not started")
+
+        if not self._slots.acquire(timeout=settings.STT_SUBMIT_TIMEOUT_SEC):
+            raise STTQueueFullError(f"STT queue is full ({self.size + self.queue_size} jobs)")
+
+        with self._pending_lock:
+            self._pending += 1
+            STT_QUEUE_DEPTH.set(self._pending)
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def submit_transcribe(
+        self,
+        audio,
+        on_progress: Optional[Callable[[str, float], None]] = None,
+        model_size: Optional[str] = None,
+        beam_size: int = 5,
+    ) -> Future:
+        """변환 작업(파일 경로 또는 16kHz 배열)을 풀에 제출합니다."""
+        model_size = model_size or self.model_size
+        if on_progress is None:
+            return self.submit(_worker_transcribe, audio, None, model_size, beam_size)
+
+        job_id = next(self._job_ids)
+        self._listeners[job_id] = on_progress
+        try:
+            future = self.submit(_worker_transcribe, audio, job_id, model_size, beam_size)
+        except Exception:
+            self._listeners.pop(job_id, None)
+            raise
+        future.add_done_callback(lambda _: self._listeners.pop(job_id, None))
+        return future
+
+    def submit_transcribe_batch(self, audios, model_size: Optional[str] = None, beam_size: int = 5) -> Future:
+        """여러 업로드(16kHz 배열 목록)를 한 워커에서 배치 추론하도록 제출합니다."""
+        return self.submit(_worker_transcribe_batch, audios, model_size or self.model_size, beam_size)
+
+    def shutdown(self) -> None:
+        if self._events is not None:
+            self._events.put(None)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
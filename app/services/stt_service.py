@@ -1,63 +1,383 @@
 # app/services/stt_service.py
+import bisect
 import os
-from faster_whisper import WhisperModel
-from pydub import AudioSegment, effects
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import STT_TIER
+from app.services.model_registry import model_registry
+from app.services.stt_batcher import STTBatcher
+from app.services.stt_policy import STTTier, stt_policy
+from app.services.stt_pool import STTWorkerPool
 
 # ==========================================
 # 1. 모델 업그레이드 (small -> medium)
 # ==========================================
-# 정확도를 위해 'medium' 모델을 사용합니다.
-model = WhisperModel("medium", device="cpu", compute_type="int8")
+# 정확도를 위해 'medium' 모델을 사용합니다. (STT_MODEL_SIZE로 변경 가능)
+# import 시점에 로딩하지 않고, 레지스트리를 통해 최초 사용(또는 워밍업) 시 로딩합니다.
+# STT_POOL_SIZE > 0 이면 워커 프로세스 풀을, 0이면 프로세스 내 단일 모델을 사용합니다.
+def _load_stt_backend():
+    if settings.STT_POOL_SIZE > 0:
+        return STTWorkerPool.from_settings().start()
+
+    from faster_whisper import WhisperModel
+    return WhisperModel(
+        settings.STT_MODEL_SIZE,
+        device="cpu",
+        compute_type=settings.STT_COMPUTE_TYPE,
+        cpu_threads=settings.STT_CPU_THREADS,
+        num_workers=settings.STT_NUM_WORKERS,
+    )
 
-def convert_to_wav_and_boost(input_path: str) -> str:
+model_registry.register("stt", _load_stt_backend)
+
+# ==========================================
+# 2. 오디오 전처리 (메모리 내 디코딩)
+# ==========================================
+# Whisper 권장 사양: 16000Hz, Mono, float32
+SAMPLE_RATE = 16000
+# pydub effects.normalize 기본값과 동일한 헤드룸 (0.1dB)
+NORMALIZE_HEADROOM_DB = 0.1
+
+def normalize_peak(audio: np.ndarray, headroom_db: float = NORMALIZE_HEADROOM_DB) -> np.ndarray:
     """
-    오디오 포맷 변환 및 볼륨 정규화(증폭) 수행
+    볼륨 정규화(증폭): 최대 진폭이 -headroom_db 가 되도록 전체 샘플을 한 번에 스케일링합니다.
+    소리가 작게 녹음된 경우 최대 볼륨으로 증폭시킵니다.
     """
-    try:
-        # pydub로 로드
-        audio = AudioSegment.from_file(input_path)
+    peak = float(np.max(np.abs(audio))) if audio.size else 0.0
+    if peak <= 0.0:
+        return audio
+
+    target = 10 ** (-headroom_db / 20)
+    return (audio * (target / peak)).astype(np.float32, copy=False)
 
-        # [New] 볼륨 정규화 (Normalization)
-        # 소리가 작게 녹음된 경우 최대 볼륨으로 증폭시킵니다.
-        audio = effects.normalize(audio)
+def load_audio(input_path: str) -> np.ndarray:
+    """
+    업로드 파일을 디스크에 다시 쓰지 않고 16kHz Mono float32 배열로 바로 디코딩합니다.
+    (faster-whisper 내장 PyAV 디코더 사용 → ffmpeg 프로세스/임시 .wav 없음)
+    """
+    from faster_whisper.audio import decode_audio
 
-        # 경로 설정 (.wav로 변경)
-        output_path = os.path.splitext(input_path)[0] + ".wav"
+    audio = decode_audio(input_path, sampling_rate=SAMPLE_RATE)
+    return normalize_peak(audio)
 
-        # 변환 저장 (16000Hz, Mono - Whisper 권장 사양)
-        audio = audio.set_frame_rate(16000).set_channels(1)
-        audio.export(output_path, format="wav")
+# 진행 상황 콜백: (지금까지의 부분 텍스트, 처리된 오디오 비율 0~100)
+ProgressCallback = Callable[[str, float], None]
 
-        return output_path
-    except Exception as e:
-        print(f"⚠️ 오디오 변환/증폭 실패 (원본 사용): {e}")
-        return input_path
+def transcribe_with_model(
+    model,
+    audio: Union[str, np.ndarray],
+    on_segment: Optional[ProgressCallback] = None,
+    beam_size: int = 5,
+    vad_filter: bool = True,
+) -> str:
+    """
+    주어진 Whisper 모델로 오디오(파일 경로 또는 16kHz 배열)를 변환합니다. (워커 프로세스/로컬 공용)
+    on_segment가 주어지면 세그먼트가 디코딩될 때마다 부분 텍스트와 진행률을 전달합니다.
+    말소리가 없으면 ""를 반환하고, 추론 중 오류는 그대로 던집니다. (빈 결과와 실패를 구분)
+    """
+    if isinstance(audio, str):
+        try:
+            audio = load_audio(audio)
+        except Exception as e:
+            # 디코딩 실패 시 Whisper에 원본 경로를 그대로 넘김
+            print(f"⚠️ 오디오 디코딩/증폭 실패 (원본 사용): {e}")
 
-def transcribe(audio_path: str) -> str:
-    if not os.path.exists(audio_path):
+    # Transcribe 옵션 튜닝
+    segments, info = model.transcribe(
+        audio,
+        language="ko",
+        beam_size=beam_size, # 탐색 너비 (정확도 vs 속도, 티어별로 다름)
+        vad_filter=vad_filter, # 무음 구간 필터링
+        condition_on_previous_text=False, # 환각(반복) 방지
+        # min_silence_duration_ms 인자 제거 (기본값 사용)
+    )
+
+    # segments는 제너레이터 → 디코딩되는 대로 하나씩 받아서 진행 상황 전달
+    texts: List[str] = []
+    for segment in segments:
+        texts.append(segment.text.strip())
+        if on_segment and info.duration:
+            percent = min(100.0, segment.end / info.duration * 100)
+            on_segment(" ".join(texts).strip(), percent)
+
+    transcript = " ".join(texts).strip()
+
+    if len(transcript) < 2:
         return ""
 
-    # [Updated] 변환 및 볼륨 부스팅 적용
-    safe_audio_path = convert_to_wav_and_boost(audio_path)
+    return transcript
 
-    try:
-        # Transcribe 옵션 튜닝
-        segments, info = model.transcribe(
-            safe_audio_path,
-            language="ko",
-            beam_size=5,        # 탐색 너비 (정확도 vs 속도)
-            vad_filter=True,    # 무음 구간 필터링
-            condition_on_previous_text=False, # 환각(반복) 방지
-            # min_silence_duration_ms 인자 제거 (기본값 사용)
+# ==========================================
+# 3. 배치 추론 (여러 업로드를 한 번의 BatchedInferencePipeline 호출로 변환)
+# ==========================================
+# Whisper 입력 창 길이(초): 배치 안의 각 구간은 이 길이를 넘을 수 없음
+WHISPER_WINDOW_SEC = 30
+
+def _clip_position(sample: int, version: str) -> Union[int, float]:
+    """
+    이어붙인 오디오의 샘플 위치를 BatchedInferencePipeline의 clip_timestamps 값으로 변환
+    (faster-whisper 1.1.x는 샘플 위치를 그대로, 1.2 이상은 초 단위로 받아 sampling_rate를 곱함)
+    """
+    major, minor = (int(part) for part in version.split(".")[:2])
+    return sample if (major, minor) < (1, 2) else sample / SAMPLE_RATE
+
+def transcribe_batch_with_model(model, audios: List[np.ndarray], beam_size: int = 5) -> List[str]:
+    """
+    여러 오디오를 이어붙인 뒤 오디오별 말소리 구간(최대 30초)을 clip_timestamps로 지정해
+    faster-whisper 배치 파이프라인으로 한 번에 변환하고, 결과를 오디오별로 다시 나눕니다.
+    """
+    import faster_whisper
+    from faster_whisper import BatchedInferencePipeline
+
+    version = faster_whisper.__version__
+    pieces: List[np.ndarray] = []
+    clips: List[dict] = []
+    job_starts: List[float] = []   # 이어붙인 타임라인에서 각 오디오의 시작 시각(초, 세그먼트 분배용)
+    offset = 0
+    for audio in audios:
+        job_starts.append(offset / SAMPLE_RATE)
+        for piece in split_on_silence(audio, WHISPER_WINDOW_SEC):
+            pieces.append(piece)
+            clips.append({
+                "start": _clip_position(offset, version),
+                "end": _clip_position(offset + len(piece), version),
+            })
+            offset += len(piece)
+
+    texts: List[List[str]] = [[] for _ in audios]
+    if not clips:
+        return ["" for _ in audios]
+
+    pipeline = BatchedInferencePipeline(model=model)
+    segments, _ = pipeline.transcribe(
+        np.concatenate(pieces),
+        language="ko",
+        beam_size=beam_size,
+        vad_filter=False,            # 구간은 이미 VAD로 나눠서 clip_timestamps로 전달
+        clip_timestamps=clips,
+        batch_size=len(clips),
+        without_timestamps=True,
+    )
+
+    # 세그먼트 시작 시각으로 어느 오디오에 속하는지 찾아서 분배
+    for segment in segments:
+        job_idx = max(0, bisect.bisect_right(job_starts, segment.start + 1e-3) - 1)
+        texts[job_idx].append(segment.text.strip())
+
+    results = []
+    for job_texts in texts:
+        transcript = " ".join(job_texts).strip()
+        results.append(transcript if len(transcript) >= 2 else "")
+    return results
+
+# ==========================================
+# 4. 긴 녹음 모드 (VAD 무음 경계로 분할 → 병렬 변환 → 순서대로 이어붙이기)
+# ==========================================
+_local_executor: Optional[ThreadPoolExecutor] = None
+# 프로세스 내 모드에서 기본 크기가 아닌 티어 모델 캐시
+_local_models: Dict[str, object] = {}
+
+def split_on_silence(audio: np.ndarray, max_chunk_sec: float) -> List[np.ndarray]:
+    """
+    Silero VAD로 말소리 구간을 찾고, 구간 사이의 무음 지점에서만 잘라
+    최대 max_chunk_sec 길이의 청크 목록을 만듭니다. (말소리가 없는 구간은 버림)
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    max_samples = int(max_chunk_sec * SAMPLE_RATE)
+    speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=500))
+
+    chunks: List[np.ndarray] = []
+    chunk_start = chunk_end = None
+    for ts in speech:
+        start, end = ts["start"], ts["end"]
+
+        # 현재 청크에 붙이면 최대 길이를 넘는 경우 → 직전 무음 경계에서 자름
+        if chunk_start is not None and end - chunk_start > max_samples:
+            chunks.append(audio[chunk_start:chunk_end])
+            chunk_start = None
+
+        if chunk_start is None:
+            chunk_start = start
+        chunk_end = end
+
+        # 말소리 한 구간 자체가 최대 길이보다 길면 어쩔 수 없이 고정 길이로 자름
+        while chunk_end - chunk_start > max_samples:
+            chunks.append(audio[chunk_start:chunk_start + max_samples])
+            chunk_start += max_samples
+
+    if chunk_start is not None:
+        chunks.append(audio[chunk_start:chunk_end])
+    return chunks
+
+def _get_local_model(backend, model_size: str):
+    if model_size == settings.STT_MODEL_SIZE:
+        return backend
+    if model_size not in _local_models:
+        from faster_whisper import WhisperModel
+        _local_models[model_size] = WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=settings.STT_COMPUTE_TYPE,
+            cpu_threads=settings.STT_CPU_THREADS,
+            num_workers=settings.STT_NUM_WORKERS,
+        )
+    return _local_models[model_size]
+
+def _submit(
+    backend,
+    audio: Union[str, np.ndarray],
+    tier: STTTier,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Future:
+    global _local_executor
+    if isinstance(backend, STTWorkerPool):
+        return backend.submit_transcribe(
+            audio, on_progress=on_progress, model_size=tier.model_size, beam_size=tier.beam_size
         )
 
-        transcript = " ".join(segment.text.strip() for segment in segments).strip()
+    # 프로세스 내 모델: CTranslate2는 num_workers 만큼 동시 추론 가능
+    if _local_executor is None:
+        _local_executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.STT_NUM_WORKERS), thread_name_prefix="stt"
+        )
+    model = _get_local_model(backend, tier.model_size)
+    return _local_executor.submit(transcribe_with_model, model, audio, on_progress, tier.beam_size)
 
-        if len(transcript) < 2:
-            return ""
+def _transcribe_long(
+    backend,
+    audio: np.ndarray,
+    tier: STTTier,
+    on_progress: Optional[ProgressCallback] = None,
+) -> str:
+    chunks = split_on_silence(audio, settings.STT_CHUNK_SEC)
+    print(f"🎙️ Long audio mode: {len(audio) / SAMPLE_RATE:.0f}s → {len(chunks)} chunks")
 
-        return transcript
+    # 병렬도(워커 수)만큼만 동시에 제출하고, 결과는 원래 순서대로 모음
+    # (한꺼번에 제출하면 다른 사용자의 작업이 대기열에 들어갈 자리가 없어짐)
+    parallelism = backend.size if isinstance(backend, STTWorkerPool) else max(1, settings.STT_NUM_WORKERS)
+    in_flight: deque = deque()
+    texts: List[str] = []
 
-    except Exception as e:
-        print(f"❌ STT 실패: {e}")
-        return ""
+    def _collect(future: Future) -> None:
+        # 앞 청크부터 순서대로 완료되므로, 이어붙인 텍스트를 그대로 부분 결과로 전달
+        texts.append(future.result())
+        if on_progress:
+            on_progress(" ".join(t for t in texts if t).strip(), len(texts) / len(chunks) * 100)
+
+    for chunk in chunks:
+        if len(in_flight) >= parallelism:
+            _collect(in_flight.popleft())
+        in_flight.append(_submit(backend, chunk, tier))
+    while in_flight:
+        _collect(in_flight.popleft())
+
+    return " ".join(t for t in texts if t).strip()
+
+# 배치 모드 제출 (STT_BATCH_MAX_SIZE > 1 일 때 stt_batcher가 호출)
+def _submit_batch(audios: List[np.ndarray], tier: STTTier) -> Future:
+    global _local_executor
+    backend = model_registry.get("stt")
+    if isinstance(backend, STTWorkerPool):
+        return backend.submit_transcribe_batch(audios, model_size=tier.model_size, beam_size=tier.beam_size)
+
+    if _local_executor is None:
+        _local_executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.STT_NUM_WORKERS), thread_name_prefix="stt"
+        )
+    model = _get_local_model(backend, tier.model_size)
+    return _local_executor.submit(transcribe_batch_with_model, model, audios, tier.beam_size)
+
+stt_batcher = STTBatcher(
+    _submit_batch,
+    max_batch_size=settings.STT_BATCH_MAX_SIZE,
+    window_sec=settings.STT_BATCH_WINDOW_MS / 1000,
+)
+
+# ==========================================
+# 5. 외부 진입점
+# ==========================================
+@dataclass
+class TranscriptionResult:
+    text: str
+    tier: STTTier
+    duration_sec: float = 0.0
+    elapsed_sec: float = 0.0
+
+# 현재 변환 중인 요청 수 (프로세스 내 모델일 때 대기 부하 계산에 사용)
+_active_jobs = 0
+_active_lock = threading.Lock()
+
+def _queue_depth(backend, active_before: int) -> int:
+    """빈 워커를 기다리는 STT 작업 수 (적응형 티어 선택의 부하 지표)"""
+    if isinstance(backend, STTWorkerPool):
+        # 풀에 제출된 작업(긴 녹음의 청크, 배치 포함) 중 워커 수를 넘는 만큼이 대기 중
+        return max(0, backend.pending - backend.size)
+    return max(0, active_before - max(1, settings.STT_NUM_WORKERS))
+
+def transcribe_audio(audio_path: str, on_progress: Optional[ProgressCallback] = None) -> TranscriptionResult:
+    """
+    오디오 파일을 텍스트로 변환하고, 사용한 티어/오디오 길이/소요 시간을 함께 반환합니다.
+    on_progress(부분 텍스트, 진행률%)는 세그먼트(긴 녹음 모드에서는 청크)가 끝날 때마다 호출됩니다.
+    text가 비어 있으면 말소리가 없는 것이고, 대기열 포화(STTQueueFullError)나 추론 오류는 예외로 전달됩니다.
+    """
+    global _active_jobs
+    result = TranscriptionResult(text="", tier=stt_policy.default)
+    if not os.path.exists(audio_path):
+        return result
+
+    with _active_lock:
+        active_before = _active_jobs
+        _active_jobs += 1
+
+    started = time.perf_counter()
+    try:
+        backend = model_registry.get("stt")
+        queue_depth = _queue_depth(backend, active_before)
+
+        try:
+            audio = load_audio(audio_path)
+        except Exception as e:
+            # 디코딩 실패 시 Whisper에 원본 경로를 그대로 넘김 (기본 티어)
+            print(f"⚠️ 오디오 디코딩/증폭 실패 (원본 사용): {e}")
+            result.text = _submit(backend, audio_path, result.tier, on_progress).result()
+            return result
+
+        # 오디오 길이 + 현재 부하 기준으로 티어 선택
+        result.duration_sec = len(audio) / SAMPLE_RATE
+        result.tier = stt_policy.choose(result.duration_sec, queue_depth)
+        STT_TIER.labels(tier=result.tier.tag).inc()
+
+        # 설정된 길이 이상이면 긴 녹음 모드로 분할 병렬 처리
+        if result.duration_sec >= settings.STT_LONG_AUDIO_SEC:
+            result.text = _transcribe_long(backend, audio, result.tier, on_progress)
+        elif stt_batcher.enabled:
+            # 배치 모드: 다른 업로드와 묶여서 변환됨 (세그먼트 단위 진행 상황은 생략)
+            result.text = stt_batcher.submit(audio, result.tier).result()
+            if on_progress:
+                on_progress(result.text, 100.0)
+        else:
+            # 작업을 제출하고 결과를 기다림
+            result.text = _submit(backend, audio, result.tier, on_progress).result()
+
+        result.elapsed_sec = time.perf_counter() - started
+        # 대기 없이 처리된 단건만 RTF 보정에 사용 (대기 시간이 섞이지 않도록)
+        if queue_depth == 0 and result.duration_sec < settings.STT_LONG_AUDIO_SEC:
+            stt_policy.observe(result.tier, result.duration_sec, result.elapsed_sec)
+        return result
+
+    finally:
+        with _active_lock:
+            _active_jobs -= 1
+
+def transcribe(audio_path: str, on_progress: Optional[ProgressCallback] = None) -> str:
+    """오디오 파일을 텍스트로 변환합니다. (텍스트만 필요할 때)"""
+    return transcribe_audio(audio_path, on_progress).text
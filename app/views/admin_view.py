@@ -190,7 +190,7 @@ def _render_dashboard(
 def render_admin() -> None:
     BACKEND_URL = st.session_state.get("BACKEND_URL") or os.getenv("BACKEND_URL", "http://backend:8000")
     ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
-    HEADERS = {"X-Admin-Token": ADMIN_TOKEN} if ADMIN_TOKEN else {}
+    HEADERS = {"X-Admin-Token": ADMIN_TOKEN}
 
     st.title("🧰 사용자 피드백 대시보드")
 
@@ -201,6 +201,11 @@ def render_admin() -> None:
             st.session_state["view_mode"] = "user"
             st.rerun()
 
+    # 관리자 API는 ADMIN_TOKEN이 없으면 모두 거부(403)되므로 호출하지 않고 안내
+    if not ADMIN_TOKEN:
+        st.error("관리자 토큰이 설정되지 않았습니다. `.env`의 `ADMIN_TOKEN`을 설정한 뒤 서버와 대시보드를 다시 시작하세요.")
+        st.stop()
+
     # --- Filters ---
     col1, col2, col3, col4 = st.columns([1, 1, 1, 2])
     with col1:
@@ -198,6 +198,58 @@ def render_feedback(diary, headers):
     if st.session_state.get(open_key, False):
         fb_dialog()
 
+def _stream_generation(BACKEND_URL: str, diary_id: int, headers: dict, progress_bar, progress_value: int):
+    """
+    LLM이 생성 중인 제목/위로 메시지/본문을 SSE(/diaries/{id}/stream)로 받아 점진적으로 표시합니다.
+    생성이 끝나면(done) 반환하고, 최종 결과는 기존처럼 상세 조회로 가져옵니다.
+    """
+    title_box = st.empty()
+    advice_box = st.empty()
+    summary_box = st.empty()
+    summary, advice = "", ""
+
+    try:
+        with requests.get(
+            f"{BACKEND_URL}/diaries/{diary_id}/stream", headers=headers, stream=True, timeout=(5, 60)
+        ) as res:
+            if res.status_code != 200:
+                return
+            res.encoding = "utf-8"
+
+            event = None
+            for line in res.iter_lines(decode_unicode=True):
+                # 빈 줄(이벤트 구분) / 주석(keep-alive)은 건너뜀
+                if not line or line.startswith(":"):
+                    continue
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                    continue
+                if not line.startswith("data: "):
+                    continue
+
+                data = json.loads(line[len("data: "):])
+                if event == "status":
+                    progress_bar.progress(progress_value, text=data)
+                elif event == "summary":
+                    summary += data
+                    summary_box.success(f"{summary}▌")
+                elif event == "summary_done":
+                    summary = data or summary
+                    summary_box.success(summary)
+                elif event == "title":
+                    title_box.markdown(f"### 📔 {data}")
+                elif event == "advice":
+                    advice += data
+                    advice_box.info(f"💌 {advice}▌")
+                elif event == "advice_done":
+                    advice = data or advice
+                    advice_box.info(f"💌 {advice}")
+                elif event == "done":
+                    break
+    except Exception as e:
+        # 스트리밍 실패 시에도 폴링으로 최종 결과를 받으므로 무시
+        print(f"Stream Error: {e}")
+
 def render_main():
     BACKEND_URL = st.session_state["BACKEND_URL"]
     headers = {"Authorization": f"Bearer {st.session_state['access_token']}"}
@@ -267,6 +319,9 @@ def render_main():
 
                         progress_text = "분석을 시작합니다..."
                         progress_bar = st.progress(0, text=progress_text)
+                        # STT 부분 결과 미리보기
+                        partial_box = st.empty()
+                        streamed = False
 
                         for i in range(100):
                             time.sleep(1) # 타임아웃 방지 (1초 대기)
@@ -277,6 +332,14 @@ def render_main():
 
                                 current_msg = data.get("process_message") or "분석 중..."
                                 progress_bar.progress(min(i + 1, 95), text=current_msg)
+                                if data["status"] == "PROCESSING" and data.get("transcript"):
+                                    partial_box.caption(f"🎤 {data['transcript']}")
+
+                                # 감정 분석이 끝나면 LLM 생성 과정을 스트리밍으로 표시
+                                if data["status"] == "PROCESSING" and data.get("emotion_label") and not streamed:
+                                    streamed = True
+                                    _stream_generation(BACKEND_URL, diary_id, headers, progress_bar, min(i + 1, 95))
+                                    continue
 
                                 if data["status"] == "COMPLETED":
                                     st.session_state["last_diary"] = data
@@ -0,0 +1,72 @@
+"""
+분석 작업 워커 (독립 실행)
+
+API 서버와 같은 DATABASE_URL을 바라보며 jobs 테이블의 작업을 가져와 실행합니다.
+여러 노드에서 원하는 만큼 프로세스를 띄울 수 있습니다. (작업 하나는 한 워커만 실행)
+API 서버에서는 JOB_INLINE_WORKERS=0으로 내장 워커를 끄면 됩니다.
+
+사용법:
+    python -m app.worker                      # 워커 1개 (스레드 1개)
+    python -m app.worker --threads 2          # 프로세스 하나에서 작업 2개 동시 실행
+    python -m app.worker --requeue-dead       # dead-letter 작업 다시 대기열에 넣기
+"""
+import argparse
+import logging
+import logging.config
+
+from prometheus_client import start_http_server
+
+from app.core.database import Base, SessionLocal, engine
+from app.core.config import settings
+from app.core.migrations import upgrade_schema
+from app.domains.auth import models as auth_models
+from app.domains.diary import models as diary_models
+from app.domains.feedback import models as feedback_models
+from app.domains.job import models as job_models
+from app.services import job_queue
+from app.services.diary_task import DIARY_JOB_KIND
+from app.services.model_registry import model_registry
+
+try:
+    from app.core.logging import LOGGING_CONFIG
+    logging.config.dictConfig(LOGGING_CONFIG)
+except ImportError:
+    logging.basicConfig(level=logging.INFO)
+
+logger = logging.getLogger("Vench.Worker")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vench 분석 작업 워커")
+    parser.add_argument("--threads", type=int, default=1, help="이 프로세스에서 동시에 실행할 작업 수")
+    parser.add_argument("--kinds", default=DIARY_JOB_KIND, help="처리할 작업 종류 (쉼표로 구분)")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Prometheus 메트릭 포트 (0이면 비활성)")
+    parser.add_argument("--requeue-dead", action="store_true", help="DEAD 작업을 다시 대기열에 넣고 종료")
+    args = parser.parse_args()
+
+    # API 서버보다 먼저 뜰 수 있으므로 테이블이 없으면 생성
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+    if args.requeue_dead:
+        with SessionLocal() as db:
+            count = job_queue.requeue_dead(db)
+        print(f"♻️ Requeued {count} dead job(s)")
+        return
+
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+        logger.info(f"📈 Worker metrics on :{args.metrics_port}/metrics")
+
+    if settings.MODEL_WARMUP_ON_STARTUP:
+        model_registry.start_warmup()
+
+    worker = job_queue.JobWorker(kinds=[k.strip() for k in args.kinds.split(",") if k.strip()], threads=args.threads)
+    try:
+        worker.run_forever()
+    finally:
+        model_registry.shutdown()
+
+
+if __name__ == "__main__":
+    main()
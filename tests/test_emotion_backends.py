@@ -0,0 +1,81 @@
+"""
+감정 분석 백엔드 정합성: 같은 문장을 analyze_emotion으로 분류했을 때
+PyTorch(fp32)와 ONNX Runtime(int8)의 라벨이 일치하고 점수 차이가 허용 범위 안인지 확인합니다.
+백엔드는 import 시점에 정해지므로 백엔드마다 새 프로세스에서 실행합니다.
+(torch/onnxruntime이 없거나 모델이 로컬 캐시에 없으면 건너뜀, 첫 실행 시 ONNX 변환에 시간이 걸림)
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("onnxruntime")
+hub = pytest.importorskip("huggingface_hub")
+
+from app.services.emotion_service import EMOTION_MODEL_NAME, KOREAN_LABELS
+
+SENTENCES = [
+    "와, 드디어 해냈다! 진짜 너무 기분 좋아.",
+    "오늘은 햄버거 먹고 빨리 집에 가서 자야겠다.",
+    "내일 여행 간다! 빨리 짐 싸야지.",
+    "아 진짜 아무것도 하기 싫다...",
+    "회의에서 또 내 의견이 무시당했다. 너무 화가 나서 집에 와서도 계속 생각이 난다.",
+    "다음 주 발표가 너무 걱정돼서 잠이 안 온다.",
+    "할머니가 보고 싶어서 하루 종일 눈물이 났다.",
+    "창밖으로 비 오는 소리를 들으며 차 한잔 마시니 마음이 편안하다.",
+]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MIN_LABEL_AGREEMENT = 0.85
+MAX_SCORE_DIFF = 0.1
+
+_SCRIPT = """
+import json, sys
+from app.services.emotion_service import EMOTION_BACKEND_TAG, analyze_emotion
+results = [analyze_emotion(text) for text in json.loads(sys.argv[1])]
+print(json.dumps({
+    "backend": EMOTION_BACKEND_TAG,
+    "labels": [r["label"] for r in results],
+    "scores": [{s["label"]: s["score"] for s in r["all_scores"]} for r in results],
+}))
+"""
+
+
+def _analyze_with(backend: str) -> dict:
+    env = dict(os.environ, EMOTION_BACKEND=backend, EMOTION_FAST_PATH="false")
+    proc = subprocess.run(
+        [sys.executable, "-c", _SCRIPT, json.dumps(SENTENCES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def backend_results():
+    if not isinstance(hub.try_to_load_from_cache(EMOTION_MODEL_NAME, "config.json"), str):
+        pytest.skip(f"{EMOTION_MODEL_NAME} is not in the local Hugging Face cache")
+    return _analyze_with("torch"), _analyze_with("onnx")
+
+
+def test_onnx_backend_is_used(backend_results):
+    torch_run, onnx_run = backend_results
+    assert torch_run["backend"] == "torch-fp32"
+    assert onnx_run["backend"] == "onnx-int8"
+
+
+def test_label_agreement(backend_results):
+    torch_run, onnx_run = backend_results
+    agreed = sum(a == b for a, b in zip(torch_run["labels"], onnx_run["labels"]))
+    assert agreed / len(SENTENCES) >= MIN_LABEL_AGREEMENT, list(zip(torch_run["labels"], onnx_run["labels"]))
+
+
+def test_score_tolerance(backend_results):
+    torch_run, onnx_run = backend_results
+    for text, expected, actual in zip(SENTENCES, torch_run["scores"], onnx_run["scores"]):
+        diff = max(abs(expected[label] - actual[label]) for label in KOREAN_LABELS)
+        assert diff <= MAX_SCORE_DIFF, f"{text}: max score diff {diff:.3f}"
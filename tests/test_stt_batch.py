@@ -0,0 +1,54 @@
+import sys
+import types
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import stt_service
+from app.services.stt_service import SAMPLE_RATE, transcribe_batch_with_model
+
+
+def _fake_faster_whisper(version: str) -> types.ModuleType:
+    """설치된 버전처럼 clip_timestamps를 읽는 가짜 BatchedInferencePipeline (구간마다 세그먼트 하나)"""
+    class BatchedInferencePipeline:
+        def __init__(self, model):
+            self.model = model
+
+        def transcribe(self, audio, clip_timestamps, **kwargs):
+            segments = []
+            for clip in clip_timestamps:
+                if version.startswith("1.1."):
+                    start, end = clip["start"], clip["end"]
+                else:
+                    start, end = int(clip["start"] * SAMPLE_RATE), int(clip["end"] * SAMPLE_RATE)
+                chunk = audio[start:end]
+                # 오디오마다 다른 값으로 채워 두었으므로 구간 내용으로 어느 오디오인지 확인
+                label = "/".join(f"job{int(v)}" for v in np.unique(chunk)) or "empty"
+                segments.append(SimpleNamespace(text=f" {label} ", start=round(start / SAMPLE_RATE, 3)))
+            return iter(segments), None
+
+    module = types.ModuleType("faster_whisper")
+    module.__version__ = version
+    module.BatchedInferencePipeline = BatchedInferencePipeline
+    return module
+
+
+def _split_in_two(audio, max_chunk_sec):
+    half = len(audio) // 2
+    return [audio[:half], audio[half:]]
+
+
+@pytest.mark.parametrize("version", ["1.1.1", "1.2.1"])
+def test_batch_returns_each_job_its_own_text(monkeypatch, version):
+    monkeypatch.setitem(sys.modules, "faster_whisper", _fake_faster_whisper(version))
+    monkeypatch.setattr(stt_service, "split_on_silence", _split_in_two)
+
+    durations_sec = [3.0, 7.5, 1.25]
+    audios = [np.full(int(sec * SAMPLE_RATE), i + 1, dtype=np.float32) for i, sec in enumerate(durations_sec)]
+
+    assert transcribe_batch_with_model(model=None, audios=audios) == [
+        "job1 job1",
+        "job2 job2",
+        "job3 job3",
+    ]